@@ -2,17 +2,24 @@
 import logging
 import sys
 import streamlit as st
-from math_tutor.system_GB_Coach import MathTutoringSystem, LearningObjectives
+from math_tutor.system_GB_Coach import MathTutoringSystem, LearningObjectives, TutorResources
 import os
 from datetime import datetime
-import pandas as pd
+from math_tutor.utils.lazy_import import LazyImport
+pd = LazyImport("pandas")
 os.environ["STREAMLIT_SERVER_ENABLE_STATIC_FILE_WATCHER"] = "false"
 logging.basicConfig(stream=sys.stdout, level=logging.INFO)
 
+@st.cache_resource(show_spinner="Chargement du tuteur...")
+def shared_resources():
+    """Clients LLM, agents, mémoire et MLflow: construits une seule fois pour tout le processus"""
+    return TutorResources()
+
 def initialize_session_state():
     """Initialisation robuste du système"""
     if 'tutor' not in st.session_state:
-        st.session_state.tutor = MathTutoringSystem()
+        # Une session ne porte que son état (élève, tentatives): création instantanée
+        st.session_state.tutor = MathTutoringSystem(shared_resources())
         st.session_state.authenticated = False
         st.session_state.current_student = None
         st.session_state.current_exercise = None
@@ -0,0 +1,49 @@
+"""Mesure reproductible des appels LLM (génération, évaluation, coaching) sur une cassette.
+
+    # 1. Enregistrement (clé Groq et réseau nécessaires)
+    LLM_CASSETTE=bench.json LLM_CASSETTE_MODE=record python -m math_tutor.benchmark_llm
+    # 2. Rejeu hors ligne, avec la latence d'origine ou sans (LLM_CASSETTE_LATENCY=none)
+    LLM_CASSETTE=bench.json python -m math_tutor.benchmark_llm
+"""
+import argparse
+import json
+import os
+
+from math_tutor.utils.metrics import metrics
+
+# Réponses fixées: mêmes prompts à chaque exécution, donc mêmes entrées de cassette
+ANSWERS = ["R-{3}", "x > 3"]
+
+
+def run_benchmark(system, objective: str, level: int, repeat: int):
+    from math_tutor.system_GB_Coach import StudentProfile
+
+    # Le cache et le regroupement court-circuiteraient les appels mesurés
+    system.llm_cache.enabled_sites = set()
+    system.single_flight = None
+    system.current_student = StudentProfile(student_id="benchmark", current_objective=objective, level=level)
+    metrics.reset()
+    for _ in range(repeat):
+        exercise = system._generate_exercise(objective, level)
+        for answer in ANSWERS:
+            evaluation = system._evaluate_prompt(exercise, answer, detailed=True)
+            system._provide_personalized_coaching(evaluation, exercise)
+    return metrics.snapshot()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objective", default="Domaine de définition")
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    if not os.getenv("LLM_CASSETTE"):
+        parser.error("LLM_CASSETTE doit désigner le fichier de cassette")
+
+    from math_tutor.system_GB_Coach import MathTutoringSystem
+    snapshot = run_benchmark(MathTutoringSystem(), args.objective, args.level, args.repeat)
+    print(json.dumps(snapshot, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Coût d'une sauvegarde de profil selon l'ancienneté de l'élève: réécriture complète, journal, SQLite.
+
+    python -m math_tutor.benchmark_student_store --sizes 10 100 1000 --saves 20
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from math_tutor.utils.metrics import PerformanceMetrics
+from math_tutor.utils.student_store import JsonStudentStore, SqliteStudentStore
+
+
+def history_entry(i: int) -> dict:
+    return {
+        "attempt_id": f"{i:032x}",
+        "exercise": "Déterminer le domaine de définition de f(x) = 1/(x - 3)",
+        "answer": "R privé de 3",
+        "evaluation": i % 3 != 0,
+        "attempt": 1,
+        "timestamp": "2025-05-29T19:47:08.123456",
+        "evaluation_result": {"is_correct": i % 3 != 0, "error_type": None, "feedback": "Correct, bien justifié.",
+                              "detailed_explanation": "Le dénominateur s'annule en x = 3.",
+                              "step_by_step_correction": "x - 3 ≠ 0 ⇔ x ≠ 3", "recommendations": []},
+    }
+
+
+def legacy_save(path: Path, student) -> int:
+    """Ancienne sauvegarde: profil complet, historique compris, réécrit avec indent=4"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(student.model_dump(), f, indent=4)
+    return path.stat().st_size
+
+
+def run(size: int, saves: int):
+    from math_tutor.system_GB_Coach import StudentProfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for mode in ("legacy", "journal", "sqlite"):
+            student = StudentProfile(student_id=f"bench{size}", name="Élève",
+                                     learning_history=[history_entry(i) for i in range(size)])
+            if mode == "sqlite":
+                store = SqliteStudentStore(Path(tmp) / "students.db", metrics=PerformanceMetrics())
+            else:
+                store = JsonStudentStore(Path(tmp) / mode, metrics=PerformanceMetrics())
+                store.data_dir.mkdir()
+            store.save(student)
+            sizes, latencies = [], []
+            for i in range(saves):
+                student.learning_history.append(history_entry(size + i))
+                start = time.perf_counter()
+                if mode == "legacy":
+                    sizes.append(legacy_save(store.header_path(student.student_id), student))
+                else:
+                    sizes.append(store.save(student))
+                latencies.append(time.perf_counter() - start)
+            results[mode] = (statistics.median(sizes), statistics.median(latencies) * 1000)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--saves", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'entrées':>8} | {'avant (octets)':>14} | {'avant (ms)':>10} | {'après (octets)':>14} | {'après (ms)':>10}"
+          f" | {'sqlite (ms)':>11}")
+    for size in args.sizes:
+        results = run(size, args.saves)
+        (legacy_bytes, legacy_ms), (journal_bytes, journal_ms) = results["legacy"], results["journal"]
+        print(f"{size:>8} | {legacy_bytes:>14.0f} | {legacy_ms:>10.2f} | {journal_bytes:>14.0f} | {journal_ms:>10.2f}"
+              f" | {results['sqlite'][1]:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Rapport de temps d'import (python -X importtime) et vérification du budget.
+
+    python -m math_tutor.import_report                      # math_tutor.system_GB_Coach
+    python -m math_tutor.import_report math_tutor.app --top 30
+    IMPORT_BUDGET_MS=1500 python -m math_tutor.import_report   # code de sortie 1 si dépassé
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple
+
+# Dépendances qui ne doivent être chargées qu'au premier usage (voir utils/lazy_import.py)
+HEAVY_MODULES = ("crewai", "mlflow", "chromadb", "pandas", "sympy", "matplotlib",
+                 "tkinter", "langchain_groq", "langchain_core", "fitz")
+
+DEFAULT_BUDGET_MS = 1500
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class ImportEntry(NamedTuple):
+    name: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportEntry]:
+    """Lignes `import time: self [us] | cumulative | module` de `python -X importtime`"""
+    entries = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append(ImportEntry(name, int(self_us) / 1000, int(cumulative_us) / 1000, (len(indent) - 1) // 2))
+    return entries
+
+
+def measure(module: str) -> List[ImportEntry]:
+    """Import de `module` dans un interpréteur neuf"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import de {module} impossible:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def summarize(module: str, entries: List[ImportEntry]) -> Dict:
+    total = next((entry.cumulative_ms for entry in entries if entry.name == module and entry.depth == 0), 0.0)
+    loaded = {entry.name.split(".")[0] for entry in entries}
+    return {
+        "module": module,
+        "total_ms": total,
+        "heavy_loaded": [name for name in HEAVY_MODULES if name in loaded],
+        "top": sorted((entry for entry in entries if entry.depth <= 1),
+                      key=lambda entry: entry.cumulative_ms, reverse=True),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("module", nargs="?", default="math_tutor.system_GB_Coach")
+    parser.add_argument("--top", type=int, default=15, help="Nombre de dépendances directes affichées")
+    parser.add_argument("--runs", type=int, default=3, help="Mesures (la plus rapide est retenue)")
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.getenv("IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS)))
+    args = parser.parse_args()
+
+    # La première mesure paie la compilation des .pyc: la plus rapide reflète un démarrage à froid réel
+    summary = min((summarize(args.module, measure(args.module)) for _ in range(max(1, args.runs))),
+                  key=lambda summary: summary["total_ms"])
+
+    print(f"{summary['module']}: {summary['total_ms']:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    for entry in summary["top"][:args.top]:
+        print(f"  {entry.cumulative_ms:8.1f} ms  {'  ' * entry.depth}{entry.name}")
+    if summary["heavy_loaded"]:
+        print(f"❌ Dépendances lourdes importées: {', '.join(summary['heavy_loaded'])}")
+    over_budget = summary["total_ms"] > args.budget_ms
+    if over_budget:
+        print(f"❌ Budget dépassé de {summary['total_ms'] - args.budget_ms:.0f} ms")
+    sys.exit(1 if over_budget or summary["heavy_loaded"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Import en masse des profils JSON de students_data/ dans la base SQLite (STUDENT_STORE=sqlite).
+
+    python -m math_tutor.migrate_students                                  # students_data -> students_data/students.db
+    python -m math_tutor.migrate_students --data-dir students_data --db /srv/tutor/students.db
+    STUDENT_STORE=sqlite streamlit run math_tutor/app.py
+
+Les deux formats de fichiers (profil complet ou en-tête + journal d'historique) sont lus.
+L'import peut être relancé: les profils déjà présents dans la base sont remplacés.
+"""
+import argparse
+import time
+from pathlib import Path
+
+from math_tutor.utils.student_store import JsonStudentStore, SqliteStudentStore
+
+
+def migrate(data_dir: Path, db_path: Path, batch_size: int = 500) -> int:
+    source = JsonStudentStore(data_dir)
+    target = SqliteStudentStore(db_path)
+    batch, imported = [], 0
+    for student_id in source.student_ids():
+        try:
+            data = source.load(student_id)
+        except Exception as e:
+            print(f"⚠️ Profil ignoré ({student_id}): {str(e)}")
+            continue
+        if not data or "student_id" not in data:
+            continue
+        batch.append(data)
+        if len(batch) >= batch_size:
+            imported += target.import_profiles(batch)
+            batch = []
+    return imported + target.import_profiles(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default="students_data")
+    parser.add_argument("--db", help="Base cible (défaut: <data-dir>/students.db)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Profils par transaction")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    db_path = Path(args.db) if args.db else data_dir / "students.db"
+    start = time.perf_counter()
+    count = migrate(data_dir, db_path, args.batch_size)
+    print(f"✅ {count} profils importés dans {db_path} en {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
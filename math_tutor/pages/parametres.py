@@ -65,6 +65,8 @@ from datetime import datetime
 import plotly.express as px
 import json
 import os
+from math_tutor.utils.metrics import metrics
+from math_tutor.utils.job_executor import get_job_executor
 
 # Vérification de session
 if 'tutor' not in st.session_state or not st.session_state.get('authenticated', False):
@@ -72,6 +74,9 @@ if 'tutor' not in st.session_state or not st.session_state.get('authenticated',
     st.page_link("app.py", label="← Page d'accueil")
     st.stop()
 
+# Quitter la session d'apprentissage annule l'évaluation ou la génération encore en cours
+st.session_state.tutor.cancel_pending()
+
 # Configuration de la page
 st.set_page_config(page_title="Paramètres", page_icon="⚙️")
 st.title("⚙️ Paramètres du Compte")
@@ -125,6 +130,10 @@ def show_settings():
             st.session_state.clear()
             st.rerun()
 
+    # Section Performance
+    with st.expander("⚡ Performance"):
+        show_performance_stats(tutor)
+
     # Section Aide
     with st.expander("❓ Aide & Support"):
         st.write("""
@@ -189,6 +198,96 @@ def export_full_history(format_type='csv'):
             mime="application/json"
         )
 
+def show_performance_stats(tutor):
+    pool = getattr(tutor, 'exercise_pool', None)
+    if pool:
+        stats = pool.stats()
+        st.write("**Réserve d'exercices pré-générés**")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Succès (hits)", stats['hits'])
+        col2.metric("Échecs (misses)", stats['misses'])
+        col3.metric("Taux de succès", f"{stats['hit_ratio']:.0%}")
+        st.caption(f"Profondeur: {stats['depth']} · Générations parallèles: {stats['max_workers']}")
+        st.json(stats['ready'])
+    else:
+        st.info("Réserve d'exercices désactivée (mode hors ligne)")
+
+    cache = getattr(tutor, 'llm_cache', None)
+    if cache:
+        stats = cache.stats()
+        st.write("**Cache des réponses LLM**")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Succès mémoire", int(metrics.counter("llm_cache_memory_hit")))
+        col2.metric("Succès disque", int(metrics.counter("llm_cache_disk_hit")))
+        col3.metric("Échecs", int(metrics.counter("llm_cache_miss")))
+        st.caption(
+            f"Entrées en mémoire: {stats['memory_entries']} · sur disque: {stats['disk_entries'] or 0} · "
+            f"Sites activés: {', '.join(stats['enabled_sites']) or 'aucun'}"
+        )
+
+    profiles = getattr(getattr(tutor, 'student_manager', None), 'cache', None)
+    if profiles:
+        stats = profiles.stats()
+        st.write("**Cache des profils élèves**")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Succès (hits)", stats['hits'])
+        col2.metric("Échecs (misses)", stats['misses'])
+        col3.metric("Taux de succès", f"{stats['hit_ratio']:.0%}")
+        load = (f"{stats['load_p50'] * 1000:.1f} ms (p50) · {stats['load_p95'] * 1000:.1f} ms (p95)"
+                if stats['load_p50'] is not None else "—")
+        st.caption(f"Profils en cache: {stats['entries']}/{stats['max_entries']} · "
+                   f"Périmés (réécrits ailleurs): {stats['stale']} · Chargement: {load}")
+
+    flights = getattr(tutor, 'single_flight', None)
+    if flights:
+        stats = flights.stats()
+        st.write("**Regroupement des requêtes identiques**")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Appels LLM émis", stats['leaders'])
+        col2.metric("Appels regroupés", stats['coalesced'])
+        col3.metric("En cours", stats['in_flight'])
+
+    scheduler = getattr(tutor, 'llm_scheduler', None)
+    if scheduler:
+        stats = scheduler.stats()
+        st.write("**Budget LLM (requêtes et tokens par minute)**")
+        col1, col2 = st.columns(2)
+        col1.metric("Requêtes disponibles", stats['requests_available'] if stats['requests_available'] is not None else "∞")
+        col2.metric("Tokens disponibles", stats['tokens_available'] if stats['tokens_available'] is not None else "∞")
+        st.caption(f"En attente: {stats['waiting']}")
+
+    startup = getattr(tutor, 'startup', None)
+    if startup:
+        st.write("**Démarrage des ressources (une fois par processus)**")
+        st.text("\n".join(startup.report()))
+
+    stats = get_job_executor().stats()
+    st.write("**Travaux en arrière-plan (toutes sessions)**")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("En attente", stats['pending'])
+    col2.metric("En cours", stats['running'])
+    col3.metric("Terminés", stats['done'])
+
+    resilience = getattr(tutor, 'llm_resilience', None)
+    if resilience:
+        states = {"closed": "🟢 fermé", "open": "🔴 ouvert (fallbacks locaux)", "half_open": "🟡 sonde en cours"}
+        st.write(f"**Disjoncteur LLM:** {states[resilience.breaker.state]} "
+                 f"— échéance {resilience.deadline:.0f} s, relance: {resilience.hedge_after}")
+
+    router = getattr(tutor, 'model_router', None)
+    if router:
+        st.write("**Routage des modèles**")
+        st.table([
+            {"niveau": name, "modèle": tier["model"], "budget (s)": tier["budget_seconds"],
+             "p95 récent (s)": round(tier["recent_p95"], 2) if tier["recent_p95"] is not None else "—",
+             "rétrogradations": tier["downgrades"]}
+            for name, tier in router.stats().items()
+        ])
+        st.caption(", ".join(f"{site} → {tier}" for site, tier in router.routes.items()))
+
+    st.write("**Métriques du processus**")
+    st.json(metrics.snapshot())
+
 def check_data_integrity():
     student = st.session_state.tutor.current_student
     issues = []
@@ -80,6 +80,9 @@ if 'tutor' not in st.session_state or not hasattr(st.session_state, 'authenticat
     st.page_link("app.py", label="← Page d'accueil")
     st.stop()
 
+# Quitter la session d'apprentissage annule l'évaluation ou la génération encore en cours
+st.session_state.tutor.cancel_pending()
+
 # Titre principal unique
 st.title("📊 Votre Progression")
 
@@ -1,9 +1,13 @@
+import hashlib
 import os
 import streamlit as st
-from math_tutor.system_GB_Coach import MathTutoringSystem
-import datetime
-import sympy as sp
-import matplotlib.pyplot as plt
+from math_tutor.system_GB_Coach import MathTutoringSystem, Exercise
+from math_tutor.utils.job_executor import Job, get_job_executor
+from math_tutor.utils.lazy_import import LazyImport
+
+# Seulement pour la visualisation des dérivées: chargés au premier graphique
+sp = LazyImport("sympy")
+plt = LazyImport("matplotlib.pyplot")
 
 # Vérification initiale
 if 'tutor' not in st.session_state or not hasattr(st.session_state, 'authenticated'):
@@ -24,6 +28,7 @@ if 'current_exercise' not in st.session_state:
     st.session_state.current_exercise = None
     st.session_state.attempts = 0
     st.session_state.max_attempts = 2
+    st.session_state.last_attempt_id = None
 
 def show_learning_session():
     # Vérifications renforcées
@@ -59,17 +64,30 @@ def show_learning_session():
         st.error("Objectif invalide")
         return
     
-    # Génération exercice
-    if 'current_exercise' not in st.session_state or st.session_state.current_exercise is None:
+    # Travail en arrière-plan (génération, évaluation): progression, ou application du résultat
+    poll_pending_job()
+
+    # Reprise d'un exercice non terminé (après un redémarrage), sinon génération en arrière-plan
+    if st.session_state.current_exercise is None and not st.session_state.get("pending_job"):
         try:
-            st.session_state.current_exercise = st.session_state.tutor._generate_exercise()
-            st.session_state.attempts = 0
+            pending = None
+            if not st.session_state.get('resume_checked'):
+                st.session_state.resume_checked = True
+                pending = st.session_state.tutor.pending_attempt(st.session_state.max_attempts)
+            if pending:
+                st.session_state.current_exercise = Exercise.model_validate(pending["exercise_data"])
+                st.session_state.attempts = pending["attempt"]
+                st.session_state.last_attempt_id = pending["attempt_id"]
+            else:
+                request_exercise(st.session_state.tutor.next_exercise, "Préparation de l'exercice")
+                poll_pending_job()
         except Exception as e:
             st.error(f"Erreur génération exercice: {str(e)}")
             return
     
-    # Afficher l'exercice
-    display_exercise()
+    # Afficher l'exercice (sauf pendant sa préparation)
+    if st.session_state.current_exercise is not None:
+        display_exercise()
     
   
 
@@ -86,6 +104,7 @@ def display_exercise():
     
     with tab_response:
         handle_response(exercise)
+        display_last_attempt(exercise)
     
     with tab_hints:
         display_hints(exercise)
@@ -107,57 +126,169 @@ def handle_response(exercise):
                 f.write(uploaded_file.getbuffer())
             user_answer = file_path
     
-    if st.button("Soumettre", key="submit_btn"):
-        process_answer(exercise, user_answer)
+    detailed = st.checkbox(
+        "Demander une explication détaillée (IA)",
+        key="detailed_evaluation",
+        help="Sinon, les réponses de domaine et de limite sont corrigées instantanément par calcul symbolique"
+    )
+    # Pas de nouvelle soumission tant que la tentative précédente est en cours d'évaluation,
+    # ni une fois l'exercice réussi (la progression est déjà enregistrée)
+    evaluating = (st.session_state.get("pending_job") or {}).get("kind") == "evaluation"
+    if st.button("Soumettre", key="submit_btn", disabled=evaluating or exercise_solved(exercise)):
+        process_answer(exercise, user_answer, detailed)
+
+async def evaluate_answer(tutor, exercise, answer, detailed):
+    """Évaluation seule (extraction du fichier comprise); le coaching est demandé plus tard"""
+    return await tutor.aevaluate_response(exercise, answer, detailed), None
 
-def process_answer(exercise, answer):
+def process_answer(exercise, answer, detailed=False):
     """Traite la réponse de l'étudiant"""
     if not answer:
         st.warning("Veuillez fournir une réponse")
         return
     
-    st.session_state.attempts += 1
+    tutor = st.session_state.tutor
+    attempt = st.session_state.attempts + 1
     
     try:
-        # Évaluation de la réponse
-        evaluation = st.session_state.tutor._evaluate_response(exercise, answer)
-        
-        
-        # Mise à jour de l'historique
-        st.session_state.tutor.current_student.learning_history.append({
-            "exercise": exercise.exercise,
-            "answer": str(answer),
-            "evaluation": evaluation.is_correct,
-            "timestamp": datetime.datetime.now().isoformat(),
-            "attempt": st.session_state.attempts
-        })
-        
-        # Affichage des résultats
-        display_results(evaluation,exercise)
-        
-        # Gestion de la progression
-        if evaluation.is_correct:
-            handle_success()
-        elif st.session_state.attempts >= st.session_state.max_attempts:
-            handle_failure()
-            
+        # Explication détaillée: feedback et explication affichés au fil de la génération
+        stream = tutor.stream_evaluation(exercise, answer) if detailed else None
+        if stream:
+            preview = st.empty()
+            with preview.container():
+                write_stream_fields(stream, {"feedback": "**Feedback**", "detailed_explanation": "**Explication**"})
+            preview.empty()  # remplacé par l'affichage complet de la tentative
+            if stream.result is not None:
+                finish_evaluation(exercise, answer, stream.result, None, attempt)
+                return
+
+        # Évaluation (et coaching dans le même appel en mode combiné) en arrière-plan, une seule
+        # par tentative: un double clic ou une réexécution de la page ne la relance pas
+        key = f"{exercise_key(exercise)}#{attempt}"
+        if tutor.combined_evaluation:
+            tutor.submit_job(key, "evaluation", tutor.evaluate_and_coach, exercise, answer, detailed)
+        else:
+            tutor.submit_job(key, "evaluation", evaluate_answer(tutor, exercise, answer, detailed))
+        st.session_state.pending_job = {"kind": "evaluation", "key": key, "label": "Évaluation en cours",
+                                        "exercise": exercise, "answer": answer, "attempt": attempt}
+        st.rerun()
     except Exception as e:
         st.error(f"Erreur lors de l'évaluation: {str(e)}")
 
-def display_results(evaluation,exercise):
-    """Affiche les résultats de l'évaluation"""
+def finish_evaluation(exercise, answer, evaluation, coaching, attempt):
+    """Enregistre la tentative évaluée et fait progresser l'élève si elle est correcte"""
+    st.session_state.attempts = attempt
+    # Enregistrement de la tentative: les réaffichages liront ce registre sans rappeler le LLM
+    st.session_state.last_attempt_id = st.session_state.tutor.record_attempt(
+        exercise, answer, evaluation, coaching, attempt
+    )
+    
+    # Gestion de la progression
+    # (l'échec après plusieurs tentatives est proposé par display_last_attempt)
     if evaluation.is_correct:
         st.balloons()
+        handle_success()
+
+def exercise_key(exercise):
+    return hashlib.sha1(exercise.exercise.encode("utf-8")).hexdigest()[:12]
+
+def request_exercise(work, label, *args):
+    """Génère le prochain exercice en arrière-plan (une seule génération par demande)"""
+    st.session_state.exercise_requests = st.session_state.get("exercise_requests", 0) + 1
+    key = f"exercise#{st.session_state.exercise_requests}"
+    st.session_state.tutor.submit_job(key, "exercise", work, *args)
+    st.session_state.pending_job = {"kind": "exercise", "key": key, "label": label}
+    st.session_state.current_exercise = None
+
+def poll_pending_job():
+    """Suit le travail en cours de la session. Vrai tant qu'il n'est pas terminé (indicateur affiché);
+    une fois terminé, son résultat est appliqué (tentative enregistrée ou nouvel exercice)."""
+    pending = st.session_state.get("pending_job")
+    if not pending:
+        return False
+    job = st.session_state.tutor.get_job(pending["key"], pending["kind"])
+    if job is None or job.status == Job.CANCELLED:
+        # Annulé en quittant la page: l'élève resoumet
+        st.session_state.pending_job = None
+        return False
+    if not job.done():
+        show_job_progress(job, pending["label"])
+        return True
+
+    st.session_state.pending_job = None
+    try:
+        result = get_job_executor().collect(job)
+    except Exception as e:
+        st.error(f"Erreur lors de {pending['label'].lower()}: {str(e)}")
+        return False
+    if pending["kind"] == "exercise":
+        st.session_state.current_exercise = result
+        st.session_state.attempts = 0
+    elif pending["exercise"] == st.session_state.get("current_exercise"):
+        evaluation, coaching = result
+        finish_evaluation(pending["exercise"], pending["answer"], evaluation, coaching, pending["attempt"])
+    return False
+
+def show_job_progress(job, label):
+    """Barre de progression rafraîchie sans réexécuter la page; réexécution complète à la fin du travail"""
+    expected = get_job_executor().expected_seconds(job.kind) or 10.0
+
+    @st.fragment(run_every=0.5)
+    def progress():
+        if job.done():
+            st.rerun()
+        st.progress(min(job.elapsed / expected, 0.95), text=f"⏳ {label}... {job.elapsed:.0f} s")
+
+    progress()
+
+def last_attempt_record(exercise):
+    """Dernière tentative enregistrée si elle porte sur cet exercice, sinon None"""
+    attempt_id = st.session_state.get("last_attempt_id")
+    record = st.session_state.tutor.get_attempt(attempt_id) if attempt_id else None
+    return record if record and record["exercise"] == exercise.exercise else None
+
+def exercise_solved(exercise):
+    record = last_attempt_record(exercise)
+    return bool(record) and bool(record["evaluation"])
+
+def display_last_attempt(exercise):
+    """Réaffiche la dernière tentative de cet exercice depuis le registre des tentatives"""
+    record = last_attempt_record(exercise)
+    if not record:
+        return
+    attempt_id = record["attempt_id"]
+    evaluation = st.session_state.tutor.attempt_evaluation(attempt_id)
+    display_results(evaluation, exercise, attempt_id)
+    if not evaluation.is_correct and record["attempt"] >= st.session_state.max_attempts:
+        handle_failure()
+
+def display_results(evaluation, exercise, attempt_id):
+    """Affiche les résultats de l'évaluation"""
+    if evaluation.is_correct:
         st.success("✅ Réponse correcte!")
+        # La progression a déjà été enregistrée à la soumission; l'exercice reste affiché
+        # avec ses résultats jusqu'à ce que l'élève passe au suivant
         if st.button("exercice suivant", key="move_btn"):
-            handle_success()
-            st.session_state["text_input"] = ""
+            request_exercise(st.session_state.tutor.next_exercise, "Préparation de l'exercice")
+            st.rerun()
 
     else:
         st.error(f"❌ Réponse incorrecte: {evaluation.error_type or 'inconnue'})")
     
-    with st.expander("Détails de l'évaluation"):
-        display_streamlit_evaluation(evaluation, exercise)
+    if st.session_state.tutor.details_pending(attempt_id):
+        # Évaluation en deux temps: l'explication n'est générée que si l'élève l'ouvre
+        # (le contenu d'un st.expander s'exécute même replié, d'où l'interrupteur)
+        st.markdown(evaluation.feedback)
+        if st.toggle("Détails de l'évaluation", key=f"details_{attempt_id}"):
+            streamed = st.empty()
+            with streamed.container():
+                st.write_stream(st.session_state.tutor.stream_evaluation_details(attempt_id))
+            if not st.session_state.tutor.details_pending(attempt_id):
+                streamed.empty()
+                display_streamlit_evaluation(st.session_state.tutor.attempt_evaluation(attempt_id), exercise, attempt_id)
+    else:
+        with st.expander("Détails de l'évaluation"):
+            display_streamlit_evaluation(evaluation, exercise, attempt_id)
     #     st.markdown(f"**Feedback:** {evaluation.feedback}")
     #     st.markdown("**Explication:**")
     #     st.markdown(evaluation.detailed_explanation)
@@ -192,7 +323,6 @@ def handle_success():
             move_to_next_objective()
     
     st.session_state.tutor.student_manager.save_student(st.session_state.tutor.current_student)
-    st.session_state.current_exercise = None  # Prêt pour un nouvel exercice
 
 def move_to_next_objective():
     """Passe à l'objectif suivant"""
@@ -214,14 +344,12 @@ def handle_failure():
     col1, col2 = st.columns(2)
     with col1:
         if st.button("Nouvel exercice similaire"):
-            st.session_state.current_exercise = st.session_state.tutor._generate_similar_exercise(st.session_state.current_exercise)
-            st.session_state.attempts = 0
+            generate_similar(st.session_state.current_exercise)
             st.rerun()
     
     with col2:
         if st.button("Nouvel exercice différent"):
-            st.session_state.current_exercise = st.session_state.tutor._generate_exercise()
-            st.session_state.attempts = 0
+            request_exercise(st.session_state.tutor.next_exercise, "Préparation de l'exercice")
             st.rerun()
 
 def display_hints(exercise):
@@ -234,7 +362,7 @@ def display_hints(exercise):
     else:
         st.info("Aucun indice disponible pour cet exercice")
 
-def display_streamlit_evaluation(evaluation, exercise):
+def display_streamlit_evaluation(evaluation, exercise, attempt_id):
     """Version adaptée pour Streamlit de l'affichage d'évaluation"""
     
     # Conteneur principal avec onglets
@@ -270,7 +398,14 @@ def display_streamlit_evaluation(evaluation, exercise):
         st.markdown(f"```\n{exercise.solution}\n```")
     
     with tab4:  # Onglet Coaching
-        coaching = st.session_state.tutor._provide_personalized_coaching(evaluation, exercise)
+        stream = st.session_state.tutor.stream_attempt_coaching(attempt_id)
+        if stream:
+            preview = st.empty()
+            with preview.container():
+                write_stream_fields(stream, {"motivation": "💪 **Motivation**", "strategy": "📚 **Stratégie**"})
+            preview.empty()
+        # Conservé par le flux, sinon demandé une fois (appel classique)
+        coaching = st.session_state.tutor.attempt_coaching(attempt_id)
         
         st.subheader("Accompagnement personnalisé")
         
@@ -292,7 +427,7 @@ def display_streamlit_evaluation(evaluation, exercise):
         
         # Bouton pour générer un nouvel exercice similaire
         if st.button("🔄 Exercice similaire pour pratiquer", key="similar_exercise_btn"):
-            st.session_state.current_exercise = st.session_state.tutor._generate_similar_exercise(exercise)
+            generate_similar(exercise)
             st.rerun()
     
     # Section Recommandations
@@ -305,6 +440,28 @@ def display_streamlit_evaluation(evaluation, exercise):
             st.markdown(f"- {rec}")
 
             
+def generate_similar(exercise):
+    """Exercice similaire généré en arrière-plan (coroutine annulable)"""
+    tutor = st.session_state.tutor
+    request_exercise(tutor.agenerate_similar_exercise(exercise), "Génération d'un exercice similaire")
+
+def write_stream_fields(stream, titles):
+    """Affiche les champs narratifs d'un flux structuré avec st.write_stream, dans leur ordre d'arrivée"""
+    events = iter(stream)
+    current = next(events, None)
+    while current:
+        field = current[0]
+
+        def fragments():
+            nonlocal current
+            while current and current[0] == field:
+                yield current[1]
+                current = next(events, None)
+
+        st.markdown(titles.get(field, field))
+        st.write_stream(fragments())
+
+
 def display_derivative_visualization(exercise):
         """Visualisation des dérivées (exemple)"""
         
@@ -1,22 +1,53 @@
+import asyncio
 import os
 import json
 import re
-from tkinter import Tk, filedialog
+import threading
+import uuid
+from concurrent.futures import Future
 from datetime import datetime, time # type: ignore
 from pathlib import Path # type: ignore
-from typing import Optional, Dict, List, Union
-import chromadb
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING, Any, Coroutine, Iterator, Optional, Dict, List, Tuple, Union
 from dotenv import load_dotenv
-from crewai import Agent, Task, Crew, Process
-from langchain_groq import ChatGroq
-import pandas as pd
-from pydantic import BaseModel, Field
-import mlflow
+from pydantic import BaseModel, Field, PrivateAttr, ValidationError
 import streamlit as st
-import sympy as sp
-import matplotlib.pyplot as plt
-from math_tutor.utils.file_processor import FileProcessor
-from math_tutor.utils.long_term_memory import LongTermMemory
+from math_tutor.utils.lazy_import import LazyImport
+from math_tutor.utils.exercise_pool import get_shared_pool
+from math_tutor.utils.llm_cache import LLMCache
+from math_tutor.utils.metrics import metrics
+from math_tutor.utils.structured_llm import StructuredLLM, StructuredOutputError, StructuredStream, parse_structured_output
+from math_tutor.utils.attempt_store import AttemptStore
+from math_tutor.utils.single_flight import single_flight
+from math_tutor.utils.llm_scheduler import LLMBudgetExceeded, LLMScheduler, estimate_tokens, get_scheduler
+from math_tutor.utils.resilience import DeadlineExceeded, LLMUnavailable, get_resilient_caller
+from math_tutor.utils.model_router import ModelRouter, ModelTier, default_tiers
+from math_tutor.utils.async_runner import get_async_runner
+from math_tutor.utils.job_executor import Job, get_job_executor
+from math_tutor.utils.startup import StartupOrchestrator
+from math_tutor.utils.profile_cache import ProfileCache
+from math_tutor.utils.student_store import ProfileConflict, new_student_id, student_store_from_env
+from math_tutor.utils.write_behind import get_write_behind
+
+if TYPE_CHECKING:
+    from math_tutor.utils.symbolic_grader import GradeResult
+
+# Dépendances lourdes (plusieurs secondes d'import au total): chargées au premier usage,
+# pour que les pages et les tests qui importent ce module démarrent vite (voir IMPORT_BUDGET_MS)
+chromadb = LazyImport("chromadb")
+mlflow = LazyImport("mlflow")
+pd = LazyImport("pandas")
+Agent = LazyImport("crewai", "Agent")
+Task = LazyImport("crewai", "Task")
+Crew = LazyImport("crewai", "Crew")
+Process = LazyImport("crewai", "Process")
+ChatGroq = LazyImport("langchain_groq", "ChatGroq")
+HumanMessage = LazyImport("langchain_core.messages", "HumanMessage")
+SystemMessage = LazyImport("langchain_core.messages", "SystemMessage")
+cassette_from_env = LazyImport("math_tutor.utils.llm_cassette", "cassette_from_env")
+FileProcessor = LazyImport("math_tutor.utils.file_processor", "FileProcessor")
+SymbolicGrader = LazyImport("math_tutor.utils.symbolic_grader", "SymbolicGrader")
+ParametricExerciseGenerator = LazyImport("math_tutor.utils.exercise_templates", "ParametricExerciseGenerator")
 
 def setup_mlflow():
     mlflow.set_tracking_uri(os.getenv('MLFLOW_TRACKING_URI', 'http://localhost:5000'))
@@ -34,6 +65,8 @@ class StudentProfile(BaseModel):
     objectives_completed: List[str] = Field(default_factory=list)
     created_at: str = Field(default_factory=lambda: datetime.now().isoformat())
     last_session: Optional[str] = None
+    # Version persistée sur laquelle reposent les modifications (verrouillage optimiste)
+    version: int = 0
 
 class Exercise(BaseModel):
     exercise: str = Field(description="Une question unique et précise adaptée à l'objectif")
@@ -51,6 +84,13 @@ class EvaluationResult(BaseModel):
     detailed_explanation: str = Field(..., description="Explication mathématique complète")
     step_by_step_correction: str = Field(..., description="Correction étape par étape")
     recommendations: List[str] = Field(..., description="Recommandations personnalisées")
+    # Verdict seul (évaluation en deux temps): explication, correction et recommandations à générer
+    _details_pending: bool = PrivateAttr(default=False)
+
+class EvaluationVerdict(BaseModel):
+    is_correct: bool = Field(..., description="Indique si la réponse est correcte")
+    error_type: Optional[str] = Field(None, description="Type d'erreur identifié")
+    feedback: str = Field(..., description="Une phrase de retour pour l'élève")
 
 class CoachPersonal(BaseModel):
     motivation: str = Field(..., description="message motivant")
@@ -58,6 +98,14 @@ class CoachPersonal(BaseModel):
     tip: str = Field(..., description="astuce pratique")
     encouragement: List[str] = Field(..., description="phrase positive")
 
+class ExerciseBatch(BaseModel):
+    # Éléments validés un par un dans Exercise: un exercice mal formé n'invalide pas le lot
+    exercises: List[Dict[str, Any]] = Field(..., description="Exercices distincts, chacun au format Exercise")
+
+class EvaluationWithCoaching(BaseModel):
+    evaluation: EvaluationResult = Field(..., description="Évaluation complète de la réponse")
+    coaching: CoachPersonal = Field(..., description="Coaching personnalisé adapté à cette évaluation")
+
 class LearningObjectives:
     def __init__(self, objectives_file="objectifs.json"):
         self.objectives_file = Path(objectives_file)
@@ -74,9 +122,19 @@ class LearningObjectives:
             self.objectives_order = []
 
 class StudentManager:
-    def __init__(self, data_dir="students_data", enable_memory: bool = True):
+    def __init__(self, data_dir="students_data", enable_memory: bool = True, write_behind: bool = False):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
+        # Sauvegardes différées et regroupées par élève (STUDENT_WRITE_DELAY), hors du thread Streamlit
+        self.write_queue = get_write_behind() if write_behind and float(os.getenv("STUDENT_WRITE_DELAY", "0.5")) > 0 else None
+        # Conflits de version des écritures différées, signalés à la prochaine sauvegarde ou lecture:
+        # student_id -> (profil de la session dont l'écriture a été refusée, erreur)
+        self._conflicts: Dict[str, Tuple[Any, ProfileConflict]] = {}
+        self._conflicts_lock = threading.Lock()
+        # Fichiers JSON (défaut) ou base SQLite indexée (STUDENT_STORE=sqlite)
+        self.store = student_store_from_env(self.data_dir)
+        # Profils validés en mémoire (STUDENT_CACHE_SIZE), invalidés par la version du stockage
+        self.cache = ProfileCache()
         self.client = chromadb.PersistentClient(path=str(self.data_dir / "memory_db"))
 
         self.long_term_memory = self._initialize_memory(enable_memory)
@@ -114,37 +172,139 @@ class StudentManager:
             return None
 
     def create_student(self, name=None):
-        student_id = datetime.now().strftime("%Y%m%d%H%M%S%f")[:16]
-        profile = StudentProfile(
-            student_id=student_id,
-            name=name,
-            last_session=datetime.now().isoformat()
-        )
-        self.save_student(profile)
-        return profile
+        while True:
+            profile = StudentProfile(
+                student_id=new_student_id(),
+                name=name,
+                last_session=datetime.now().isoformat()
+            )
+            # L'identifiant est communiqué à l'élève: profil écrit (hors file) avant de le rendre.
+            # Version 0: refusé si un autre processus vient de créer le même identifiant
+            try:
+                self._persist(profile, raise_errors=True)
+                return profile
+            except ProfileConflict:
+                metrics.increment("student_id_collisions")
+            except Exception as e:
+                st.error(f"Erreur de sauvegarde: {str(e)}")
+                return profile
+
+    def _write_key(self, student_id, source=None):
+        # Regroupement par profil de session: deux onglets du même élève ne s'effacent pas
+        # l'un l'autre dans la file, le second écrit reçoit un conflit de version
+        key = (str(self.data_dir.resolve()), student_id)
+        return key if source is None else key + (id(source),)
+
+    def _take_conflict(self, student_id, source=None) -> Optional[ProfileConflict]:
+        """Conflit en attente pour cet élève (pour ce profil de session si `source` est donné)"""
+        with self._conflicts_lock:
+            conflict = self._conflicts.get(student_id)
+            if conflict is None or (source is not None and conflict[0] is not source):
+                return None
+            del self._conflicts[student_id]
+        metrics.increment("student_conflicts_reported")
+        return conflict[1]
+
+    def _reload_after_conflict(self, student) -> bool:
+        """Écriture différée refusée (profil réécrit ailleurs): le profil de la session est
+        rechargé en place depuis le stockage et l'élève est prévenu. True si c'était le cas."""
+        conflict = self._take_conflict(student.student_id, source=student)
+        if conflict is None:
+            return False
+        st.error(f"⚠️ Profil modifié dans une autre session: rechargé, vos dernières modifications "
+                 f"n'ont pas été enregistrées ({str(conflict)})")
+        # Lecture directe (pas `load_student`): le conflit d'une autre session reste à elle
+        self.write_queue.flush(self._write_key(student.student_id))
+        self.cache.invalidate(student.student_id)
+        try:
+            fresh = StudentProfile(**self.store.load(student.student_id))
+        except Exception as e:
+            st.error(f"Erreur de chargement: {str(e)}")
+            return True
+        for name in StudentProfile.model_fields:
+            setattr(student, name, getattr(fresh, name))
+        return True
 
     def load_student(self, student_id):
-        student_file = self.data_dir / f"{student_id}.json"
-        if not student_file.exists():
-            return None
+        if self.write_queue:
+            # Lire ses propres écritures: les sauvegardes en attente de cet élève sont faites d'abord
+            self.write_queue.flush(self._write_key(student_id))
+            if self._take_conflict(student_id):
+                st.error("⚠️ Profil modifié dans une autre session: dernière version rechargée")
+                self.cache.invalidate(student_id)
+        start = perf_counter()
         try:
-            with open(student_file, 'r', encoding='utf-8') as f:
-                return StudentProfile(**json.load(f))
+            # Version lue avant le profil: une écriture concurrente rend l'entrée périmée, jamais l'inverse
+            version = self.store.version(student_id)
+            if version is None:
+                return None
+            student = self.cache.get(student_id, version)
+            if student is None:
+                student = StudentProfile(**self.store.load(student_id))
+                self.cache.put(student_id, student.version, student)
+            metrics.observe("student_load_seconds", perf_counter() - start)
+            return student
         except Exception as e:
             st.error(f"Erreur de chargement: {str(e)}")
             return None
 
-    def save_student(self, student):
-        # Sauvegarde standard
-        student_file = self.data_dir / f"{student.student_id}.json"
+    def find_students(self, name=None, objective=None, since=None, limit=50):
+        """Résumés des profils par nom, objectif courant ou dernière session (ISO)"""
+        return self.store.find(name=name, objective=objective, since=since, limit=limit)
+
+    def save_student(self, student, durable: bool = False):
+        """Sauvegarde le profil; avec la file d'écriture, seulement planifiée sauf si `durable`
+        (retourne alors True une fois le profil écrit)"""
+        if not self.write_queue:
+            return self._persist(student)
+        if self._reload_after_conflict(student):
+            return False
+        # Copie superficielle: les sauvegardes suivantes remplacent celle-ci tant qu'elle n'est pas écrite
+        snapshot = student.model_copy(update={
+            "learning_history": list(student.learning_history),
+            "objectives_completed": list(student.objectives_completed),
+        })
+        key = self._write_key(student.student_id, source=student)
+        self.write_queue.submit(key, lambda: self._write_behind(snapshot, student))
+        if durable:
+            if not self.write_queue.flush(key):
+                if not self._reload_after_conflict(student):
+                    st.error("Erreur de sauvegarde: profil non écrit")
+                return False
+        return True
+
+    def _write_behind(self, snapshot, student):
+        """Écriture exécutée par la file: un conflit n'est pas retenté mais gardé pour la session"""
         try:
-            with open(student_file, 'w', encoding='utf-8') as f:
-                json.dump(student.model_dump(), f, indent=4)
+            self._persist(snapshot, raise_errors=True, source=student)
+        except ProfileConflict as e:
+            with self._conflicts_lock:
+                self._conflicts[student.student_id] = (student, e)
+            raise
+
+    def flush(self, timeout=None) -> bool:
+        """Attend l'écriture de toutes les sauvegardes en attente"""
+        return self.write_queue.flush(timeout=timeout) if self.write_queue else True
+
+    def _persist(self, student, raise_errors: bool = False, source=None):
+        # En-tête du profil remplacé atomiquement, historique en ajout seul
+        try:
+            if source is not None:
+                # Copie différée: la version de base est celle du profil de la session au moment d'écrire
+                student.version = source.version
+            self.store.save(student)
+            if source is not None:
+                source.version = student.version
+            self.cache.put(student.student_id, student.version, student)
             
             # Sauvegarde dans ChromaDB
             self._sync_to_long_term_memory(student)
+            return True
         except Exception as e:
+            if raise_errors:
+                raise  # file d'écriture: nouvelle tentative (sauf conflit), erreur rapportée par `flush`
             st.error(f"Erreur de sauvegarde: {str(e)}")
+            return False
     # def _safe_init_memory(self):
     #     """Initialisation avec fallback silencieux"""
     #     if not self.memory_enabled:
@@ -188,7 +348,7 @@ class StudentManager:
                     self._handle_sync_error(e, student)
                 else:
                     print(f"⚠️ Tentative {attempt + 1} échouée, nouvelle tentative...")
-                    time.sleep(1)  # Pause avant réessai
+                    sleep(1)  # Pause avant réessai
 
     def _handle_sync_error(self, error: Exception, student: StudentProfile):
         """Gestion centralisée des erreurs avec journalisation"""
@@ -215,34 +375,108 @@ class StudentManager:
             print(f"✅ Sauvegarde secours créée: {backup_file}")
         except Exception as backup_error:
             print(f"❌ Échec sauvegarde secours: {str(backup_error)}")
-class MathTutoringSystem:
-    def __init__(self):
-        self.llm = None
-        try:
-            self.llm = ChatGroq(
-                api_key=os.getenv('GROQ_API_KEY'),
-                model="llama-3.3-70b-versatile",  
-                temperature=0.7
-            )
-            self.setup_mlflow()
-        except Exception as e:
-            st.error(f"Mode hors ligne activé: {str(e)}")
-            self.llm = None 
-        
-        self.file_processor = FileProcessor()
-        self.long_term_memory = None 
 
+
+class TutorResources:
+    """Ressources lourdes du tuteur: clients LLM, agents, mémoire Chroma, extraction de fichiers,
+    cache de réponses, run MLflow... Construites une fois par processus (`st.cache_resource`
+    dans app.py) et partagées par toutes les sessions; `MathTutoringSystem` n'y ajoute que
+    l'état de la session."""
+
+    def __init__(self, parallel: Optional[bool] = None):
+        start = perf_counter()
+        self.llm = None
+        self.mlflow_run = None
+        self.temperature = 0.7
+        # Niveau de modèle par site d'appel (grand modèle par défaut, petit pour le coaching)
+        self.model_router = ModelRouter(self._chat_client, default_tiers(self.temperature))
+        self.model_name = self.model_router.default_tier.model
+        self._tier_clients: Dict[Tuple[str, str], Any] = {}
         # Initialiser les agents à None d'abord
         self.exercise_creator = None
         self.evaluator = None
         self.personal_coach = None
-        
-        self.student_manager = StudentManager()
-        self.learning_objectives = LearningObjectives()
-        self.current_student = None
-        
-        # Configurer les agents puis MLflow
-        self._setup_agents()
+
+        # Initialisations indépendantes (client LLM, MLflow, Tesseract, Chroma et modèle
+        # d'embeddings, objectifs, correcteur symbolique) menées en parallèle; les agents
+        # attendent le client LLM, les modèles d'exercices attendent les objectifs
+        template_seed = os.getenv("EXERCISE_TEMPLATE_SEED")
+        self.startup = StartupOrchestrator(parallel=parallel)
+        self.startup.add("llm", self._init_llm)
+        self.startup.add("mlflow", self._connect_mlflow)
+        self.startup.add("file_processor", FileProcessor)
+        # Connexions SQLite de Chroma propres à chaque thread: client créé dans le thread appelant
+        self.startup.add("student_manager", lambda: StudentManager(write_behind=True), in_caller=True)
+        self.startup.add("objectives", LearningObjectives)
+        self.startup.add("symbolic_grader", lambda: SymbolicGrader() if os.getenv("SYMBOLIC_GRADER", "1") != "0" else None)
+        self.startup.add("exercise_templates", lambda: ParametricExerciseGenerator(
+            self.startup.result("objectives").objectives,
+            seed=int(template_seed) if template_seed else None
+        ), after=["objectives"])
+        self.startup.add("agents", self._setup_agents, after=["llm"])
+        self.startup.run()
+
+        # Les messages Streamlit sont émis ici: depuis les threads de démarrage, ils seraient perdus
+        if "llm" in self.startup.errors:
+            st.error(f"Mode hors ligne activé: {str(self.startup.errors['llm'])}")
+            self.llm = None
+        elif "mlflow" not in self.startup.errors:
+            self.setup_mlflow()
+            self._log_agents_config()
+        else:
+            st.error(f"Avertissement MLflow: {str(self.startup.errors['mlflow'])}")
+
+        self.file_processor = self.startup.result("file_processor")
+        self.student_manager = self.startup.result("student_manager")
+        self.learning_objectives = self.startup.result("objectives")
+        self.symbolic_grader = self.startup.result("symbolic_grader")
+        # Génération locale par modèles paramétrés: "local" en mode principal, sinon secours du LLM
+        self.generation_mode = os.getenv("EXERCISE_GENERATION_MODE", "llm")
+        self.exercise_templates = self.startup.result("exercise_templates")
+        self.startup.result("agents")
+
+        self.llm_cache = LLMCache(self.student_manager.data_dir / "llm_cache")
+        # "direct": un appel au client de chat validé par Pydantic; "crew": boucle d'agent CrewAI
+        self.llm_backend = os.getenv("LLM_BACKEND", "direct")
+        self.structured_llm = StructuredLLM(self.llm) if self.llm else None
+        # Requêtes identiques simultanées (toutes sessions confondues) regroupées en un seul appel
+        self.single_flight = single_flight if os.getenv("SINGLE_FLIGHT", "1") != "0" else None
+        # Budgets requêtes/tokens par minute partagés par le processus, avec priorités
+        self.llm_scheduler = get_scheduler()
+        # Échéance par appel, relance parallèle (LLM_HEDGE_AFTER) et disjoncteur partagés par le processus
+        self.llm_resilience = get_resilient_caller()
+        # Évaluation et coaching dans un seul appel LLM (au lieu de deux appels successifs)
+        self.combined_evaluation = os.getenv("COMBINED_EVALUATION", "0") == "1"
+        # Verdict immédiat (réponse courte), explication détaillée générée seulement à la demande
+        self.two_phase_evaluation = os.getenv("TWO_PHASE_EVALUATION", "1") != "0"
+        # Champs narratifs (feedback, explication, motivation, stratégie) affichés au fil de la génération
+        self.streaming = os.getenv("LLM_STREAMING", "1") != "0"
+        # Réserve d'exercices pré-générés, partagée par toutes les sessions du processus
+        # (inutile hors ligne: le fallback est instantané)
+        self.exercise_pool = get_shared_pool(self._prefetch_exercise, self._prefetch_exercises) if self.llm or self.generation_mode == "local" else None
+        metrics.observe("tutor_resources_init_seconds", perf_counter() - start)
+
+    def _prefetch_exercise(self, objective_name: str, level: int) -> Exercise:
+        """Génération pour la réserve, hors de toute session (aucun élève): priorité la plus
+        basse auprès de l'ordonnanceur LLM"""
+        with LLMScheduler.background():
+            return MathTutoringSystem(self)._build_exercise(objective_name, level)
+
+    def _prefetch_exercises(self, objective_name: str, level: int, n: int) -> List[Exercise]:
+        with LLMScheduler.background():
+            return MathTutoringSystem(self).generate_exercises(objective_name, level, n)
+
+    def _init_llm(self):
+        self.llm = self.model_router.client(self.model_router.default_tier)
+
+    @staticmethod
+    def _chat_client(tier: ModelTier):
+        # LLM_CASSETTE: réponses enregistrées/rejouées pour des mesures reproductibles hors ligne
+        return cassette_from_env(tier.model, tier.temperature, lambda: ChatGroq(
+            api_key=os.getenv('GROQ_API_KEY'),
+            model=tier.model,
+            temperature=tier.temperature
+        ))
 
     def _setup_agents(self):
         if self.llm:
@@ -283,7 +517,10 @@ class MathTutoringSystem:
             memory=True,  
             max_iter=10   
         )
-        if hasattr(self, 'mlflow_run'):
+
+    def _log_agents_config(self):
+        """Configuration des agents dans le run MLflow (thread appelant, après `setup_mlflow`)"""
+        if self.mlflow_run and self.exercise_creator:
             try:
                 mlflow.log_dict({
                     "exercise_creator": self.exercise_creator.model_dump(),
@@ -293,6 +530,52 @@ class MathTutoringSystem:
             except Exception as e:
                 st.error(f"Erreur lors du logging des agents: {str(e)}")
 
+    @staticmethod
+    def _connect_mlflow():
+        """Serveur de suivi et expérience (appels réseau: en parallèle des autres initialisations)"""
+        mlflow.set_tracking_uri(os.getenv('MLFLOW_TRACKING_URI', 'http://localhost:5000'))
+        mlflow.set_experiment("Math_Tutoring_System")
+
+    def setup_mlflow(self):
+        """Ouvre le run MLflow avec gestion des erreurs (dans le thread appelant: le run actif
+        de MLflow est propre à chaque thread)"""
+        try:
+            self.mlflow_run = mlflow.start_run()
+            
+            # Enregistrez les paramètres du modèle
+            mlflow.log_params({
+                "llm_model": "llama-3.3-70b",
+                "temperature": 0.7,
+                "max_iter": 15
+            })
+        except Exception as e:
+            st.error(f"Avertissement MLflow: {str(e)}")
+            self.mlflow_run = None
+
+
+class MathTutoringSystem:
+    """Session d'un élève: élève courant, tentatives et tâches en cours.
+
+    Les ressources lourdes viennent de `resources`: celles de l'application (partagées par
+    toutes les sessions), ou construites pour cette seule instance si absentes. Un attribut
+    absent de la session est lu dans les ressources; une affectation sur la session ne
+    concerne qu'elle."""
+
+    def __init__(self, resources: Optional[TutorResources] = None):
+        self.resources = resources or TutorResources()
+        self.current_student = None
+        self.long_term_memory = None
+        self.attempts = AttemptStore()
+        # Clé des tâches asynchrones de cette session (annulées à la resoumission ou au changement de page)
+        self.session_id = uuid.uuid4().hex
+
+    def __getattr__(self, name: str):
+        # Appelé seulement pour les attributs absents de la session
+        if name == "resources":
+            raise AttributeError(name)
+        return getattr(self.resources, name)
+
+
     def load_model_from_registry(model_name: str, stage: str = "Production"):
         return mlflow.pyfunc.load_model(f"models:/{model_name}/{stage}")
     
@@ -349,24 +632,6 @@ class MathTutoringSystem:
                 }
             )
     
-    def setup_mlflow(self):
-        """Configure le suivi MLflow avec gestion des erreurs"""
-        try:
-            mlflow.set_tracking_uri(os.getenv('MLFLOW_TRACKING_URI', 'http://localhost:5000'))
-            mlflow.set_experiment("Math_Tutoring_System")
-            self.mlflow_run = mlflow.start_run()
-            
-            # Enregistrez les paramètres du modèle
-            mlflow.log_params({
-                "llm_model": "llama-3.3-70b",
-                "temperature": 0.7,
-                "max_iter": 15
-            })
-        except Exception as e:
-            st.error(f"Avertissement MLflow: {str(e)}")
-            self.mlflow_run = None
-
-
     def get_current_objective_info(self):
         """Retourne les infos de l'objectif actuel pour Streamlit"""
         if not self.current_student:
@@ -395,67 +660,202 @@ class MathTutoringSystem:
             "history": pd.DataFrame(self.current_student.learning_history)
         }
 
-    def _generate_exercise(self) -> Optional[Exercise]:
-        """Génère un exercice adapté à l'objectif actuel avec meilleure gestion des erreurs"""
+    def next_exercise(self) -> Optional[Exercise]:
+        """Sert un exercice depuis la réserve si possible, sinon le génère immédiatement"""
+        if not self.current_student or not self.current_student.current_objective:
+            return self._generate_exercise()
+
+        objective_name = self.current_student.current_objective
+        level = self.current_student.level
+        exercise = None
+        if self.exercise_pool:
+            exercise = self.exercise_pool.draw(objective_name, level)
+        if exercise is None:
+            exercise = self._generate_exercise()
+
+        self._prefetch_next_level(objective_name, level)
+        return exercise
+
+    def _prefetch_next_level(self, objective_name: str, level: int):
+        """Pré-génère les exercices du niveau suivant probable (ou du prochain objectif)"""
+        if not self.exercise_pool:
+            return
+        objective = self.learning_objectives.objectives.get(objective_name, {})
+        if str(level + 1) in objective.get("niveaux", {}):
+            self.exercise_pool.prefetch(objective_name, level + 1)
+            return
+        order = self.learning_objectives.objectives_order
+        if objective_name in order and order.index(objective_name) + 1 < len(order):
+            self.exercise_pool.prefetch(order[order.index(objective_name) + 1], 1)
+
+    def _build_exercise(self, objective_name: str, level: int) -> Exercise:
+        """Cœur de génération sans Streamlit ni MLflow, utilisable en arrière-plan.
+        Lève une exception en cas d'échec (pas de fallback)."""
+        if self.generation_mode == "local":
+            exercise = self._local_exercise(objective_name, level)
+            if exercise is None:
+                raise ValueError(f"Aucun modèle local pour {objective_name} / niveau {level}")
+            return exercise
+        if not self.llm:
+            raise RuntimeError("LLM indisponible")
+        objective, level_info = self._level_info(objective_name, level)
+
+        return self._kickoff(
+            "exercise_generation",
+            self.exercise_creator,
+            self._build_exercise_prompt(objective_name, objective, level_info),
+            "Un objet Exercise complet avec exercise, solution, hints, difficulty et concept",
+            Exercise,
+            verbose=True
+        )
+
+    def _build_exercise_prompt(self, objective_name: str, objective: Dict, level_info: Dict) -> str:
+        # Prompt plus détaillé
+        return f"""
+        Tu es un professeur de mathématiques expert. Crée un exercice avec:
+        - Objectif: {objective['description']}
+        - Niveau: {level_info['name']} 
+        - Type: {objective_name}
+        - Basé sur: {level_info['example_functions'][0]}
+
+        L'exercice doit:
+        1. Être clair et précis
+        2. Avoir une solution détaillée
+        3. Inclure 2-3 indices pédagogiques
+        4. Correspondre au niveau de difficulté
+        """
+
+    def _level_info(self, objective_name: str, level: int) -> Tuple[Dict, Dict]:
+        objective = self.learning_objectives.objectives.get(objective_name)
+        if not objective:
+            raise KeyError(f"Objectif non trouvé: {objective_name}")
+        level_info = objective["niveaux"].get(str(level))
+        if not level_info:
+            raise KeyError(f"Niveau non trouvé: {level}")
+        return objective, level_info
+
+    def generate_exercises(self, objective_name: str, level: int, n: int) -> List[Exercise]:
+        """Génère n exercices distincts en un seul appel structuré, validés un par un.
+        Les éléments invalides ou en double sont écartés puis redemandés une fois;
+        lève une exception si aucun exercice n'est obtenu."""
+        if n <= 0:
+            return []
+        if self.generation_mode == "local":
+            exercises = [e for e in (self._local_exercise(objective_name, level) for _ in range(n)) if e]
+            if not exercises:
+                raise ValueError(f"Aucun modèle local pour {objective_name} / niveau {level}")
+            return exercises
+        if not self.llm:
+            raise RuntimeError("LLM indisponible")
+        objective, level_info = self._level_info(objective_name, level)
+
+        exercises: List[Exercise] = []
+        seen = set()
+        tokens = 0
+        start = perf_counter()
+        for _ in range(2):  # lot initial + une relance pour les éléments écartés
+            missing = n - len(exercises)
+            if missing <= 0:
+                break
+            usage: Dict = {}
+            try:
+                batch = self._coerce_output(self._kickoff(
+                    "exercise_batch",
+                    self.exercise_creator,
+                    self._build_batch_prompt(objective, level_info, objective_name, missing,
+                                             [e.exercise for e in exercises]),
+                    f"Un objet ExerciseBatch contenant exactement {missing} exercices",
+                    ExerciseBatch,
+                    usage=usage
+                ), ExerciseBatch)
+            except (ValidationError, ValueError) as e:
+                print(f"⚠️ Lot d'exercices inexploitable: {str(e)}")
+                metrics.increment("exercise_batch_invalid", missing)
+                continue
+            finally:
+                tokens += usage.get("total_tokens", 0)
+
+            for item in batch.exercises:
+                if len(exercises) >= n:
+                    break
+                try:
+                    # Difficulté et concept imposés: la réserve est indexée par (objectif, niveau)
+                    exercise = Exercise.model_validate({**item, "difficulty": level_info["name"], "concept": objective_name})
+                except (ValidationError, TypeError):
+                    metrics.increment("exercise_batch_invalid")
+                    continue
+                text = " ".join(exercise.exercise.lower().split())
+                if text in seen:
+                    metrics.increment("exercise_batch_duplicate")
+                    continue
+                seen.add(text)
+                exercises.append(exercise)
+
+        if not exercises:
+            raise ValueError(f"Aucun exercice valide pour {objective_name} / niveau {level}")
+        metrics.increment("exercise_batch_generated", len(exercises))
+        metrics.observe("exercise_batch_seconds_per_exercise", (perf_counter() - start) / len(exercises))
+        if tokens:
+            metrics.observe("exercise_batch_tokens_per_exercise", tokens / len(exercises))
+        return exercises
+
+    def _build_batch_prompt(self, objective: Dict, level_info: Dict, objective_name: str, count: int,
+                            avoid: List[str]) -> str:
+        avoid_block = "\n".join(f"        - {text}" for text in avoid)
+        return f"""
+        Tu es un professeur de mathématiques expert. Crée {count} exercices DIFFÉRENTS avec:
+        - Objectif: {objective['description']}
+        - Niveau: {level_info['name']}
+        - Type: {objective_name}
+        - Basés sur: {', '.join(level_info['example_functions'])}
+
+        Chaque exercice doit:
+        1. Être clair et précis, avec une fonction différente des autres
+        2. Avoir une solution détaillée
+        3. Inclure 2-3 indices pédagogiques
+        4. Correspondre au niveau de difficulté
+        {"Ne reprends aucun de ces exercices déjà créés:" if avoid else ""}
+{avoid_block}
+        Champs de chaque élément de "exercises": exercise, solution, hints, difficulty, concept
+        """
+
+    def _local_exercise(self, objective_name: str, level: int) -> Optional[Exercise]:
+        """Exercice généré sans LLM à partir des fonctions d'exemple du niveau"""
+        try:
+            with metrics.timer("local_generation_seconds"):
+                fields = self.exercise_templates.generate(objective_name, level)
+            return Exercise(**fields) if fields else None
+        except Exception as e:
+            print(f"⚠️ Génération locale impossible: {str(e)}")
+            return None
+
+    def _generate_exercise(self, objective_name: Optional[str] = None, level: Optional[int] = None) -> Optional[Exercise]:
+        """Génère un exercice adapté à l'objectif actuel (ou à l'objectif/niveau donnés)"""
         with mlflow.start_span("exercise_generation"):
             # Vérification de l'étudiant et de l'objectif
-            if not self.current_student or not self.current_student.current_objective:
-                st.error("Aucun étudiant ou objectif défini")
-                return None
-
-            objective = self.learning_objectives.objectives.get(self.current_student.current_objective)
+            if objective_name is None:
+                if not self.current_student or not self.current_student.current_objective:
+                    st.error("Aucun étudiant ou objectif défini")
+                    return None
+                objective_name = self.current_student.current_objective
+            if level is None:
+                level = self.current_student.level if self.current_student else 1
+
+            objective = self.learning_objectives.objectives.get(objective_name)
             if not objective:
-                st.error(f"Objectif non trouvé: {self.current_student.current_objective}")
+                st.error(f"Objectif non trouvé: {objective_name}")
                 return None
 
-            level_info = objective["niveaux"].get(str(self.current_student.level))
+            level_info = objective["niveaux"].get(str(level))
             if not level_info:
-                st.error(f"Niveau non trouvé: {self.current_student.level}")
+                st.error(f"Niveau non trouvé: {level}")
                 return None
 
-            # Fallback de base
-            default_exercise = Exercise(
-                exercise=f"Résoudre: {level_info['example_functions'][0]}",
-                solution=f"Solution: {level_info['objectives'][0]}",
-                hints=["Appliquez les méthodes appropriées"],
-                difficulty=level_info['name'],
-                concept=self.current_student.current_objective
-            )
-
-            if not self.llm:
-                return default_exercise
+            if not self.llm or self.generation_mode == "local":
+                return self._default_exercise(objective_name, level, level_info)
 
             try:
-                # Prompt plus détaillé
-                prompt = f"""
-                Tu es un professeur de mathématiques expert. Crée un exercice avec:
-                - Objectif: {objective['description']}
-                - Niveau: {level_info['name']} 
-                - Type: {self.current_student.current_objective}
-                - Basé sur: {level_info['example_functions'][0]}
-
-                L'exercice doit:
-                1. Être clair et précis
-                2. Avoir une solution détaillée
-                3. Inclure 2-3 indices pédagogiques
-                4. Correspondre au niveau de difficulté
-                """
-
-                task = Task(
-                    description=prompt,
-                    agent=self.exercise_creator,
-                    expected_output="Un objet Exercise complet avec exercise, solution, hints, difficulty et concept",
-                    output_pydantic=Exercise
-                )
-
-                crew = Crew(
-                    agents=[self.exercise_creator],
-                    tasks=[task],
-                    process=Process.sequential,
-                    verbose=True 
-                )
-
-                result = crew.kickoff()
+                result = self._build_exercise(objective_name, level)
                 # st.code("\nEXercice:", result['exercise'])
                 # st.code("\nconcept:", result['concept'] )
                 # st.code("\ndifficulty:", result['difficulty'])
@@ -467,7 +867,7 @@ class MathTutoringSystem:
                     try:
                         # Récupérer le niveau actuel comme métrique numérique
                         mlflow.log_metrics({
-                            "student_level": self.current_student.level,
+                            "student_level": level,
                             "hints_count": len(result.hints)
                         })
                         
@@ -484,34 +884,417 @@ class MathTutoringSystem:
 
                 return result
 
+            except LLMUnavailable as e:
+                print(f"⚠️ {str(e)}: exercice local")
+                return self._default_exercise(objective_name, level, level_info)
             except Exception as e:
                 st.error(f"Erreur génération exercice: {str(e)}")
-                return default_exercise
+                return self._default_exercise(objective_name, level, level_info)
+
+    def _default_exercise(self, objective_name: str, level: int, level_info: Dict) -> Exercise:
+        """Fallback: exercice paramétré local, sinon l'exemple brut du niveau.
+        Calculé seulement quand il sert (la résolution sympy n'est pas gratuite)."""
+        return self._local_exercise(objective_name, level) or Exercise(
+            exercise=f"Résoudre: {level_info['example_functions'][0]}",
+            solution=f"Solution: {level_info['objectives'][0]}",
+            hints=["Appliquez les méthodes appropriées"],
+            difficulty=level_info['name'],
+            concept=objective_name
+        )
             
-    def _evaluate_response(self, exercise: Exercise, answer: Union[str, Path]) -> EvaluationResult:
-        """Évaluation robuste avec gestion directe Pydantic"""
-        with mlflow.start_span("answer_evaluation"):
-            # Cas fichier (PDF/image)
-            if isinstance(answer, (Path, str)) and Path(answer).exists():
+    def _kickoff(self, call_site: str, agent: "Agent", description: str, expected_output: str,
+                 output_model: type, verbose: bool = False, usage: Optional[Dict] = None):
+        """Exécute une tâche (appel direct ou CrewAI) en passant par le cache de réponses si le site l'autorise.
+        `usage`, si fourni, reçoit les requêtes et tokens consommés (rien sur un succès du cache
+        ni quand l'appel est regroupé avec une requête identique déjà en cours)."""
+        tier = self.model_router.route(call_site)
+        request_key = LLMCache.make_key(description, agent.role, tier.model, tier.temperature)
+        cache_key, cached = self._cache_lookup(call_site, request_key, output_model)
+        if cached is not None:
+            return cached
+
+        def call():
+            return self._call_llm(call_site, agent, description, expected_output, output_model,
+                                  verbose, usage, cache_key, tier)
+
+        if self.single_flight:
+            return self.single_flight.do(f"{call_site}:{output_model.__name__}:{request_key}", call)
+        return call()
+
+    def _call_llm(self, call_site: str, agent: "Agent", description: str, expected_output: str,
+                  output_model: type, verbose: bool, usage: Optional[Dict], cache_key: Optional[str],
+                  tier: Optional[ModelTier] = None):
+        """Appel réel au modèle (direct ou CrewAI) sur le niveau routé, soumis à l'ordonnanceur,
+        puis écriture dans le cache"""
+        usage = usage if usage is not None else {}
+        tier = tier or self.model_router.default_tier
+        estimated_tokens = estimate_tokens(description, expected_output)
+        with self.llm_scheduler.slot(call_site, estimated_tokens, usage), \
+                metrics.timer(f"llm_{call_site}_seconds"):
+            start = perf_counter()
+            if self.llm_backend == "direct" and self.structured_llm:
+                structured_llm = self._tier_client(tier, "structured")
+
+                def attempt():
+                    attempt_usage = {}
+                    return structured_llm.invoke(
+                        call_site,
+                        f"Tu es {agent.role}. {agent.goal}\n{agent.backstory}",
+                        f"{description}\n\nRésultat attendu: {expected_output}",
+                        output_model,
+                        usage=attempt_usage
+                    ), attempt_usage
+
+                options = {"hedge": True,
+                           "hedge_permit": lambda: self._hedge_permit(call_site, estimated_tokens)}
+            else:
+                tier_agent = self._tier_client(tier, "agent", agent)
+
+                def attempt():
+                    attempt_usage = {}
+                    return self._crew_kickoff(call_site, tier_agent, description, expected_output,
+                                              output_model, verbose, attempt_usage), attempt_usage
+
+                # Boucle d'agent: échéance et disjoncteur, sans relance parallèle
+                options = {}
+            try:
+                result, attempt_usage = self.llm_resilience.call(call_site, attempt, **options)
+            except DeadlineExceeded:
+                # Un appel abandonné à l'échéance compte comme un appel lent pour le routage
+                self.model_router.record(tier, perf_counter() - start)
+                raise
+            self.model_router.record(tier, perf_counter() - start)
+            usage.update(attempt_usage)
+
+        self._cache_store(call_site, cache_key, result, output_model)
+        return result
+
+    async def _akickoff(self, call_site: str, agent: "Agent", description: str, expected_output: str,
+                        output_model: type, usage: Optional[Dict] = None):
+        """Version asynchrone de `_kickoff` sur le client asynchrone (chemin direct): cache, routage,
+        ordonnanceur, échéance et disjoncteur identiques, sans regroupement ni relance parallèle.
+        Annuler la coroutine interrompt la requête en cours."""
+        if not (self.llm_backend == "direct" and self.structured_llm):
+            # Boucle d'agent CrewAI synchrone: exécutée dans un thread, l'annulation ne l'interrompt pas
+            return await asyncio.to_thread(self._kickoff, call_site, agent, description, expected_output,
+                                           output_model, False, usage)
+        usage = usage if usage is not None else {}
+        tier = self.model_router.route(call_site)
+        request_key = LLMCache.make_key(description, agent.role, tier.model, tier.temperature)
+        cache_key, cached = self._cache_lookup(call_site, request_key, output_model)
+        if cached is not None:
+            return cached
+
+        structured_llm = self._tier_client(tier, "structured")
+        estimated_tokens = estimate_tokens(description, expected_output)
+        async with self.llm_scheduler.aslot(call_site, estimated_tokens, usage):
+            with metrics.timer(f"llm_{call_site}_seconds"):
+                start = perf_counter()
                 try:
-                    extracted_text = self.file_processor.extract_text_from_file(str(answer))
-                    if not extracted_text:
-                        st.error("Aucun texte extrait du fichier")
-                        return self._create_fallback_evaluation(exercise)
-                    
-                    # Utilisation directe avec Pydantic
-                    return self._evaluate_prompt(exercise, extracted_text)
-                    
-                except Exception as e:
-                    st.error(f"Erreur traitement fichier: {str(e)}")
-                    return self._create_fallback_evaluation(exercise)
-            
-            # Cas texte
-            return self._evaluate_prompt(exercise, str(answer))
-        
-    def _evaluate_prompt(self, exercise: Exercise, answer: str) -> EvaluationResult:
-        """Évalue une réponse textuelle"""
-        prompt = f"""
+                    result = await self.llm_resilience.acall(call_site, lambda: structured_llm.ainvoke(
+                        call_site,
+                        f"Tu es {agent.role}. {agent.goal}\n{agent.backstory}",
+                        f"{description}\n\nRésultat attendu: {expected_output}",
+                        output_model,
+                        usage=usage
+                    ))
+                except DeadlineExceeded:
+                    self.model_router.record(tier, perf_counter() - start)
+                    raise
+                self.model_router.record(tier, perf_counter() - start)
+
+        self._cache_store(call_site, cache_key, result, output_model)
+        return result
+
+    def _cache_lookup(self, call_site: str, request_key: str, output_model: type) -> Tuple[Optional[str], Any]:
+        """(clé de cache ou None si le site n'est pas mis en cache, sortie en cache ou None)"""
+        if not self.llm_cache.enabled(call_site):
+            return None, None
+        cached = self.llm_cache.get(request_key)
+        if cached is not None:
+            try:
+                return request_key, output_model.model_validate(cached)
+            except ValidationError:
+                # Entrée obsolète (schéma modifié): on la jette et on rappelle le modèle
+                self.llm_cache.invalidate(request_key)
+        return request_key, None
+
+    def _cache_store(self, call_site: str, cache_key: Optional[str], result, output_model: type) -> None:
+        if not cache_key:
+            return
+        try:
+            self.llm_cache.set(cache_key, self._coerce_output(result, output_model).model_dump())
+        except (ValidationError, ValueError) as e:
+            # Sortie non structurée: renvoyée telle quelle, sans mise en cache
+            print(f"⚠️ Réponse non mise en cache ({call_site}): {str(e)}")
+
+    def _tier_client(self, tier: ModelTier, kind: str, agent: Optional["Agent"] = None):
+        """Client de chat ("chat"), client structuré ("structured") ou agent CrewAI ("agent") du niveau.
+        Le niveau par défaut réutilise `llm`, `structured_llm` et les agents de `_setup_agents`."""
+        if tier.name == self.model_router.default_tier.name:
+            return {"chat": self.llm, "structured": self.structured_llm}.get(kind, agent)
+        if kind == "chat":
+            return self.model_router.client(tier)
+        key = (tier.name, kind if kind == "structured" else agent.role)
+        client = self._tier_clients.get(key)
+        if client is None:
+            llm = self.model_router.client(tier)
+            if kind == "structured":
+                client = StructuredLLM(llm)
+            else:
+                client = Agent(role=agent.role, goal=agent.goal, backstory=agent.backstory,
+                               llm=llm, verbose=False, allow_delegation=False)
+            self._tier_clients[key] = client
+        return client
+
+    def _stream_text(self, call_site: str, agent: "Agent", prompt: str,
+                     output_model: Optional[type] = None) -> Iterator[str]:
+        """Réponse du modèle morceau par morceau (JSON conforme à `output_model` si fourni).
+        Ordonnanceur, routage et disjoncteur s'appliquent comme dans `_call_llm`; pas d'échéance
+        globale (le texte arrive au fil de l'eau). Le premier morceau est mesuré sous
+        `llm_<site>_ttft_seconds`, la réponse complète sous `llm_<site>_seconds`."""
+        tier = self.model_router.route(call_site)
+        client = self._tier_client(tier, "chat")
+        system_prompt = f"Tu es {agent.role}. {agent.goal}\n{agent.backstory}"
+        if output_model:
+            system_prompt += f"\n\n{StructuredLLM.schema_instructions(output_model)}"
+        messages = [SystemMessage(content=system_prompt), HumanMessage(content=prompt)]
+        with self.llm_scheduler.slot(call_site, estimate_tokens(prompt)), \
+                self.llm_resilience.guard(call_site), \
+                metrics.timer(f"llm_{call_site}_seconds"):
+            start = perf_counter()
+            first_token = True
+            for chunk in client.stream(messages):
+                if chunk.content:
+                    if first_token:
+                        metrics.observe(f"llm_{call_site}_ttft_seconds", perf_counter() - start)
+                        first_token = False
+                    yield str(chunk.content)
+            self.model_router.record(tier, perf_counter() - start)
+
+    def _can_stream(self) -> bool:
+        # La boucle d'agent CrewAI ne diffuse pas de tokens: flux réservé au chemin direct
+        return bool(self.streaming and self.llm and self.structured_llm and self.llm_backend == "direct")
+
+    def stream_evaluation(self, exercise: Exercise, answer: Union[str, Path]) -> Optional[StructuredStream]:
+        """Évaluation complète (explication détaillée demandée) en flux: `feedback` puis
+        `detailed_explanation` arrivent au fil de l'eau, le reste est validé à la fin.
+        None si le flux n'est pas disponible (appel classique)."""
+        if not self._can_stream() or self.combined_evaluation:
+            return None
+        answer_text = self._extract_answer_text(answer)
+        if answer_text is None:
+            return None
+        return StructuredStream(
+            self._stream_text("evaluation", self.evaluator, self._build_evaluation_prompt(exercise, answer_text),
+                              EvaluationResult),
+            EvaluationResult,
+            fields=("feedback", "detailed_explanation"),
+        )
+
+    def stream_attempt_coaching(self, attempt_id: str) -> Optional[StructuredStream]:
+        """Coaching de la tentative en flux (`motivation`, `strategy`), conservé à la fin comme
+        `attempt_coaching`. None s'il est déjà connu ou si le flux n'est pas disponible."""
+        record = self.get_attempt(attempt_id)
+        if not record or record.get("coaching") or not self._can_stream() or not self.current_student:
+            return None
+        exercise = Exercise.model_validate(record["exercise_data"])
+        evaluation = EvaluationResult.model_validate(record["evaluation_result"])
+
+        def store(coaching: CoachPersonal):
+            record["coaching"] = coaching.model_dump()
+            self.student_manager.save_student(self.current_student)
+
+        return StructuredStream(
+            self._stream_text("coaching", self.personal_coach, self._build_coaching_prompt(exercise, evaluation),
+                              CoachPersonal),
+            CoachPersonal,
+            fields=("motivation", "strategy"),
+            on_result=store,
+        )
+
+    def _hedge_permit(self, call_site: str, estimated_tokens: int) -> bool:
+        """La relance parallèle est un appel de plus: elle passe en arrière-plan dans l'ordonnanceur"""
+        try:
+            with LLMScheduler.background():
+                self.llm_scheduler.acquire(call_site, estimated_tokens)
+            return True
+        except LLMBudgetExceeded:
+            return False
+
+    def _crew_kickoff(self, call_site: str, agent: "Agent", description: str, expected_output: str,
+                      output_model: type, verbose: bool = False, usage: Optional[Dict] = None):
+        """Chemin CrewAI: une Task et un Crew par appel, le nombre de requêtes dépend de la boucle d'agent"""
+        task = Task(
+            description=description,
+            agent=agent,
+            expected_output=expected_output,
+            output_pydantic=output_model
+        )
+        crew = Crew(
+            agents=[agent],
+            tasks=[task],
+            process=Process.sequential,
+            verbose=verbose
+        )
+        result = crew.kickoff()
+        usage_metrics = getattr(crew, "usage_metrics", None)
+        if isinstance(usage_metrics, dict) and isinstance(usage_metrics.get("successful_requests"), int):
+            metrics.observe(f"llm_{call_site}_iterations", usage_metrics["successful_requests"])
+            if usage is not None:
+                usage.update(iterations=usage_metrics["successful_requests"],
+                             total_tokens=usage_metrics.get("total_tokens", 0))
+        return result
+
+    @staticmethod
+    def _coerce_output(result, output_model: type):
+        """Ramène la sortie de CrewAI (modèle, dict ou texte JSON) au modèle Pydantic attendu.
+        Utilisé uniquement pour les entrées du cache."""
+        if isinstance(result, output_model):
+            return result
+        if isinstance(result, BaseModel):
+            return output_model.model_validate(result.model_dump())
+        if isinstance(result, dict):
+            return output_model.model_validate(result)
+        return parse_structured_output(str(getattr(result, 'raw', result)), output_model)
+
+    def _evaluate_response(self, exercise: Exercise, answer: Union[str, Path], detailed: bool = False) -> EvaluationResult:
+        """Évaluation robuste avec gestion directe Pydantic.
+        `detailed=True` force l'évaluation complète par le LLM (explication détaillée demandée)."""
+        options = {"detailed": True} if detailed else {}
+        with mlflow.start_span("answer_evaluation"):
+            answer_text = self._extract_answer_text(answer)
+            if answer_text is None:
+                return self._create_fallback_evaluation(exercise)
+            return self._evaluate_prompt(exercise, answer_text, **options)
+
+    def _extract_answer_text(self, answer: Union[str, Path]) -> Optional[str]:
+        """Texte de la réponse (extrait du fichier PDF/image le cas échéant); None en cas d'échec"""
+        if isinstance(answer, (Path, str)) and Path(answer).exists():
+            try:
+                extracted_text = self.file_processor.extract_text_from_file(str(answer))
+                if not extracted_text:
+                    st.error("Aucun texte extrait du fichier")
+                    return None
+                return extracted_text
+            except Exception as e:
+                st.error(f"Erreur traitement fichier: {str(e)}")
+                return None
+        return str(answer)
+
+    def evaluate_and_coach(self, exercise: Exercise, answer: Union[str, Path],
+                           detailed: bool = False) -> Tuple[EvaluationResult, Optional[CoachPersonal]]:
+        """Évalue la réponse et, en mode combiné, produit le coaching dans le même appel LLM.
+        Le coaching vaut None quand il reste à demander séparément (`_provide_personalized_coaching`)."""
+        if not self.combined_evaluation or not self.llm or not self.current_student:
+            return self._evaluate_response(exercise, answer, detailed=detailed), None
+
+        with mlflow.start_span("answer_evaluation"):
+            answer_text = self._extract_answer_text(answer)
+            if answer_text is None:
+                return self._create_fallback_evaluation(exercise), None
+            if not detailed:
+                grade = self._grade_symbolically(exercise, answer_text)
+                if grade is not None:
+                    return self._create_symbolic_evaluation(exercise, grade), None
+
+            try:
+                result = self._kickoff(
+                    "evaluation_coaching",
+                    self.evaluator,
+                    self._build_evaluation_prompt(exercise, answer_text) + self._coaching_instructions(),
+                    "Objet EvaluationWithCoaching complet: l'évaluation et le coaching personnalisé",
+                    EvaluationWithCoaching
+                )
+                result = self._coerce_output(result, EvaluationWithCoaching)
+            except LLMUnavailable as e:
+                print(f"⚠️ {str(e)}: évaluation locale")
+                return self._evaluate_locally(exercise, answer_text), None
+            except Exception as e:
+                # Sortie combinée inexploitable: retour au chemin en deux appels
+                print(f"⚠️ Évaluation combinée impossible: {str(e)}")
+                return self._evaluate_prompt(exercise, answer_text, detailed=detailed), None
+
+        if hasattr(self, 'mlflow_run'):
+            self._log_coaching_data(exercise, result.evaluation, result.coaching)
+        return result.evaluation, result.coaching
+
+    def _evaluate_prompt(self, exercise: Exercise, answer: str, detailed: bool = False) -> EvaluationResult:
+        """Évalue une réponse textuelle (correction symbolique locale si possible)"""
+        if not self.llm:
+            # Pas d'agent évaluateur (clé GROQ absente, mode hors ligne)
+            return self._evaluate_locally(exercise, answer)
+        if not detailed:
+            grade = self._grade_symbolically(exercise, answer)
+            if grade is not None:
+                return self._with_lazy_details(self._create_symbolic_evaluation(exercise, grade))
+            if self.two_phase_evaluation:
+                return self._evaluate_verdict(exercise, answer)
+        return self._evaluate_full(exercise, answer)
+
+    def _evaluate_full(self, exercise: Exercise, answer: str) -> EvaluationResult:
+        """Évaluation complète en un appel; évaluation locale si le LLM ne répond pas ou répond mal"""
+        try:
+            return self._kickoff(
+                "evaluation",
+                self.evaluator,
+                self._build_evaluation_prompt(exercise, answer),
+                "Objet EvaluationResult complet: Évaluation complète avec validation, feedback et recommandations",
+                EvaluationResult
+            )
+        except LLMUnavailable as e:
+            print(f"⚠️ {str(e)}: évaluation locale")
+            return self._evaluate_locally(exercise, answer)
+        except (StructuredOutputError, ValidationError) as e:
+            print(f"⚠️ Évaluation inexploitable: {str(e)}")
+            return self._evaluate_locally(exercise, answer)
+
+    def _evaluate_verdict(self, exercise: Exercise, answer: str) -> EvaluationResult:
+        """Première phase: verdict, type d'erreur et une phrase de feedback (sortie courte)"""
+        try:
+            verdict = self._coerce_output(self._kickoff(
+                "evaluation_verdict",
+                self.evaluator,
+                self._build_verdict_prompt(exercise, answer),
+                "Objet EvaluationVerdict: is_correct, error_type et une phrase de feedback",
+                EvaluationVerdict
+            ), EvaluationVerdict)
+        except LLMUnavailable as e:
+            print(f"⚠️ {str(e)}: évaluation locale")
+            return self._evaluate_locally(exercise, answer)
+        except (StructuredOutputError, ValidationError) as e:
+            # Verdict inexploitable: évaluation complète, comme le mode combiné
+            print(f"⚠️ Verdict inexploitable: {str(e)}")
+            return self._evaluate_full(exercise, answer)
+        return self._verdict_evaluation(exercise, verdict)
+
+    def _verdict_evaluation(self, exercise: Exercise, verdict: EvaluationVerdict) -> EvaluationResult:
+        return self._with_lazy_details(EvaluationResult(
+            is_correct=verdict.is_correct,
+            error_type=None if verdict.is_correct else verdict.error_type,
+            feedback=verdict.feedback,
+            detailed_explanation="",
+            step_by_step_correction=exercise.solution,
+            recommendations=[]
+        ))
+
+    def _with_lazy_details(self, evaluation: EvaluationResult) -> EvaluationResult:
+        """Marque l'explication détaillée comme à générer en deuxième phase (si un LLM est disponible)"""
+        if self.two_phase_evaluation and self.llm:
+            evaluation._details_pending = True
+        return evaluation
+
+    def _evaluate_locally(self, exercise: Exercise, answer: str) -> EvaluationResult:
+        """Évaluation sans LLM (quota épuisé, délai dépassé, disjoncteur ouvert): correction symbolique si possible, sinon report"""
+        grade = self._grade_symbolically(exercise, answer)
+        if grade is not None:
+            return self._create_symbolic_evaluation(exercise, grade)
+        evaluation = self._create_fallback_evaluation(exercise)
+        evaluation.feedback = "Correction automatique momentanément indisponible, réessayez dans une minute"
+        return evaluation
+
+    def _build_evaluation_prompt(self, exercise: Exercise, answer: str) -> str:
+        return f"""
         CONTEXTE D'ÉVALUATION
         ---------------------
         Exercice proposé : {exercise.exercise}
@@ -539,24 +1322,96 @@ class MathTutoringSystem:
         - Indiquer les points à revoir en priorité
         """
 
-        task = Task(
-            description=prompt,
-            agent=self.evaluator,
-            expected_output="Objet EvaluationResult complet: Évaluation complète avec validation, feedback et recommandations",
-            output_pydantic=EvaluationResult
-        )
+    def _build_verdict_prompt(self, exercise: Exercise, answer: str) -> str:
+        return f"""
+        Exercice proposé : {exercise.exercise}
+        Solution de référence : {exercise.solution}
+        Réponse de l'étudiant : {answer}
 
-        crew = Crew(
-            agents=[self.evaluator], 
-            tasks=[task], 
-            process=Process.sequential,
-            verbose=False
-        )
-        
-        return crew.kickoff()
+        Décide seulement si la réponse est correcte. Si elle ne l'est pas, donne le type d'erreur parmi:
+        Erreur conceptuelle, Erreur de calcul, Erreur de notation, Erreur de méthode, Erreur de logique.
+        Feedback: une seule phrase, sans explication détaillée.
+        """
+
+    def _build_details_prompt(self, exercise: Exercise, answer: str, evaluation: EvaluationResult) -> str:
+        verdict = "correcte" if evaluation.is_correct else f"incorrecte ({evaluation.error_type or 'erreur'})"
+        return f"""
+        Exercice proposé : {exercise.exercise}
+        Solution de référence : {exercise.solution}
+        Réponse de l'étudiant : {answer}
+        Verdict : réponse {verdict}
+
+        Rédige en markdown, avec exactement ces trois titres:
+        ## Explication
+        (analyse du raisonnement de l'étudiant et explication du concept)
+        ## Correction
+        (correction étape par étape, une étape par ligne)
+        ## Recommandations
+        (trois recommandations au plus, une par ligne commençant par "- ")
+        """
+
+    @staticmethod
+    def _parse_details(text: str, exercise: Exercise) -> Dict[str, Any]:
+        """Sections markdown de la deuxième phase -> champs de EvaluationResult"""
+        parts = re.split(r"^#+\s*(Explication|Correction|Recommandations)\b.*$", text, flags=re.MULTILINE)
+        sections = {name: body.strip() for name, body in zip(parts[1::2], parts[2::2])}
+        return {
+            "detailed_explanation": sections.get("Explication") or text.strip(),
+            "step_by_step_correction": sections.get("Correction") or exercise.solution,
+            "recommendations": [
+                line.strip().lstrip("-*• ").strip()
+                for line in sections.get("Recommandations", "").splitlines() if line.strip()
+            ],
+        }
+
+    def _coaching_instructions(self) -> str:
+        """Consignes de coaching ajoutées au prompt d'évaluation en mode combiné"""
+        return f"""
+        4. Coaching personnalisé (champ "coaching"):
+        - Adapter le message à la réussite ou à l'erreur identifiée ci-dessus
+        - Donner une motivation, une stratégie concrète, une astuce pratique et des encouragements
+
+        [FORMAT DE SORTIE]
+        {{"evaluation": {EvaluationResult.__name__}, "coaching": {CoachPersonal.__name__}}}
+        """
 
     
         
+    def _grade_symbolically(self, exercise: Exercise, answer: str) -> Optional["GradeResult"]:
+        """Décide is_correct avec sympy; None si la consigne ou la réponse est ambiguë"""
+        if not self.symbolic_grader:
+            return None
+        with metrics.timer("symbolic_grade_seconds"):
+            try:
+                grade = self.symbolic_grader.grade(exercise.exercise, answer, exercise.concept)
+            except Exception as e:
+                print(f"⚠️ Correction symbolique impossible: {str(e)}")
+                grade = None
+        metrics.increment("symbolic_grade_hit" if grade else "symbolic_grade_ambiguous")
+        return grade
+
+    def _create_symbolic_evaluation(self, exercise: Exercise, grade: "GradeResult") -> EvaluationResult:
+        """Évaluation construite localement à partir de la correction symbolique"""
+        subject = "Le domaine de définition" if grade.kind == "domain" else "La limite"
+        if grade.is_correct:
+            feedback = f"Bravo! {subject} est bien {grade.expected}."
+        else:
+            feedback = f"{subject} attendu(e) est {grade.expected}, votre réponse correspond à {grade.student}."
+        return EvaluationResult(
+            is_correct=grade.is_correct,
+            error_type=None if grade.is_correct else "Erreur de résultat",
+            feedback=feedback,
+            detailed_explanation=(
+                f"Résultat vérifié par calcul symbolique: {grade.expected}. "
+                "Demandez l'explication détaillée pour une analyse de votre raisonnement."
+            ),
+            step_by_step_correction=exercise.solution,
+            recommendations=[] if grade.is_correct else [
+                "Comparez votre résultat avec la solution de référence",
+                "Vérifiez chaque valeur interdite ou chaque terme dominant"
+            ]
+        )
+
     def _create_fallback_evaluation(self, exercise: Exercise) -> EvaluationResult:
         """Crée une évaluation de secours"""
         return EvaluationResult(
@@ -586,31 +1441,112 @@ class MathTutoringSystem:
             return fallback_coaching
 
         try:
-            # Configuration directe de la tâche
-            task = Task(
-                description=self._build_coaching_prompt(exercise, evaluation),
-                agent=self.personal_coach,
-                expected_output="Retourne directement un objet CoachPersonal valide",
-                output_pydantic=CoachPersonal  
+            result = self._kickoff(
+                "coaching",
+                self.personal_coach,
+                self._build_coaching_prompt(exercise, evaluation),
+                "Retourne directement un objet CoachPersonal valide",
+                CoachPersonal
             )
 
-            # Exécution simplifiée
-            result = Crew(
-                agents=[self.personal_coach],
-                tasks=[task],
-                process=Process.sequential
-            ).kickoff()
-
             # Journalisation
             if hasattr(self, 'mlflow_run'):
                 self._log_coaching_data(exercise, evaluation, result)
             
             return result
 
+        except LLMUnavailable as e:
+            print(f"⚠️ {str(e)}: coaching par défaut")
+            return fallback_coaching
         except Exception as e:
             st.error(f"Erreur coaching: {str(e)}")
             return fallback_coaching
 
+    def record_attempt(self, exercise: Exercise, answer: Union[str, Path], evaluation: EvaluationResult,
+                       coaching: Optional[CoachPersonal] = None, attempt: int = 1) -> str:
+        """Enregistre la tentative dans l'historique du profil (sauvegardé) et retourne son identifiant"""
+        attempt_id = self.attempts.add(self.current_student, {
+            "exercise": exercise.exercise,
+            "answer": str(answer),
+            "evaluation": evaluation.is_correct,
+            "timestamp": datetime.now().isoformat(),
+            "attempt": attempt,
+            "exercise_data": exercise.model_dump(),
+            "evaluation_result": evaluation.model_dump(),
+            "details_pending": evaluation._details_pending,
+            "coaching": coaching.model_dump() if coaching else None
+        })
+        self.student_manager.save_student(self.current_student)
+        return attempt_id
+
+    def get_attempt(self, attempt_id: str) -> Optional[Dict]:
+        if not self.current_student:
+            return None
+        return self.attempts.get(self.current_student, attempt_id)
+
+    def attempt_evaluation(self, attempt_id: str) -> Optional[EvaluationResult]:
+        record = self.get_attempt(attempt_id)
+        return EvaluationResult.model_validate(record["evaluation_result"]) if record else None
+
+    def attempt_coaching(self, attempt_id: str) -> Optional[CoachPersonal]:
+        """Coaching de la tentative: lu dans l'enregistrement, sinon demandé une seule fois puis conservé"""
+        record = self.get_attempt(attempt_id)
+        if not record:
+            return None
+        if record.get("coaching"):
+            metrics.increment("attempt_coaching_reused")
+            return CoachPersonal.model_validate(record["coaching"])
+
+        coaching = self._provide_personalized_coaching(
+            EvaluationResult.model_validate(record["evaluation_result"]),
+            Exercise.model_validate(record["exercise_data"])
+        )
+        record["coaching"] = coaching.model_dump()
+        self.student_manager.save_student(self.current_student)
+        return coaching
+
+    def details_pending(self, attempt_id: str) -> bool:
+        """Vrai si l'explication détaillée de la tentative reste à générer"""
+        record = self.get_attempt(attempt_id)
+        return bool(record and record.get("details_pending"))
+
+    def stream_evaluation_details(self, attempt_id: str) -> Iterator[str]:
+        """Deuxième phase: explication, correction et recommandations diffusées au fil de la
+        génération, puis conservées dans la tentative (générées une seule fois)"""
+        record = self.get_attempt(attempt_id)
+        if not record or not record.get("details_pending"):
+            return
+        exercise = Exercise.model_validate(record["exercise_data"])
+        evaluation = EvaluationResult.model_validate(record["evaluation_result"])
+        chunks = []
+        try:
+            prompt = self._build_details_prompt(exercise, record["answer"], evaluation)
+            for chunk in self._stream_text("evaluation_details", self.evaluator, prompt):
+                chunks.append(chunk)
+                yield chunk
+        except LLMUnavailable as e:
+            print(f"⚠️ {str(e)}: explication reportée")
+            yield "\n\n_Explication détaillée momentanément indisponible, réessayez dans une minute._"
+            return
+        except Exception as e:
+            st.error(f"Erreur explication détaillée: {str(e)}")
+            return
+
+        record["evaluation_result"] = evaluation.model_copy(
+            update=self._parse_details("".join(chunks), exercise)
+        ).model_dump()
+        record["details_pending"] = False
+        self.student_manager.save_student(self.current_student)
+
+    def pending_attempt(self, max_attempts: int) -> Optional[Dict]:
+        """Dernière tentative d'un exercice non terminé (ni réussi, ni à court d'essais)"""
+        if not self.current_student:
+            return None
+        record = self.attempts.latest(self.current_student)
+        if record and not record["evaluation"] and record["attempt"] < max_attempts:
+            return record
+        return None
+
     def _build_coaching_prompt(self, exercise: Exercise, evaluation: EvaluationResult) -> str:
         """Prompt optimisé pour une sortie Pydantic directe"""
         return f"""
@@ -802,6 +1738,11 @@ class MathTutoringSystem:
 
     def _generate_similar_exercise(self, original_exercise: Exercise) -> Exercise:
         """Génère un exercice similaire au précédent (même concept et difficulté)"""
+        if not self.llm or self.generation_mode == "local":
+            local_exercise = self._local_similar_exercise(original_exercise)
+            if local_exercise:
+                return local_exercise
+
         if not self.llm:
             # Fallback simple - ajoute une variation à l'exercice original
             modified_exercise = original_exercise.exercise.replace("=", "+ 1 =") if "=" in original_exercise.exercise else original_exercise.exercise + " (variation)"
@@ -814,8 +1755,34 @@ class MathTutoringSystem:
             )
 
         try:
-            task = Task(
-                description=f"""
+            result = self._kickoff(
+                "similar_exercise",
+                self.exercise_creator,
+                self._build_similar_prompt(original_exercise),
+                "Un objet Exercise complet avec les champs: exercise, solution, hints, difficulty, concept",
+                Exercise
+            )
+            # print("\nEXercice:", result['exercise'])
+            # print("\nconcept:", result['concept'] )
+            # print("\ndifficulty:", result['difficulty'])
+            # print("\nhints:", "\n".join(result['hints']) )
+            return result
+
+        except LLMUnavailable as e:
+            print(f"⚠️ {str(e)}: exercice local")
+            return self._local_similar_exercise(original_exercise) or original_exercise
+        except Exception as e:
+            st.error(f"Erreur lors de la génération d'exercice similaire: {str(e)}")
+            # Fallback en cas d'erreur
+            return self._generate_exercise()
+        
+    def _local_similar_exercise(self, original_exercise: Exercise) -> Optional[Exercise]:
+        """Exercice paramétré local de même concept et difficulté, s'il existe un modèle"""
+        level = self.exercise_templates.find_level(original_exercise.concept, original_exercise.difficulty)
+        return self._local_exercise(original_exercise.concept, level) if level else None
+
+    def _build_similar_prompt(self, original_exercise: Exercise) -> str:
+        return f"""
                 Tu es un professeur de mathématiques expert.
                 Génère un NOUVEL exercice SIMILAIRE mais DIFFÉRENT à l'exercice suivant, 
                 avec la MÊME difficulté et portant sur le MÊME concept mathématique.
@@ -832,31 +1799,146 @@ class MathTutoringSystem:
                 3. Doit inclure une solution complète
                 4. Doit fournir des indices pédagogiques
                 5. Doit être clair et précis
-                """,
-                expected_output="Un objet Exercise complet avec les champs: exercise, solution, hints, difficulty, concept",
-                agent=self.exercise_creator,
-                output_pydantic=Exercise
-            )
+                """
 
-            crew = Crew(
-                agents=[self.exercise_creator], 
-                tasks=[task],
-                process=Process.sequential,
-                verbose=False 
-            )
-            
-            result = crew.kickoff()
-            # print("\nEXercice:", result['exercise'])
-            # print("\nconcept:", result['concept'] )
-            # print("\ndifficulty:", result['difficulty'])
-            # print("\nhints:", "\n".join(result['hints']) )
-            return result
-            
+    # --- API asynchrone: exécutée sur la boucle du processus (`run_async`), hors du script Streamlit,
+    # donc sans affichage ni journalisation MLflow des exercices. Annuler la tâche interrompt l'appel LLM.
+
+    def run_async(self, kind: str, coro: Coroutine) -> Future:
+        """Lance une coroutine de l'API asynchrone; une nouvelle demande de même nature pour cette
+        session annule la précédente (réponse renvoyée avant la fin de l'évaluation, etc.)"""
+        return get_async_runner().submit(self.session_id, kind, coro)
+
+    def cancel_pending(self, kind: Optional[str] = None) -> int:
+        """Annule les appels asynchrones et les travaux en cours de la session (changement de page)"""
+        if kind is not None:
+            return get_async_runner().cancel(self.session_id, kind)
+        return get_job_executor().cancel(self.session_id) + get_async_runner().cancel(self.session_id)
+
+    def submit_job(self, attempt: Union[str, int], kind: str, work, *args) -> Job:
+        """Soumet un travail de la session au pool du processus (ignoré si cette tentative en a déjà un)"""
+        return get_job_executor().submit(self.session_id, attempt, kind, work, *args)
+
+    def get_job(self, attempt: Union[str, int], kind: str) -> Optional[Job]:
+        return get_job_executor().get(self.session_id, attempt, kind)
+
+    async def agenerate_exercise(self, objective_name: Optional[str] = None,
+                                 level: Optional[int] = None) -> Optional[Exercise]:
+        """Version asynchrone de `_generate_exercise`"""
+        if objective_name is None:
+            if not self.current_student or not self.current_student.current_objective:
+                print("⚠️ Aucun étudiant ou objectif défini")
+                return None
+            objective_name = self.current_student.current_objective
+        if level is None:
+            level = self.current_student.level if self.current_student else 1
+        try:
+            objective, level_info = self._level_info(objective_name, level)
+        except KeyError as e:
+            print(f"⚠️ {e.args[0]}")
+            return None
+
+        if not self.llm or self.generation_mode == "local":
+            return await asyncio.to_thread(self._default_exercise, objective_name, level, level_info)
+        try:
+            return self._coerce_output(await self._akickoff(
+                "exercise_generation",
+                self.exercise_creator,
+                self._build_exercise_prompt(objective_name, objective, level_info),
+                "Un objet Exercise complet avec exercise, solution, hints, difficulty et concept",
+                Exercise
+            ), Exercise)
+        except LLMUnavailable as e:
+            print(f"⚠️ {str(e)}: exercice local")
         except Exception as e:
-            st.error(f"Erreur lors de la génération d'exercice similaire: {str(e)}")
-            # Fallback en cas d'erreur
-            return self._generate_exercise()
-        
+            print(f"❌ Erreur génération exercice: {str(e)}")
+        return await asyncio.to_thread(self._default_exercise, objective_name, level, level_info)
+
+    async def aevaluate_response(self, exercise: Exercise, answer: Union[str, Path],
+                                 detailed: bool = False) -> EvaluationResult:
+        """Version asynchrone de `_evaluate_response` (extraction de fichier et sympy dans un thread)"""
+        answer_text = await asyncio.to_thread(self._extract_answer_text, answer)
+        if answer_text is None:
+            return self._create_fallback_evaluation(exercise)
+        if not detailed:
+            grade = await asyncio.to_thread(self._grade_symbolically, exercise, answer_text)
+            if grade is not None:
+                return self._with_lazy_details(self._create_symbolic_evaluation(exercise, grade))
+        if not self.llm:
+            return await asyncio.to_thread(self._evaluate_locally, exercise, answer_text)
+
+        try:
+            if not detailed and self.two_phase_evaluation:
+                return self._verdict_evaluation(exercise, self._coerce_output(await self._akickoff(
+                    "evaluation_verdict",
+                    self.evaluator,
+                    self._build_verdict_prompt(exercise, answer_text),
+                    "Objet EvaluationVerdict: is_correct, error_type et une phrase de feedback",
+                    EvaluationVerdict
+                ), EvaluationVerdict))
+            return self._coerce_output(await self._akickoff(
+                "evaluation",
+                self.evaluator,
+                self._build_evaluation_prompt(exercise, answer_text),
+                "Objet EvaluationResult complet: Évaluation complète avec validation, feedback et recommandations",
+                EvaluationResult
+            ), EvaluationResult)
+        except LLMUnavailable as e:
+            print(f"⚠️ {str(e)}: évaluation locale")
+            return await asyncio.to_thread(self._evaluate_locally, exercise, answer_text)
+
+    async def aprovide_coaching(self, evaluation: EvaluationResult, exercise: Exercise) -> CoachPersonal:
+        """Version asynchrone de `_provide_personalized_coaching`"""
+        fallback_coaching = CoachPersonal(
+            motivation="Continuez vos efforts!",
+            strategy="Revoyez la solution fournie",
+            tip="Relisez attentivement les étapes",
+            encouragement=["Vous progressez à chaque essai!"]
+        )
+        if not self.llm or not self.current_student:
+            return fallback_coaching
+        try:
+            result = self._coerce_output(await self._akickoff(
+                "coaching",
+                self.personal_coach,
+                self._build_coaching_prompt(exercise, evaluation),
+                "Retourne directement un objet CoachPersonal valide",
+                CoachPersonal
+            ), CoachPersonal)
+        except LLMUnavailable as e:
+            print(f"⚠️ {str(e)}: coaching par défaut")
+            return fallback_coaching
+        except Exception as e:
+            print(f"❌ Erreur coaching: {str(e)}")
+            return fallback_coaching
+        if hasattr(self, 'mlflow_run'):
+            await asyncio.to_thread(self._log_coaching_data, exercise, evaluation, result)
+        return result
+
+    async def agenerate_similar_exercise(self, original_exercise: Exercise) -> Exercise:
+        """Version asynchrone de `_generate_similar_exercise`"""
+        if not self.llm or self.generation_mode == "local":
+            local_exercise = await asyncio.to_thread(self._local_similar_exercise, original_exercise)
+            if local_exercise:
+                return local_exercise
+        if not self.llm:
+            return self._generate_similar_exercise(original_exercise)
+        try:
+            return self._coerce_output(await self._akickoff(
+                "similar_exercise",
+                self.exercise_creator,
+                self._build_similar_prompt(original_exercise),
+                "Un objet Exercise complet avec les champs: exercise, solution, hints, difficulty, concept",
+                Exercise
+            ), Exercise)
+        except LLMUnavailable as e:
+            print(f"⚠️ {str(e)}: exercice local")
+            local_exercise = await asyncio.to_thread(self._local_similar_exercise, original_exercise)
+            return local_exercise or original_exercise
+        except Exception as e:
+            print(f"❌ Erreur lors de la génération d'exercice similaire: {str(e)}")
+            return await self.agenerate_exercise() or original_exercise
+
     def monitor_student_progress(self):
         """Surveille la progression des étudiants"""
         from evidently.report import Report
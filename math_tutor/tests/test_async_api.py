@@ -0,0 +1,168 @@
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from math_tutor.system_GB_Coach import MathTutoringSystem, StudentManager, Exercise, EvaluationResult
+from math_tutor.utils.async_runner import AsyncRunner
+from math_tutor.utils.llm_scheduler import LLMScheduler
+from math_tutor.utils.metrics import PerformanceMetrics
+from math_tutor.utils.resilience import CircuitBreaker, DeadlineExceeded, ResilientCaller
+from math_tutor.utils.structured_llm import StructuredLLM
+
+EVALUATION = {"is_correct": True, "error_type": None, "feedback": "Correct", "detailed_explanation": "x ≠ 3",
+              "step_by_step_correction": "R-{3}", "recommendations": []}
+
+
+class AsyncProvider(BaseChatModel):
+    """Fournisseur asynchrone local: latence injectée, annulations observées"""
+    response: str = json.dumps(EVALUATION)
+    latency: float = 0.0
+    started: int = 0
+    cancelled: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "async-provider"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        raise AssertionError("le client synchrone ne doit pas être appelé")
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.started += 1
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.response))])
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def runner():
+    return AsyncRunner(metrics=PerformanceMetrics())
+
+
+def test_resubmission_cancels_the_in_flight_call(runner):
+    provider = AsyncProvider(latency=5.0)
+    first = runner.submit("session", "evaluation", provider.ainvoke("première réponse"))
+    assert wait_until(lambda: provider.started == 1)
+    provider.latency = 0.0
+    second = runner.submit("session", "evaluation", provider.ainvoke("deuxième réponse"))
+
+    assert second.result(timeout=2).content == json.dumps(EVALUATION)
+    assert first.cancelled()
+    assert wait_until(lambda: provider.cancelled == 1)
+    assert runner.metrics.counter("async_task_superseded") == 1
+
+
+def test_cancel_only_targets_the_session(runner):
+    provider = AsyncProvider(latency=5.0)
+    mine = [runner.submit("a", kind, provider.ainvoke(kind)) for kind in ("evaluation", "exercise")]
+    other = runner.submit("b", "evaluation", provider.ainvoke("b"))
+    assert wait_until(lambda: provider.started == 3)
+
+    assert runner.cancel("a") == 2
+    assert all(future.cancelled() for future in mine)
+    assert wait_until(lambda: provider.cancelled == 2)
+    assert not other.done()
+    assert set(runner.pending("b")) == {"evaluation"}
+    runner.cancel("b")
+
+
+def test_async_deadline_interrupts_the_request():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, metrics=PerformanceMetrics())
+    caller = ResilientCaller(deadline=0.05, breaker=breaker, metrics=PerformanceMetrics())
+    provider = AsyncProvider(latency=1.0)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(caller.acall("evaluation", lambda: provider.ainvoke("x")))
+    assert provider.cancelled == 1
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_cancelled_probe_does_not_jam_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0, metrics=PerformanceMetrics())
+    breaker.record_failure()
+    caller = ResilientCaller(deadline=5, breaker=breaker, metrics=PerformanceMetrics())
+    provider = AsyncProvider(latency=1.0)
+
+    async def cancel_probe():
+        task = asyncio.ensure_future(caller.acall("evaluation", lambda: provider.ainvoke("x")))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow()  # nouvelle sonde possible
+
+
+def test_cancelled_wait_returns_the_reservation():
+    scheduler = LLMScheduler(requests_per_minute=60, metrics=PerformanceMetrics())
+    scheduler.requests.drain()  # seau vide: l'appel suivant attend environ une seconde
+
+    async def cancelled_wait():
+        async def call():
+            async with scheduler.aslot("evaluation", 10):
+                pass
+        task = asyncio.ensure_future(call())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancelled_wait())
+    assert wait_until(lambda: scheduler.stats()["waiting"]["interactive"] == 0)
+    # La requête obtenue après l'annulation a été rendue: le seau n'est pas revidé
+    assert scheduler.stats()["requests_available"] >= 0.9
+
+
+@pytest.fixture
+def system(tmp_path):
+    provider = AsyncProvider()
+    system = MathTutoringSystem()
+    system.llm = provider
+    system.structured_llm = StructuredLLM(provider, metrics=PerformanceMetrics())
+    system.llm_backend = "direct"
+    system.llm_cache.enabled_sites = set()
+    system.evaluator = MagicMock(role="Évaluateur", goal="Évaluer", backstory="Professeur")
+    system.student_manager = StudentManager(data_dir=tmp_path, enable_memory=False)
+    system.current_student = system.student_manager.create_student("Test")
+    return system
+
+
+@pytest.fixture
+def exercise():
+    return Exercise(exercise="Déterminer le domaine de définition de f(x) = 1/(x - 3)", solution="R-{3}",
+                    hints=[], difficulty="Élémentaire", concept="Domaine de définition")
+
+
+def test_aevaluate_response_uses_the_async_client(system, exercise):
+    evaluation = asyncio.run(system.aevaluate_response(exercise, "x différent de 3", detailed=True))
+
+    assert evaluation == EvaluationResult(**EVALUATION)
+    assert system.llm.started == 1
+
+
+def test_run_async_supersedes_the_previous_evaluation(system, exercise):
+    system.llm.latency = 5.0
+    first = system.run_async("evaluation", system.aevaluate_response(exercise, "x = 3", detailed=True))
+    assert wait_until(lambda: system.llm.started == 1)
+    system.llm.latency = 0.0
+    second = system.run_async("evaluation", system.aevaluate_response(exercise, "x ≠ 3", detailed=True))
+
+    assert second.result(timeout=5).is_correct
+    assert first.cancelled()
+    assert wait_until(lambda: system.llm.cancelled == 1)
@@ -0,0 +1,100 @@
+from unittest.mock import Mock
+import pytest
+from math_tutor.utils.attempt_store import AttemptStore
+from math_tutor.system_GB_Coach import (
+    MathTutoringSystem,
+    StudentManager,
+    StudentProfile,
+    Exercise,
+    EvaluationResult,
+    CoachPersonal,
+)
+
+EVALUATION = EvaluationResult(
+    is_correct=False,
+    error_type="Erreur de calcul",
+    feedback="Presque",
+    detailed_explanation="...",
+    step_by_step_correction="...",
+    recommendations=[]
+)
+COACHING = CoachPersonal(motivation="Courage", strategy="Refaire le calcul", tip="Vérifier les signes",
+                         encouragement=["Bien essayé"])
+
+
+def test_store_indexes_history_entries():
+    store = AttemptStore()
+    student = StudentProfile(student_id="s1", learning_history=[{"exercise": "ancien", "evaluation": True}])
+
+    attempt_id = store.add(student, {"exercise": "ex", "evaluation": False, "attempt": 1})
+
+    assert student.learning_history[-1]["attempt_id"] == attempt_id
+    assert store.get(student, attempt_id) is student.learning_history[-1]
+    assert store.latest(student)["exercise"] == "ex"
+
+
+def test_store_reindexes_reloaded_profile():
+    store = AttemptStore()
+    student = StudentProfile(student_id="s1")
+    attempt_id = store.add(student, {"exercise": "ex", "evaluation": False, "attempt": 1})
+
+    reloaded = StudentProfile.model_validate(student.model_dump())
+
+    assert store.get(reloaded, attempt_id) is reloaded.learning_history[0]
+
+
+@pytest.fixture
+def system(tmp_path):
+    system = MathTutoringSystem()
+    system.student_manager = StudentManager(data_dir=tmp_path, enable_memory=False)
+    system.current_student = system.student_manager.create_student("Test")
+    system._provide_personalized_coaching = Mock(return_value=COACHING)
+    return system
+
+
+@pytest.fixture
+def exercise():
+    return Exercise(exercise="Calculer lim(x→2) (x^2 - 4)/(x - 2)", solution="4", hints=[],
+                    difficulty="Débutant", concept="Calcul des limites")
+
+
+def test_coaching_is_requested_once_per_attempt(system, exercise):
+    attempt_id = system.record_attempt(exercise, "5", EVALUATION, attempt=1)
+
+    for _ in range(3):  # reruns Streamlit
+        assert system.attempt_coaching(attempt_id) == COACHING
+        assert system.attempt_evaluation(attempt_id) == EVALUATION
+
+    assert system._provide_personalized_coaching.call_count == 1
+
+
+def test_combined_coaching_is_never_requested(system, exercise):
+    attempt_id = system.record_attempt(exercise, "5", EVALUATION, COACHING, attempt=1)
+
+    assert system.attempt_coaching(attempt_id) == COACHING
+    assert not system._provide_personalized_coaching.called
+
+
+def test_records_survive_a_restart(system, exercise):
+    attempt_id = system.record_attempt(exercise, "5", EVALUATION, attempt=1)
+    system.attempt_coaching(attempt_id)
+
+    restarted = MathTutoringSystem()
+    restarted.student_manager = system.student_manager
+    restarted.current_student = restarted.student_manager.load_student(system.current_student.student_id)
+    restarted._provide_personalized_coaching = Mock()
+
+    assert restarted.attempt_evaluation(attempt_id) == EVALUATION
+    assert restarted.attempt_coaching(attempt_id) == COACHING
+    assert not restarted._provide_personalized_coaching.called
+    pending = restarted.pending_attempt(max_attempts=2)
+    assert pending["attempt_id"] == attempt_id
+    assert Exercise.model_validate(pending["exercise_data"]) == exercise
+
+
+def test_finished_exercise_is_not_resumed(system, exercise):
+    system.record_attempt(exercise, "5", EVALUATION, attempt=2)
+    assert system.pending_attempt(max_attempts=2) is None
+
+    system.record_attempt(exercise, "4", EVALUATION.model_copy(update={"is_correct": True}), attempt=1)
+    assert system.pending_attempt(max_attempts=2) is None
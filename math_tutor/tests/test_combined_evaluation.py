@@ -0,0 +1,128 @@
+import time
+from unittest.mock import Mock, patch
+import pytest
+from math_tutor.system_GB_Coach import (
+    MathTutoringSystem,
+    StudentProfile,
+    Exercise,
+    EvaluationResult,
+    CoachPersonal,
+    EvaluationWithCoaching,
+)
+
+ROUND_TRIP_SECONDS = 0.2
+
+EVALUATION = EvaluationResult(
+    is_correct=False,
+    error_type="Erreur de méthode",
+    feedback="Revoir la factorisation",
+    detailed_explanation="...",
+    step_by_step_correction="...",
+    recommendations=["Factoriser le numérateur"]
+)
+COACHING = CoachPersonal(
+    motivation="Courage",
+    strategy="Factoriser d'abord",
+    tip="Chercher la racine commune",
+    encouragement=["Presque!"]
+)
+
+
+@pytest.fixture
+def exercise():
+    return Exercise(
+        exercise="Expliquer pourquoi la fonction est continue",
+        solution="...",
+        hints=[],
+        difficulty="Débutant",
+        concept="Calcul des limites"
+    )
+
+
+@pytest.fixture
+def system():
+    system = MathTutoringSystem()
+    system.llm = Mock()
+    system.current_student = StudentProfile(student_id="test123")
+    system.llm_cache.enabled_sites = set()
+    system.combined_evaluation = True
+    system.two_phase_evaluation = False  # évaluation complète en un appel (voir test_two_phase_evaluation)
+    system.llm_backend = "crew"
+    return system
+
+
+def slow_kickoff(*outputs):
+    """Crew factice: chaque kickoff simule un aller-retour réseau"""
+    results = iter(outputs)
+
+    def kickoff():
+        time.sleep(ROUND_TRIP_SECONDS)
+        return next(results)
+    return kickoff
+
+
+def test_combined_mode_uses_a_single_call(system, exercise):
+    with patch('math_tutor.system_GB_Coach.Task'), patch('math_tutor.system_GB_Coach.Crew') as mock_crew:
+        mock_crew.return_value.kickoff.return_value = EvaluationWithCoaching(evaluation=EVALUATION, coaching=COACHING)
+        evaluation, coaching = system.evaluate_and_coach(exercise, "Parce que")
+
+    assert evaluation == EVALUATION
+    assert coaching == COACHING
+    assert mock_crew.return_value.kickoff.call_count == 1
+
+
+def test_separate_mode_defers_coaching(system, exercise):
+    system.combined_evaluation = False
+    with patch('math_tutor.system_GB_Coach.Task'), patch('math_tutor.system_GB_Coach.Crew') as mock_crew:
+        mock_crew.return_value.kickoff.return_value = EVALUATION
+        evaluation, coaching = system.evaluate_and_coach(exercise, "Parce que")
+
+    assert evaluation == EVALUATION
+    assert coaching is None
+
+
+def test_unstructured_combined_output_falls_back_to_evaluation(system, exercise):
+    with patch('math_tutor.system_GB_Coach.Task'), patch('math_tutor.system_GB_Coach.Crew') as mock_crew:
+        mock_crew.return_value.kickoff.side_effect = ["Réponse libre sans JSON", EVALUATION]
+        evaluation, coaching = system.evaluate_and_coach(exercise, "Parce que")
+
+    assert evaluation == EVALUATION
+    assert coaching is None
+
+
+def test_symbolic_grade_skips_the_llm(system):
+    exercise = Exercise(
+        exercise="Déterminer le domaine de définition de la fonction f(x) = 1/(x - 2)",
+        solution="Df = R-{2}",
+        hints=[],
+        difficulty="Élémentaire",
+        concept="Domaine de définition"
+    )
+    with patch('math_tutor.system_GB_Coach.Crew') as mock_crew:
+        evaluation, coaching = system.evaluate_and_coach(exercise, "R-{2}")
+
+    assert evaluation.is_correct is True
+    assert coaching is None
+    assert not mock_crew.called
+
+
+@pytest.mark.performance
+def test_combined_mode_halves_feedback_latency(system, exercise):
+    """Comparaison de latence à aller-retour LLM constant: deux appels contre un seul"""
+    with patch('math_tutor.system_GB_Coach.Task'), patch('math_tutor.system_GB_Coach.Crew') as mock_crew:
+        system.combined_evaluation = False
+        mock_crew.return_value.kickoff.side_effect = slow_kickoff(EVALUATION, COACHING)
+        start = time.perf_counter()
+        evaluation, _ = system.evaluate_and_coach(exercise, "Parce que")
+        system._provide_personalized_coaching(evaluation, exercise)
+        two_calls = time.perf_counter() - start
+
+        system.combined_evaluation = True
+        mock_crew.return_value.kickoff.side_effect = slow_kickoff(
+            EvaluationWithCoaching(evaluation=EVALUATION, coaching=COACHING))
+        start = time.perf_counter()
+        system.evaluate_and_coach(exercise, "Parce que")
+        one_call = time.perf_counter() - start
+
+    assert two_calls >= 2 * ROUND_TRIP_SECONDS
+    assert one_call < two_calls - 0.5 * ROUND_TRIP_SECONDS
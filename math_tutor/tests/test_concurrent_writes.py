@@ -0,0 +1,81 @@
+import threading
+import pytest
+from math_tutor.system_GB_Coach import StudentManager, StudentProfile
+from math_tutor.utils.metrics import PerformanceMetrics
+from math_tutor.utils.student_store import JsonStudentStore, ProfileConflict, SqliteStudentStore
+
+
+def stores(tmp_path):
+    return {
+        "json": lambda: JsonStudentStore(tmp_path, metrics=PerformanceMetrics()),
+        "sqlite": lambda: SqliteStudentStore(tmp_path / "students.db", metrics=PerformanceMetrics()),
+    }
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_stale_profile_is_rejected(tmp_path, backend):
+    new_store = stores(tmp_path)[backend]
+    new_store().save(StudentProfile(student_id="s1", name="Élève"))
+    tab_a = StudentProfile(**new_store().load("s1"))
+    tab_b = StudentProfile(**new_store().load("s1"))
+
+    tab_a.level = 2
+    new_store().save(tab_a)
+    tab_b.current_objective = "Limites"
+    with pytest.raises(ProfileConflict):
+        new_store().save(tab_b)
+
+    reloaded = StudentProfile(**new_store().load("s1"))
+    assert (reloaded.level, reloaded.current_objective, reloaded.version) == (2, None, 2)
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_concurrent_writers_lose_no_update(tmp_path, backend):
+    new_store = stores(tmp_path)[backend]
+    new_store().save(StudentProfile(student_id="s1"))
+
+    def worker(n):
+        store = new_store()  # un stockage par "processus": seuls les verrous de fichier/de base les coordonnent
+        for i in range(10):
+            while True:
+                student = StudentProfile(**store.load("s1"))
+                student.learning_history.append({"attempt_id": f"{n}-{i}"})
+                try:
+                    store.save(student)
+                    break
+                except ProfileConflict:
+                    continue
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    history = StudentProfile(**new_store().load("s1")).learning_history
+    assert sorted(entry["attempt_id"] for entry in history) == sorted(f"{n}-{i}" for n in range(4) for i in range(10))
+
+
+def test_create_never_overwrites_an_existing_student(tmp_path, monkeypatch):
+    manager = StudentManager(data_dir=tmp_path, enable_memory=False)
+    first = manager.create_student("Ali")
+    ids = iter([first.student_id, "20250601100000000001"])
+    monkeypatch.setattr("math_tutor.system_GB_Coach.new_student_id", lambda: next(ids))
+
+    second = manager.create_student("Sara")
+    assert second.student_id == "20250601100000000001"
+    assert manager.load_student(first.student_id).name == "Ali"
+
+
+def test_student_ids_are_unique_across_threads(tmp_path):
+    manager = StudentManager(data_dir=tmp_path, enable_memory=False)
+    created = []
+    threads = [threading.Thread(target=lambda: created.extend(manager.create_student(f"É{i}") for i in range(25)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({student.student_id for student in created}) == 100
+    assert len(manager.store.student_ids()) == 100
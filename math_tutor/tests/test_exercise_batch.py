@@ -0,0 +1,76 @@
+from unittest.mock import Mock
+import pytest
+from math_tutor.system_GB_Coach import MathTutoringSystem, ExerciseBatch
+from math_tutor.utils.metrics import metrics
+
+
+def item(text):
+    return {"exercise": text, "solution": "...", "hints": ["Indice"], "difficulty": "?", "concept": "?"}
+
+
+@pytest.fixture
+def system():
+    system = MathTutoringSystem()
+    system.llm = Mock()
+    system.generation_mode = "llm"
+    metrics.reset()
+    return system
+
+
+def fake_kickoff(*batches, tokens=300):
+    """_kickoff factice: renvoie les lots dans l'ordre et déclare les tokens consommés"""
+    calls = []
+    batches = iter(batches)
+
+    def kickoff(call_site, agent, description, expected_output, output_model, verbose=False, usage=None):
+        calls.append(description)
+        if usage is not None:
+            usage["total_tokens"] = tokens
+        return next(batches)
+    kickoff.calls = calls
+    return kickoff
+
+
+def test_single_call_for_the_whole_batch(system):
+    system._kickoff = fake_kickoff(ExerciseBatch(exercises=[item(f"f(x) = 1/(x - {i})") for i in range(3)]))
+
+    exercises = system.generate_exercises("Domaine de définition", 2, 3)
+
+    assert [e.exercise for e in exercises] == [f"f(x) = 1/(x - {i})" for i in range(3)]
+    assert all(e.difficulty == "Élémentaire" and e.concept == "Domaine de définition" for e in exercises)
+    assert len(system._kickoff.calls) == 1
+    timings = metrics.snapshot()["timings"]
+    assert timings["exercise_batch_tokens_per_exercise"]["max"] == 100
+    assert "exercise_batch_seconds_per_exercise" in timings
+
+
+def test_only_failed_items_are_regenerated(system):
+    first = ExerciseBatch(exercises=[item("A"), {"exercise": "sans solution"}, item("a "), item("B")])
+    second = ExerciseBatch(exercises=[item("C"), item("D")])
+    system._kickoff = fake_kickoff(first, second)
+
+    exercises = system.generate_exercises("Domaine de définition", 1, 4)
+
+    assert [e.exercise for e in exercises] == ["A", "B", "C", "D"]
+    # La relance ne demande que les 2 manquants et cite les exercices déjà obtenus
+    assert "Crée 2 exercices" in system._kickoff.calls[1]
+    assert "- A" in system._kickoff.calls[1]
+    assert metrics.counter("exercise_batch_invalid") == 1
+    assert metrics.counter("exercise_batch_duplicate") == 1
+
+
+def test_unusable_batches_raise(system):
+    system._kickoff = fake_kickoff("pas de JSON", "toujours pas")
+
+    with pytest.raises(ValueError):
+        system.generate_exercises("Domaine de définition", 1, 2)
+
+
+def test_local_mode_batch(system):
+    system.generation_mode = "local"
+    system._kickoff = Mock()
+
+    exercises = system.generate_exercises("Calcul des limites", 1, 3)
+
+    assert len(exercises) == 3
+    assert not system._kickoff.called
@@ -0,0 +1,101 @@
+import threading
+import time
+import pytest
+from math_tutor.utils import exercise_pool
+from math_tutor.utils.exercise_pool import ExercisePool, get_shared_pool
+from math_tutor.utils.metrics import PerformanceMetrics
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def pool():
+    counter = {"n": 0}
+    lock = threading.Lock()
+
+    def generator(objective, level):
+        with lock:
+            counter["n"] += 1
+            return f"{objective}-{level}-{counter['n']}"
+
+    pool = ExercisePool(generator, depth=2, max_workers=2, metrics=PerformanceMetrics())
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def test_first_draw_is_a_miss_and_triggers_refill(pool):
+    assert pool.draw("Limites", 1) is None
+    assert wait_for(lambda: pool.size("Limites", 1) == 2)
+
+    stats = pool.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 0
+
+
+def test_draw_after_prefetch_is_a_hit(pool):
+    pool.prefetch("Limites", 2)
+    assert wait_for(lambda: pool.size("Limites", 2) == 2)
+
+    exercise = pool.draw("Limites", 2)
+    assert exercise.startswith("Limites-2-")
+    assert pool.stats()["hits"] == 1
+    # La réserve est rechargée après le tirage
+    assert wait_for(lambda: pool.size("Limites", 2) == 2)
+
+
+def test_prefetch_never_exceeds_depth(pool):
+    for _ in range(5):
+        pool.prefetch("Domaine", 1)
+    assert wait_for(lambda: pool.size("Domaine", 1) == 2)
+    time.sleep(0.05)
+    assert pool.size("Domaine", 1) == 2
+
+
+def test_generator_errors_are_counted():
+    def failing(objective, level):
+        raise RuntimeError("LLM indisponible")
+
+    pool = ExercisePool(failing, depth=1, max_workers=1, metrics=PerformanceMetrics())
+    pool.prefetch("Domaine", 1)
+    assert wait_for(lambda: pool.stats()["refill_errors"] == 1)
+    assert pool.size("Domaine", 1) == 0
+    pool.shutdown(wait=True)
+
+
+@pytest.fixture
+def fresh_shared_pool(monkeypatch):
+    """Réserve du processus remise à zéro puis restaurée: les autres tests n'héritent pas d'un générateur factice"""
+    monkeypatch.setattr(exercise_pool, "_shared_pool", None)
+    yield
+    if exercise_pool._shared_pool is not None:
+        exercise_pool._shared_pool.shutdown()
+
+
+def test_shared_pool_is_process_wide(fresh_shared_pool):
+    first = get_shared_pool(lambda objective, level: "a")
+    second = get_shared_pool(lambda objective, level: "b")
+    assert first is second
+
+
+def test_missing_exercises_are_generated_in_one_batch():
+    calls = []
+
+    def batch(objective, level, n):
+        calls.append(n)
+        return [f"{objective}-{level}-lot-{i}" for i in range(n)]
+
+    pool = ExercisePool(lambda objective, level: "unitaire", depth=3, max_workers=1,
+                        metrics=PerformanceMetrics(), batch_generator=batch)
+    pool.prefetch("Limites", 1)
+    assert wait_for(lambda: pool.size("Limites", 1) == 3)
+
+    assert calls == [3]
+    assert pool.draw("Limites", 1) == "Limites-1-lot-0"
+    pool.shutdown(wait=True)
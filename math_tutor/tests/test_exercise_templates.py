@@ -0,0 +1,107 @@
+import json
+from pathlib import Path
+import pytest
+import sympy as sp
+from math_tutor.utils.exercise_templates import ParametricExerciseGenerator, format_set
+from math_tutor.utils.symbolic_grader import SymbolicGrader, parse_domain_answer
+
+OBJECTIVES_FILE = Path(__file__).resolve().parents[1] / "objectifs.json"
+
+with open(OBJECTIVES_FILE, encoding="utf-8") as f:
+    OBJECTIVES = json.load(f)
+
+LEVELS = [(name, int(level)) for name, obj in OBJECTIVES.items() for level in obj["niveaux"]]
+
+
+def reference_answer(exercise):
+    """Dernière ligne de la solution, sans le préfixe"""
+    last_line = exercise["solution"].splitlines()[-1]
+    return last_line.split("=", 1)[-1].replace("La limite vaut", "").strip(" .")
+
+
+@pytest.mark.parametrize("objective, level", LEVELS)
+def test_every_level_has_a_self_consistent_template(objective, level):
+    generator = ParametricExerciseGenerator(OBJECTIVES, seed=0)
+    exercise = generator.generate(objective, level)
+
+    assert exercise is not None
+    assert exercise["concept"] == objective
+    assert exercise["difficulty"] == OBJECTIVES[objective]["niveaux"][str(level)]["name"]
+    # La solution calculée est acceptée par le correcteur symbolique
+    grade = SymbolicGrader().grade(exercise["exercise"], reference_answer(exercise), objective)
+    assert grade is not None and grade.is_correct
+
+
+def test_same_seed_same_exercises():
+    first = ParametricExerciseGenerator(OBJECTIVES, seed=42)
+    second = ParametricExerciseGenerator(OBJECTIVES, seed=42)
+    for _ in range(3):
+        assert first.generate("Domaine de définition", 2) == second.generate("Domaine de définition", 2)
+
+
+def test_exercises_vary_between_draws():
+    generator = ParametricExerciseGenerator(OBJECTIVES, seed=1)
+    statements = {generator.generate("Domaine de définition", 2)["exercise"] for _ in range(10)}
+    assert len(statements) > 1
+
+
+def test_unknown_level_returns_none():
+    generator = ParametricExerciseGenerator(OBJECTIVES)
+    assert generator.generate("Domaine de définition", 99) is None
+    assert generator.generate("Inconnu", 1) is None
+
+
+def test_find_level_by_difficulty_name():
+    generator = ParametricExerciseGenerator(OBJECTIVES)
+    assert generator.find_level("Domaine de définition", "Élémentaire") == 2
+    assert generator.find_level("Domaine de définition", "Inexistant") is None
+
+
+@pytest.mark.parametrize("domain", [
+    sp.S.Reals,
+    sp.S.Reals - sp.FiniteSet(6),
+    sp.Interval(sp.Rational(-3, 2), sp.oo),
+    sp.Union(sp.Interval.Ropen(-2, 1), sp.Interval(2, sp.oo)),
+])
+def test_format_set_round_trip(domain):
+    assert parse_domain_answer(format_set(domain)) == domain
+
+
+def test_local_mode_builds_exercises_without_llm():
+    from unittest.mock import patch
+    from math_tutor.system_GB_Coach import MathTutoringSystem, Exercise
+    system = MathTutoringSystem()
+    system.generation_mode = "local"
+
+    with patch('math_tutor.system_GB_Coach.Crew') as mock_crew:
+        exercise = system._build_exercise("Calcul des limites", 2)
+        similar = system._generate_similar_exercise(exercise)
+
+    assert isinstance(exercise, Exercise) and isinstance(similar, Exercise)
+    assert similar.difficulty == exercise.difficulty
+    assert not mock_crew.called
+
+
+def test_local_mode_raises_for_unknown_level():
+    from math_tutor.system_GB_Coach import MathTutoringSystem
+    system = MathTutoringSystem()
+    system.generation_mode = "local"
+
+    with pytest.raises(ValueError):
+        system._build_exercise("Domaine de définition", 99)
+
+
+def test_llm_generation_does_not_compute_the_local_fallback():
+    from unittest.mock import Mock
+    from math_tutor.system_GB_Coach import MathTutoringSystem, StudentProfile
+    system = MathTutoringSystem()
+    system.llm = Mock()
+    system.generation_mode = "llm"
+    system.current_student = StudentProfile(student_id="s1", current_objective="Domaine de définition")
+    system._build_exercise = Mock(return_value=Mock(hints=[], difficulty="Débutant", concept="Domaine de définition",
+                                                    model_dump=Mock(return_value={})))
+    system._local_exercise = Mock()
+
+    system._generate_exercise()
+
+    assert not system._local_exercise.called
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+import pytest
+from math_tutor.utils.async_runner import AsyncRunner
+from math_tutor.utils.job_executor import Job, JobExecutor
+from math_tutor.utils.metrics import PerformanceMetrics
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def executor():
+    metrics = PerformanceMetrics()
+    return JobExecutor(max_workers=2, runner=AsyncRunner(metrics=metrics), metrics=metrics)
+
+
+def test_job_status_is_polled_without_blocking(executor):
+    release = threading.Event()
+    job = executor.submit("s", 1, "evaluation", lambda: release.wait(2) and "évalué")
+    assert wait_until(lambda: job.status == Job.RUNNING)
+    assert not job.done()
+
+    release.set()
+    assert wait_until(job.done)
+    assert job.status == Job.DONE
+    assert executor.collect(job) == "évalué"
+    assert executor.get("s", 1, "evaluation") is None
+    assert executor.metrics.sample_count("job_evaluation_seconds") == 1
+
+
+def test_duplicate_submission_for_the_same_attempt_is_ignored(executor):
+    calls = []
+    release = threading.Event()
+
+    def work(answer):
+        calls.append(answer)
+        release.wait(2)
+        return answer
+
+    first = executor.submit("s", "ex#1", "evaluation", work, "x > 3")
+    second = executor.submit("s", "ex#1", "evaluation", work, "x > 3")
+    other_session = executor.submit("t", "ex#1", "evaluation", work, "x < 3")
+    release.set()
+
+    assert second is first
+    assert other_session is not first
+    assert wait_until(lambda: first.done() and other_session.done())
+    assert sorted(calls) == ["x < 3", "x > 3"]
+    assert executor.metrics.counter("job_duplicate_ignored") == 1
+
+
+def test_failed_job_can_be_resubmitted(executor):
+    def fail():
+        raise RuntimeError("OCR impossible")
+
+    failed = executor.submit("s", 1, "ocr", fail)
+    assert wait_until(failed.done)
+    assert failed.status == Job.FAILED and isinstance(failed.error, RuntimeError)
+
+    retry = executor.submit("s", 1, "ocr", lambda: "texte")
+    assert retry is not failed
+    assert wait_until(retry.done) and retry.result() == "texte"
+
+
+def test_cancel_interrupts_coroutine_jobs_of_the_session(executor):
+    interrupted = []
+
+    async def generation():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            interrupted.append(True)
+            raise
+
+    job = executor.submit("s", "exercise#1", "exercise", generation())
+    other = executor.submit("t", "exercise#1", "exercise", generation())
+    assert wait_until(lambda: job.status == Job.RUNNING and other.status == Job.RUNNING)
+
+    assert executor.cancel("s") == 1
+    assert wait_until(lambda: interrupted == [True])
+    assert job.status == Job.CANCELLED
+    assert other.status == Job.RUNNING
+    executor.cancel("t")
+
+
+def test_finished_jobs_expire(executor):
+    executor.ttl = 0.0
+    job = executor.submit("s", 1, "exercise", lambda: "ok")
+    assert wait_until(job.done)
+    time.sleep(0.01)
+    executor.submit("s", 2, "exercise", lambda: "ok")
+    assert executor.get("s", 1, "exercise") is None
+
+
+def test_expected_duration_needs_a_few_samples(executor):
+    for seconds in (1.0, 2.0):
+        executor.metrics.observe("job_exercise_seconds", seconds)
+    assert executor.expected_seconds("exercise") is None
+    executor.metrics.observe("job_exercise_seconds", 3.0)
+    assert executor.expected_seconds("exercise") == pytest.approx(2.0)
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+from unittest.mock import patch
+from math_tutor.import_report import HEAVY_MODULES, parse_importtime, summarize
+from math_tutor.utils.lazy_import import LazyImport
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     math_tutor.utils.metrics
+import time:      2500 |       2620 |   math_tutor.utils.lazy_import
+import time:     40000 |     900000 | math_tutor.system_GB_Coach
+"""
+
+
+def test_parse_importtime():
+    entries = parse_importtime(IMPORTTIME)
+
+    assert [(entry.name, entry.depth) for entry in entries] == [
+        ("math_tutor.utils.metrics", 2), ("math_tutor.utils.lazy_import", 1), ("math_tutor.system_GB_Coach", 0)]
+    summary = summarize("math_tutor.system_GB_Coach", entries)
+    assert summary["total_ms"] == 900.0
+    assert summary["heavy_loaded"] == []
+    assert [entry.name for entry in summary["top"]] == ["math_tutor.system_GB_Coach", "math_tutor.utils.lazy_import"]
+
+
+def test_lazy_import_loads_on_first_use():
+    json = LazyImport("json")
+    dumps = LazyImport("json", "dumps")
+
+    assert not json.loaded
+    assert json.loads("[1]") == [1]
+    assert json.loaded
+    assert dumps([1]) == "[1]"
+
+
+def test_lazy_names_remain_patchable():
+    import math_tutor.system_GB_Coach as module
+    with patch("math_tutor.system_GB_Coach.Crew") as crew:
+        assert module.Crew is crew
+    assert isinstance(module.Crew, LazyImport)
+
+
+def test_importing_the_tutor_does_not_load_heavy_dependencies():
+    code = ("import sys, math_tutor.system_GB_Coach; "
+            f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == ""
@@ -0,0 +1,159 @@
+import json
+import os
+import time
+from unittest.mock import MagicMock, patch
+import pytest
+from math_tutor.utils.llm_cache import LLMCache
+from math_tutor.utils.metrics import PerformanceMetrics
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(
+        tmp_path / "llm_cache",
+        max_memory_entries=2,
+        max_disk_entries=3,
+        ttl_seconds=60,
+        enabled_sites=["evaluation"],
+        metrics=PerformanceMetrics()
+    )
+
+
+def test_key_depends_on_every_component():
+    base = LLMCache.make_key("prompt", "Évaluateur", "llama", 0.7)
+    assert base == LLMCache.make_key("prompt", "Évaluateur", "llama", 0.7)
+    assert base != LLMCache.make_key("prompt 2", "Évaluateur", "llama", 0.7)
+    assert base != LLMCache.make_key("prompt", "Coach", "llama", 0.7)
+    assert base != LLMCache.make_key("prompt", "Évaluateur", "mixtral", 0.7)
+    assert base != LLMCache.make_key("prompt", "Évaluateur", "llama", 0.2)
+
+
+def test_per_call_site_opt_in(cache):
+    assert cache.enabled("evaluation")
+    assert not cache.enabled("exercise_generation")
+
+
+def test_memory_lru_evicts_least_recently_used(cache):
+    cache.set("a" * 64, {"v": 1})
+    cache.set("b" * 64, {"v": 2})
+    cache.get("a" * 64)  # "a" devient le plus récent
+    cache.set("c" * 64, {"v": 3})
+
+    assert set(cache._memory) == {"a" * 64, "c" * 64}
+    # "b" reste disponible sur disque
+    assert cache.get("b" * 64) == {"v": 2}
+    assert cache.metrics.counter("llm_cache_disk_hit") == 1
+
+
+def test_ttl_expiry(cache):
+    key = "d" * 64
+    cache.set(key, {"v": 1})
+    cache.ttl_seconds = 0
+    time.sleep(0.01)
+
+    assert cache.get(key) is None
+    assert not cache._path(key).exists()
+    assert cache.metrics.counter("llm_cache_miss") == 1
+
+
+def test_disk_eviction_keeps_most_recent(cache):
+    keys = [f"{i}" * 64 for i in range(5)]
+    for i, key in enumerate(keys):
+        cache.set(key, {"v": i})
+        path = cache._path(key)
+        os.utime(path, (1000 + i, 1000 + i))
+    cache._evict_disk()
+
+    remaining = {p.stem for p in (cache.cache_dir).glob("*/*.json")}
+    assert remaining == set(keys[-3:])
+    assert cache.stats()["disk_entries"] == 3
+
+
+def test_disk_entry_survives_restart(cache, tmp_path):
+    key = "e" * 64
+    cache.set(key, {"v": 42})
+
+    restarted = LLMCache(tmp_path / "llm_cache", ttl_seconds=60, metrics=PerformanceMetrics())
+    assert restarted.get(key) == {"v": 42}
+    assert not list(restarted.cache_dir.glob("*/*.tmp"))
+
+
+def test_corrupted_disk_entry_is_dropped(cache):
+    key = "f" * 64
+    cache.set(key, {"v": 1})
+    cache._memory.clear()
+    cache._path(key).write_text("{pas du json", encoding="utf-8")
+
+    assert cache.get(key) is None
+    assert not cache._path(key).exists()
+
+
+class TestKickoffCache:
+    """Revalidation des entrées du cache dans les modèles Pydantic"""
+
+    @pytest.fixture
+    def system(self, tmp_path):
+        from math_tutor.system_GB_Coach import MathTutoringSystem
+        system = MathTutoringSystem()
+        system.llm_cache = LLMCache(tmp_path / "llm_cache", enabled_sites=["evaluation"],
+                                    metrics=PerformanceMetrics())
+        system.llm_backend = "crew"
+        return system
+
+    @pytest.fixture
+    def evaluation_payload(self):
+        return {
+            "is_correct": True,
+            "error_type": None,
+            "feedback": "Bien",
+            "detailed_explanation": "...",
+            "step_by_step_correction": "...",
+            "recommendations": []
+        }
+
+    def _key(self, system, agent, prompt):
+        return LLMCache.make_key(prompt, agent.role, system.model_name, system.temperature)
+
+    def test_cache_hit_skips_crew(self, system, evaluation_payload):
+        from math_tutor.system_GB_Coach import EvaluationResult
+        agent = MagicMock(role="Évaluateur Expert")
+        system.llm_cache.set(self._key(system, agent, "prompt"), evaluation_payload)
+
+        with patch('math_tutor.system_GB_Coach.Task'), patch('math_tutor.system_GB_Coach.Crew') as mock_crew:
+            result = system._kickoff("evaluation", agent, "prompt", "...", EvaluationResult)
+
+        assert isinstance(result, EvaluationResult)
+        assert result.is_correct is True
+        assert not mock_crew.called
+
+    def test_invalid_cached_entry_is_invalidated(self, system, evaluation_payload):
+        from math_tutor.system_GB_Coach import EvaluationResult
+        agent = MagicMock(role="Évaluateur Expert")
+        key = self._key(system, agent, "prompt")
+        system.llm_cache.set(key, {"ancien_schema": True})
+        fresh = EvaluationResult(**evaluation_payload)
+
+        with patch('math_tutor.system_GB_Coach.Task'), patch('math_tutor.system_GB_Coach.Crew') as mock_crew:
+            mock_crew.return_value.kickoff.return_value = fresh
+            result = system._kickoff("evaluation", agent, "prompt", "...", EvaluationResult)
+
+        assert result is fresh
+        assert mock_crew.return_value.kickoff.called
+        assert system.llm_cache.get(key) == fresh.model_dump()
+
+    def test_unstructured_output_is_returned_as_is(self, system):
+        from math_tutor.system_GB_Coach import EvaluationResult
+        agent = MagicMock(role="Évaluateur Expert")
+
+        with patch('math_tutor.system_GB_Coach.Task'), patch('math_tutor.system_GB_Coach.Crew') as mock_crew:
+            mock_crew.return_value.kickoff.return_value = "Réponse libre sans JSON"
+            result = system._kickoff("evaluation", agent, "prompt", "...", EvaluationResult)
+
+        assert result == "Réponse libre sans JSON"
+        assert system.llm_cache.get(self._key(system, agent, "prompt")) is None
+
+    def test_coerce_output_accepts_json_text(self, evaluation_payload):
+        from math_tutor.system_GB_Coach import MathTutoringSystem, EvaluationResult
+        text = "Voici le résultat: " + json.dumps(evaluation_payload)
+        result = MathTutoringSystem._coerce_output(text, EvaluationResult)
+        assert result.feedback == "Bien"
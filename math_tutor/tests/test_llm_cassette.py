@@ -0,0 +1,81 @@
+import json
+import time
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+from math_tutor.utils.llm_cassette import Cassette, CassetteLLM, CassetteMiss, cassette_from_env
+from math_tutor.utils.metrics import PerformanceMetrics
+
+EXERCISE = {"exercise": "Déterminer le domaine de définition de f(x) = 1/(x - 3)", "solution": "R-{3}",
+            "hints": [], "difficulty": "Élémentaire", "concept": "Domaine de définition"}
+
+
+def make_llm(path, mode, inner=None, latency_scale=0.0):
+    return CassetteLLM(inner=inner, cassette=Cassette(path, truncate=mode == "record"), mode=mode,
+                       latency_scale=latency_scale, model_name="llama-3.3-70b-versatile",
+                       temperature=0.7, metrics=PerformanceMetrics())
+
+
+def test_record_then_replay_offline(tmp_path):
+    path = tmp_path / "cassette.json"
+    recorder = make_llm(path, "record", inner=FakeListChatModel(responses=["un", "deux"]))
+    assert recorder.invoke([HumanMessage(content="a")]).content == "un"
+    assert recorder.invoke([HumanMessage(content="b")]).content == "deux"
+
+    player = make_llm(path, "replay")
+    assert player.invoke([HumanMessage(content="b")]).content == "deux"
+    assert player.invoke([HumanMessage(content="a")]).content == "un"
+    with pytest.raises(CassetteMiss):
+        player.invoke([HumanMessage(content="c")])
+
+
+def test_repeated_request_replays_recordings_in_order(tmp_path):
+    path = tmp_path / "cassette.json"
+    recorder = make_llm(path, "record", inner=FakeListChatModel(responses=["ex1", "ex2"]))
+    recorder.invoke("même prompt")
+    recorder.invoke("même prompt")
+
+    player = make_llm(path, "replay")
+    assert [player.invoke("même prompt").content for _ in range(3)] == ["ex1", "ex2", "ex1"]
+
+
+def test_replay_reproduces_recorded_latency(tmp_path):
+    path = tmp_path / "cassette.json"
+    cassette = Cassette(path)
+    key = Cassette.make_key("llama-3.3-70b-versatile", 0.7, [HumanMessage(content="a")])
+    cassette.add(key, {"response": "ok", "latency": 0.2, "token_usage": {"total_tokens": 42}})
+
+    start = time.perf_counter()
+    make_llm(path, "replay", latency_scale=1.0).invoke("a")
+    assert time.perf_counter() - start >= 0.2
+
+    start = time.perf_counter()
+    make_llm(path, "replay", latency_scale=0.0).invoke("a")
+    assert time.perf_counter() - start < 0.1
+
+
+def test_env_without_cassette_uses_live_client(monkeypatch):
+    monkeypatch.delenv("LLM_CASSETTE", raising=False)
+    live = object()
+    assert cassette_from_env("m", 0.7, lambda: live) is live
+
+
+def test_system_replays_generation_without_network(tmp_path, monkeypatch):
+    from math_tutor.system_GB_Coach import MathTutoringSystem, StudentProfile
+    path = tmp_path / "cassette.json"
+
+    monkeypatch.setenv("LLM_CASSETTE", str(path))
+    monkeypatch.setenv("LLM_CASSETTE_MODE", "record")
+    monkeypatch.setenv("SINGLE_FLIGHT", "0")
+    recorder = MathTutoringSystem()
+    recorder.llm.inner = FakeListChatModel(responses=[json.dumps(EXERCISE, ensure_ascii=False)])
+    recorder.current_student = StudentProfile(student_id="s1")
+    recorded = recorder._generate_exercise("Domaine de définition", 1)
+
+    monkeypatch.setenv("LLM_CASSETTE_MODE", "replay")
+    monkeypatch.setenv("LLM_CASSETTE_LATENCY", "none")
+    player = MathTutoringSystem()
+    player.current_student = StudentProfile(student_id="s1")
+    assert player.llm.inner is None
+    assert player._generate_exercise("Domaine de définition", 1) == recorded
+    assert recorded.exercise == EXERCISE["exercise"]
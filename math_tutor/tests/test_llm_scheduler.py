@@ -0,0 +1,120 @@
+from unittest.mock import Mock
+import pytest
+from math_tutor.utils.llm_scheduler import LLMScheduler, LLMBudgetExceeded, Priority
+from math_tutor.utils.metrics import PerformanceMetrics
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_scheduler(rpm=0, tpm=0, **kwargs):
+    clock = FakeClock()
+    no_wait = {priority: 0.0 for priority in Priority}
+    scheduler = LLMScheduler(rpm, tpm, max_wait=no_wait, metrics=PerformanceMetrics(), clock=clock, **kwargs)
+    return scheduler, clock
+
+
+def test_unlimited_by_default():
+    scheduler, _ = make_scheduler()
+    for _ in range(100):
+        scheduler.acquire("evaluation", 5000)
+
+
+def test_call_site_priorities():
+    assert LLMScheduler.priority_for("evaluation") == Priority.INTERACTIVE
+    assert LLMScheduler.priority_for("exercise_generation") == Priority.GENERATION
+    assert LLMScheduler.priority_for("coaching") == Priority.BACKGROUND
+    with LLMScheduler.background():
+        assert LLMScheduler.priority_for("exercise_generation") == Priority.BACKGROUND
+
+
+def test_background_leaves_a_reserve_for_interactive_calls():
+    scheduler, _ = make_scheduler(rpm=4)
+    with LLMScheduler.background():
+        scheduler.acquire("exercise_generation", 0)
+        scheduler.acquire("exercise_generation", 0)
+        with pytest.raises(LLMBudgetExceeded):
+            scheduler.acquire("exercise_generation", 0)
+
+    scheduler.acquire("evaluation", 0)
+    scheduler.acquire("evaluation", 0)
+    with pytest.raises(LLMBudgetExceeded):
+        scheduler.acquire("evaluation", 0)
+    assert scheduler.metrics.counter("llm_scheduler_background_rejected") == 1
+
+
+def test_budget_refills_over_time():
+    scheduler, clock = make_scheduler(rpm=60)
+    scheduler.requests.level = 0
+    with pytest.raises(LLMBudgetExceeded):
+        scheduler.acquire("evaluation", 0)
+    clock.now += 1.0  # 60 requêtes/min = 1 par seconde
+    scheduler.acquire("evaluation", 0)
+
+
+def test_waiting_interactive_call_blocks_lower_priorities():
+    scheduler, _ = make_scheduler(rpm=100)
+    scheduler._waiting[Priority.INTERACTIVE] = 1
+    with pytest.raises(LLMBudgetExceeded):
+        scheduler.acquire("exercise_generation", 0)
+
+
+def test_token_reservation_is_settled_with_actual_usage():
+    scheduler, _ = make_scheduler(tpm=10000)
+    usage = {}
+    with scheduler.slot("evaluation", 3000, usage):
+        usage["total_tokens"] = 1200
+    assert scheduler.tokens.level == pytest.approx(8800)
+
+
+def test_provider_rate_limit_drains_the_buckets():
+    scheduler, _ = make_scheduler(rpm=30, tpm=10000)
+    with pytest.raises(RuntimeError):
+        with scheduler.slot("evaluation", 100):
+            raise RuntimeError("Error code: 429 - Rate limit reached for model")
+    assert scheduler.requests.level <= 0
+    with pytest.raises(LLMBudgetExceeded):
+        scheduler.acquire("evaluation", 100)
+
+
+class TestDegradation:
+    """Budget épuisé: les chemins locaux prennent le relais sans exception"""
+
+    @pytest.fixture
+    def system(self):
+        from math_tutor.system_GB_Coach import MathTutoringSystem, StudentProfile
+        system = MathTutoringSystem()
+        system.llm = Mock()
+        system.generation_mode = "llm"
+        system.llm_cache.enabled_sites = set()
+        system.single_flight = None
+        system.current_student = StudentProfile(student_id="s1", current_objective="Domaine de définition", level=2)
+        system.llm_scheduler, _ = make_scheduler(rpm=1)
+        system.llm_scheduler.requests.level = 0
+        system.structured_llm = Mock()
+        return system
+
+    def test_generation_falls_back_to_local_exercise(self, system):
+        exercise = system._generate_exercise()
+        assert exercise.concept == "Domaine de définition"
+        assert not system.structured_llm.invoke.called
+
+    def test_evaluation_falls_back_to_symbolic_grading(self, system):
+        from math_tutor.system_GB_Coach import Exercise
+        exercise = Exercise(exercise="Déterminer le domaine de définition de la fonction f(x) = 1/(x - 3)",
+                            solution="R-{3}", hints=[], difficulty="Élémentaire", concept="Domaine de définition")
+        evaluation = system._evaluate_response(exercise, "R-{3}", detailed=True)
+        assert evaluation.is_correct is True
+
+    def test_coaching_falls_back(self, system):
+        from math_tutor.system_GB_Coach import Exercise, EvaluationResult
+        exercise = Exercise(exercise="?", solution="?", hints=[], difficulty="Débutant", concept="Calcul des limites")
+        evaluation = EvaluationResult(is_correct=False, feedback="", detailed_explanation="",
+                                      step_by_step_correction="", recommendations=[])
+        coaching = system._provide_personalized_coaching(evaluation, exercise)
+        assert coaching.motivation == "Continuez vos efforts!"
@@ -0,0 +1,76 @@
+import json
+from unittest.mock import MagicMock, Mock
+import pytest
+from langchain_core.messages import AIMessage
+from math_tutor.utils.metrics import PerformanceMetrics
+from math_tutor.utils.model_router import ModelRouter, ModelTier, parse_routes
+
+TIERS = [
+    ModelTier(name="large", model="llama-3.3-70b-versatile", temperature=0.7, latency_budget=10),
+    ModelTier(name="small", model="llama-3.1-8b-instant", temperature=0.7, latency_budget=2),
+]
+COACHING = {"motivation": "Courage", "strategy": "Relire", "tip": "Vérifier", "encouragement": ["Bravo"]}
+
+
+def make_router(**kwargs):
+    return ModelRouter(lambda tier: Mock(name=tier.model), tiers=TIERS, metrics=PerformanceMetrics(), **kwargs)
+
+
+def test_default_routes_send_coaching_to_the_small_model():
+    router = make_router()
+    assert router.route("exercise_generation").name == "large"
+    assert router.route("evaluation").name == "large"
+    assert router.route("coaching").name == "small"
+
+
+def test_routes_are_configurable():
+    assert parse_routes("coaching=large, evaluation=small")["evaluation"] == "small"
+    with pytest.raises(ValueError):
+        make_router(routes={"coaching": "medium"})
+
+
+def test_slow_tier_is_downgraded_then_probed():
+    router = make_router()
+    for _ in range(5):
+        router.record(router.tier("large"), 15.0)  # p95 > budget de 10 s
+
+    routed = [router.route("exercise_generation").name for _ in range(ModelRouter.PROBE_EVERY)]
+
+    assert routed[:-1] == ["small"] * (ModelRouter.PROBE_EVERY - 1)
+    assert routed[-1] == "large"  # sonde pour rafraîchir la mesure
+    assert router.metrics.counter("llm_route_downgraded") == ModelRouter.PROBE_EVERY - 1
+    assert router.metrics.counter("llm_route_exercise_generation_small") == ModelRouter.PROBE_EVERY - 1
+
+
+def test_fast_tier_is_kept():
+    router = make_router()
+    for _ in range(5):
+        router.record(router.tier("large"), 3.0)
+    assert router.route("evaluation").name == "large"
+
+
+def test_clients_are_built_once_per_tier():
+    factory = Mock(side_effect=lambda tier: object())
+    router = ModelRouter(factory, tiers=TIERS, metrics=PerformanceMetrics())
+    assert router.client(TIERS[1]) is router.client(TIERS[1])
+    assert factory.call_count == 1
+
+
+def test_system_sends_coaching_to_the_small_model():
+    from math_tutor.system_GB_Coach import MathTutoringSystem, CoachPersonal
+    system = MathTutoringSystem()
+    system.llm_backend = "direct"
+    system.llm_cache.enabled_sites = set()
+    system.single_flight = None
+    small_llm = Mock()
+    small_llm.invoke.return_value = AIMessage(content=json.dumps(COACHING))
+    system.model_router = ModelRouter(lambda tier: small_llm, tiers=TIERS, metrics=PerformanceMetrics())
+    system.structured_llm = Mock()
+    agent = MagicMock(role="Coach", goal="Motiver", backstory="Ancien professeur")
+
+    result = system._kickoff("coaching", agent, "Coache-moi", "Un CoachPersonal", CoachPersonal)
+
+    assert result == CoachPersonal(**COACHING)
+    assert small_llm.invoke.called
+    assert not system.structured_llm.invoke.called
+    assert system.model_router.stats()["small"]["model"] == "llama-3.1-8b-instant"
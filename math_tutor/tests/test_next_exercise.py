@@ -0,0 +1,98 @@
+from pathlib import Path
+from unittest.mock import Mock
+import pytest
+from math_tutor.system_GB_Coach import MathTutoringSystem, LearningObjectives, StudentProfile, Exercise
+
+OBJECTIVES_FILE = Path(__file__).resolve().parents[1] / "objectifs.json"
+
+
+def make_exercise(text="Exercice"):
+    return Exercise(
+        exercise=text,
+        solution="Solution",
+        hints=["Indice"],
+        difficulty="Débutant",
+        concept="Domaine de définition"
+    )
+
+
+@pytest.fixture
+def system():
+    system = MathTutoringSystem()
+    system.llm = Mock()
+    system.exercise_pool = Mock()
+    system.exercise_pool.draw.return_value = None
+    system.learning_objectives = LearningObjectives(objectives_file=OBJECTIVES_FILE)
+    system.current_student = StudentProfile(
+        student_id="test123",
+        level=1,
+        current_objective="Domaine de définition"
+    )
+    system._generate_exercise = Mock(return_value=make_exercise("Généré à la demande"))
+    return system
+
+
+def test_pool_hit_skips_generation(system):
+    system.exercise_pool.draw.return_value = make_exercise("Pré-généré")
+
+    exercise = system.next_exercise()
+
+    assert exercise.exercise == "Pré-généré"
+    system.exercise_pool.draw.assert_called_once_with("Domaine de définition", 1)
+    system._generate_exercise.assert_not_called()
+
+
+def test_pool_miss_falls_back_to_generation(system):
+    exercise = system.next_exercise()
+
+    assert exercise.exercise == "Généré à la demande"
+    system._generate_exercise.assert_called_once_with()
+
+
+def test_prefetches_next_level(system):
+    system.current_student.level = 2
+
+    system.next_exercise()
+
+    system.exercise_pool.prefetch.assert_called_once_with("Domaine de définition", 3)
+
+
+def test_last_level_prefetches_next_objective(system):
+    system.current_student.level = 5  # Dernier niveau de "Domaine de définition"
+
+    system.next_exercise()
+
+    system.exercise_pool.prefetch.assert_called_once_with("Calcul des limites", 1)
+
+
+def test_last_objective_last_level_prefetches_nothing(system):
+    system.current_student.current_objective = "Calcul des limites"
+    system.current_student.level = 7
+
+    system.next_exercise()
+
+    system.exercise_pool.prefetch.assert_not_called()
+
+
+def test_without_student_generates_directly(system):
+    system.current_student = None
+
+    system.next_exercise()
+
+    system.exercise_pool.draw.assert_not_called()
+    system.exercise_pool.prefetch.assert_not_called()
+    system._generate_exercise.assert_called_once_with()
+
+
+def test_offline_mode_has_no_pool(system):
+    system.exercise_pool = None
+
+    exercise = system.next_exercise()
+
+    assert exercise.exercise == "Généré à la demande"
+
+
+def test_build_exercise_raises_instead_of_falling_back(system):
+    system.llm = None
+    with pytest.raises(RuntimeError):
+        system._build_exercise("Domaine de définition", 1)
@@ -0,0 +1,68 @@
+from math_tutor.system_GB_Coach import StudentManager
+from math_tutor.utils.metrics import PerformanceMetrics
+from math_tutor.utils.profile_cache import ProfileCache
+from math_tutor.utils.student_store import SqliteStudentStore
+
+
+def manager(tmp_path):
+    manager = StudentManager(data_dir=tmp_path, enable_memory=False)
+    manager.cache = ProfileCache(max_entries=8, metrics=PerformanceMetrics())
+    return manager
+
+
+def test_hit_returns_an_independent_copy(tmp_path, monkeypatch):
+    students = manager(tmp_path)
+    student = students.create_student("Inès")
+    student.learning_history.append({"attempt_id": "a0", "evaluation": True})
+    students.save_student(student)
+
+    loads = []
+    original = students.store.load
+    monkeypatch.setattr(students.store, "load", lambda student_id: loads.append(student_id) or original(student_id))
+    first = students.load_student(student.student_id)
+    first.learning_history[0]["coaching"] = {"motivation": "Bravo"}  # modifié en place par la session
+    second = students.load_student(student.student_id)
+
+    assert loads == []  # profil mis en cache par la sauvegarde
+    assert second == student and "coaching" not in second.learning_history[0]
+    assert students.cache.stats()["hit_ratio"] == 1.0
+
+
+def test_write_from_another_instance_is_noticed(tmp_path):
+    students, other = manager(tmp_path), manager(tmp_path)
+    student = students.create_student("Inès")
+    assert students.load_student(student.student_id).level == 1
+
+    updated = other.load_student(student.student_id)
+    updated.level = 2
+    updated.learning_history.append({"attempt_id": "a0", "evaluation": True})
+    other.save_student(updated)
+
+    assert students.load_student(student.student_id) == updated
+    assert students.cache.stats()["stale"] == 1
+
+
+def test_least_recently_used_profile_is_evicted():
+    cache = ProfileCache(max_entries=2, metrics=PerformanceMetrics())
+    for student_id in ("a", "b"):
+        cache.put(student_id, 1, {"student_id": student_id})
+    assert cache.get("a", 1) is not None
+    cache.put("c", 1, {"student_id": "c"})
+
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == {"student_id": "a"}
+    assert cache.stats()["entries"] == 2
+
+
+def test_sqlite_revision_changes_on_every_write(tmp_path):
+    store = SqliteStudentStore(tmp_path / "students.db", metrics=PerformanceMetrics())
+    students = manager(tmp_path)
+    student = students.create_student("Inès")
+    assert store.version(student.student_id) is None
+
+    store.save(student)
+    before = store.version(student.student_id)
+    student.level = 3
+    store.save(student)
+    assert store.version(student.student_id) != before
+    assert "revision" not in store.load(student.student_id)
@@ -0,0 +1,140 @@
+import json
+import time
+from typing import Any, List
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from math_tutor.utils.metrics import PerformanceMetrics
+from math_tutor.utils.resilience import CircuitBreaker, CircuitOpen, DeadlineExceeded, ResilientCaller
+
+EXERCISE = {"exercise": "Déterminer le domaine de définition de f(x) = 1/(x - 3)", "solution": "R-{3}",
+            "hints": [], "difficulty": "Élémentaire", "concept": "Domaine de définition"}
+
+
+class FakeProvider(BaseChatModel):
+    """Fournisseur local: une latence (ou une exception) injectée par requête, dans l'ordre"""
+    response: str = json.dumps(EXERCISE)
+    latencies: List[Any] = []
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-provider"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        latency = self.latencies.pop(0) if self.latencies else 0.0
+        if isinstance(latency, Exception):
+            raise latency
+        time.sleep(latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.response))])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_caller(**kwargs):
+    metrics = PerformanceMetrics()
+    breaker = kwargs.pop("breaker", None) or CircuitBreaker(failure_threshold=2, reset_timeout=30, metrics=metrics)
+    return ResilientCaller(deadline=kwargs.pop("deadline", 1.0), hedge_after=kwargs.pop("hedge_after", "off"),
+                           breaker=breaker, metrics=metrics, **kwargs)
+
+
+def test_deadline_returns_control_to_the_caller():
+    caller = make_caller(deadline=0.1)
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        caller.call("evaluation", lambda: time.sleep(1))
+    assert time.perf_counter() - start < 0.5
+
+
+def test_hedged_request_wins_over_slow_first_request():
+    provider = FakeProvider(latencies=[1.0, 0.0])
+    caller = make_caller(deadline=2.0, hedge_after="0.05")
+
+    start = time.perf_counter()
+    result = caller.call("evaluation", lambda: provider.invoke("x").content, hedge=True)
+
+    assert json.loads(result) == EXERCISE
+    assert time.perf_counter() - start < 0.5
+    assert caller.metrics.counter("llm_hedge_won") == 1
+
+
+def test_hedge_needs_a_permit():
+    provider = FakeProvider(latencies=[0.3])
+    caller = make_caller(hedge_after="0.01")
+    caller.call("evaluation", lambda: provider.invoke("x"), hedge=True, hedge_permit=lambda: False)
+    assert provider.calls == 1
+    assert caller.metrics.counter("llm_hedge_fired") == 0
+
+
+def test_p95_hedge_waits_for_enough_samples():
+    caller = make_caller(hedge_after="p95")
+    assert caller.hedge_delay("evaluation") is None
+    for value in range(1, 21):
+        caller.metrics.observe("llm_evaluation_seconds", value / 10)
+    assert caller.hedge_delay("evaluation") == pytest.approx(1.9)
+
+
+def test_breaker_opens_then_probes_for_recovery():
+    clock = FakeClock()
+    metrics = PerformanceMetrics()
+    caller = make_caller(breaker=CircuitBreaker(failure_threshold=2, reset_timeout=30, metrics=metrics, clock=clock))
+    provider = FakeProvider(latencies=[ConnectionError("down"), ConnectionError("down")])
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            caller.call("evaluation", lambda: provider.invoke("x"))
+    with pytest.raises(CircuitOpen):
+        caller.call("evaluation", lambda: provider.invoke("x"))
+    assert provider.calls == 2
+
+    clock.now += 30
+    caller.call("evaluation", lambda: provider.invoke("x"))  # sonde réussie
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_invalid_output_does_not_trip_the_breaker():
+    caller = make_caller()
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            caller.call("evaluation", lambda: json.loads("pas du json"))
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+
+class TestSystemFallbacks:
+    @pytest.fixture
+    def system(self):
+        from math_tutor.system_GB_Coach import MathTutoringSystem, StudentProfile
+        from math_tutor.utils.structured_llm import StructuredLLM
+        system = MathTutoringSystem()
+        system.llm = FakeProvider(latencies=[5.0])
+        system.structured_llm = StructuredLLM(system.llm)
+        system.llm_backend = "direct"
+        system.generation_mode = "llm"
+        system.llm_cache.enabled_sites = set()
+        system.single_flight = None
+        system.llm_resilience = make_caller(deadline=0.2)
+        system.current_student = StudentProfile(student_id="s1", current_objective="Domaine de définition", level=1)
+        return system
+
+    def test_slow_provider_falls_back_to_local_evaluation(self, system):
+        from math_tutor.system_GB_Coach import Exercise
+        exercise = Exercise(**EXERCISE)
+        start = time.perf_counter()
+        evaluation = system._evaluate_prompt(exercise, "R-{3}", detailed=True)
+        assert time.perf_counter() - start < 1.0
+        assert evaluation.is_correct is True  # correction symbolique
+
+    def test_open_circuit_serves_local_exercise_without_calling(self, system):
+        system.llm_resilience.breaker.record_failure()
+        system.llm_resilience.breaker.record_failure()
+        exercise = system._generate_exercise()
+        assert exercise.concept == "Domaine de définition"
+        assert system.llm.calls == 0
@@ -0,0 +1,47 @@
+from unittest.mock import Mock
+import pytest
+from math_tutor.system_GB_Coach import MathTutoringSystem, StudentManager, TutorResources
+from math_tutor.utils import exercise_pool
+
+
+@pytest.fixture(scope="module")
+def resources():
+    return TutorResources()
+
+
+def test_sessions_share_heavy_resources(resources):
+    first, second = MathTutoringSystem(resources), MathTutoringSystem(resources)
+
+    for name in ("llm", "model_router", "file_processor", "student_manager", "learning_objectives",
+                 "llm_cache", "evaluator", "exercise_templates"):
+        assert getattr(first, name) is getattr(second, name) is getattr(resources, name)
+    assert first.session_id != second.session_id
+    assert first.attempts is not second.attempts
+
+
+def test_session_state_stays_per_session(resources, tmp_path):
+    first, second = MathTutoringSystem(resources), MathTutoringSystem(resources)
+    manager = StudentManager(data_dir=tmp_path, enable_memory=False)
+    first.current_student = manager.create_student("Amine")
+    first.llm = Mock()  # substitution propre à la session
+
+    assert second.current_student is None
+    assert second.llm is resources.llm
+    assert not hasattr(first, "missing_resource")
+
+
+def test_exercise_pool_generates_outside_any_session(monkeypatch):
+    monkeypatch.setenv("EXERCISE_GENERATION_MODE", "local")
+    monkeypatch.setattr(exercise_pool, "_shared_pool", None)
+    resources = TutorResources()
+    session = MathTutoringSystem(resources)
+    session.generation_mode = "llm"  # substitution propre à la session: ignorée par la réserve
+
+    pool = resources.exercise_pool
+    assert session.exercise_pool is pool and pool.generator.__self__ is resources
+    assert pool.generator("Domaine de définition", 1).concept == "Domaine de définition"
+    pool.shutdown()
+
+
+def test_session_without_resources_builds_its_own():
+    assert MathTutoringSystem().resources is not MathTutoringSystem().resources
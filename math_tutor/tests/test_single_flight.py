@@ -0,0 +1,85 @@
+import threading
+import time
+from unittest.mock import MagicMock
+from math_tutor.utils.metrics import PerformanceMetrics
+from math_tutor.utils.single_flight import SingleFlight
+
+
+def run_concurrently(n, target):
+    results, errors = [None] * n, [None] * n
+    barrier = threading.Barrier(n)
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_identical_concurrent_calls_run_once():
+    flights = SingleFlight(metrics=PerformanceMetrics())
+    calls = []
+
+    def slow_call():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"exercise": "f(x) = 1/x"}
+
+    results, errors = run_concurrently(10, lambda: flights.do("cle", slow_call))
+
+    assert len(calls) == 1
+    assert all(r == {"exercise": "f(x) = 1/x"} for r in results)
+    # Chaque appelant reçoit son propre objet
+    assert len({id(r) for r in results}) == 10
+    assert flights.stats()["coalesced"] == 9
+    assert flights.metrics.counter("single_flight_coalesced") == 9
+    assert flights.in_flight() == 0
+
+
+def test_followers_receive_the_leader_error():
+    flights = SingleFlight(metrics=PerformanceMetrics())
+
+    def failing():
+        time.sleep(0.1)
+        raise RuntimeError("Groq indisponible")
+
+    _, errors = run_concurrently(4, lambda: flights.do("cle", failing))
+
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    # Rien ne reste en vol: l'appel suivant est relancé
+    assert flights.do("cle", lambda: "ok") == "ok"
+
+
+def test_different_keys_are_not_coalesced():
+    flights = SingleFlight(metrics=PerformanceMetrics())
+    results, _ = run_concurrently(2, lambda: flights.do(threading.current_thread().name, lambda: 1))
+    assert flights.stats()["coalesced"] == 0
+
+
+def test_kickoff_coalesces_identical_generation_requests():
+    from math_tutor.system_GB_Coach import MathTutoringSystem, Exercise
+    system = MathTutoringSystem()
+    system.llm_cache.enabled_sites = set()
+    system.single_flight = SingleFlight(metrics=PerformanceMetrics())
+    calls = []
+
+    def slow_llm(*args):
+        calls.append(1)
+        time.sleep(0.2)
+        return Exercise(exercise="f(x) = √x", solution="[0, +∞[", hints=[], difficulty="Débutant",
+                        concept="Domaine de définition")
+    system._call_llm = slow_llm
+    agent = MagicMock(role="Créateur d'exercices")
+
+    results, _ = run_concurrently(
+        5, lambda: system._kickoff("exercise_generation", agent, "même prompt", "Exercise", Exercise))
+
+    assert len(calls) == 1
+    assert all(r.exercise == "f(x) = √x" for r in results)
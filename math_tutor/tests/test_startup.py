@@ -0,0 +1,69 @@
+import threading
+import time
+import pytest
+from math_tutor.utils.metrics import PerformanceMetrics
+from math_tutor.utils.startup import StartupOrchestrator
+
+
+def slow(value, seconds=0.3):
+    def init():
+        time.sleep(seconds)
+        return value
+    return init
+
+
+def test_independent_components_start_together():
+    startup = StartupOrchestrator(parallel=True, metrics=PerformanceMetrics())
+    startup.add("llm", slow("client")).add("mlflow", slow("run")).add("memory", slow("chroma"))
+    startup.run()
+
+    assert startup.results == {"llm": "client", "mlflow": "run", "memory": "chroma"}
+    assert startup.total_seconds < 0.6
+    assert all(seconds >= 0.3 for seconds in startup.durations.values())
+    assert startup.metrics.sample_count("startup_llm_seconds") == 1
+
+
+def test_dependent_component_waits_for_its_dependencies():
+    startup = StartupOrchestrator(parallel=True, metrics=PerformanceMetrics())
+    startup.add("objectives", slow({"Limites": {}}, 0.1))
+    startup.add("templates", lambda: list(startup.result("objectives")), after=["objectives"])
+
+    assert startup.run().result("templates") == ["Limites"]
+
+
+def test_failure_is_kept_without_stopping_the_others():
+    def offline():
+        raise ConnectionError("Groq injoignable")
+
+    startup = StartupOrchestrator(parallel=True, metrics=PerformanceMetrics())
+    startup.add("llm", offline).add("objectives", slow("ok", 0.05))
+    startup.add("agents", lambda: "sans LLM", after=["llm"])
+    startup.run()
+
+    with pytest.raises(ConnectionError):
+        startup.result("llm")
+    assert startup.result("objectives") == "ok"
+    assert startup.result("agents") == "sans LLM"  # `after` ne fixe que l'ordre
+    assert startup.report()[-1].startswith("Total:")
+    assert any(line.startswith("❌ llm") for line in startup.report())
+
+
+def test_in_caller_component_runs_in_the_calling_thread():
+    startup = StartupOrchestrator(parallel=True, metrics=PerformanceMetrics())
+    startup.add("llm", slow("client")).add("memory", threading.current_thread, in_caller=True)
+    startup.run()
+
+    assert startup.result("memory") is threading.current_thread()
+    assert startup.total_seconds < 0.5
+
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError):
+        StartupOrchestrator().add("agents", lambda: None, after=["llm"])
+
+
+def test_sequential_mode_sums_durations():
+    startup = StartupOrchestrator(parallel=False, metrics=PerformanceMetrics())
+    startup.add("a", slow(1, 0.1)).add("b", slow(2, 0.1)).run()
+
+    assert startup.total_seconds >= 0.2
@@ -0,0 +1,122 @@
+import json
+from unittest.mock import MagicMock, Mock
+import pytest
+from langchain_core.messages import AIMessageChunk
+from math_tutor.system_GB_Coach import (
+    MathTutoringSystem,
+    StudentManager,
+    Exercise,
+    EvaluationResult,
+    CoachPersonal,
+)
+from math_tutor.utils.metrics import metrics
+from math_tutor.utils.resilience import CircuitOpen
+from math_tutor.utils.structured_llm import JsonFieldScanner, StructuredStream
+
+COACHING = {"motivation": "Tu y es presque, courage!", "strategy": "Factorise d'abord\nPuis simplifie",
+            "tip": "Cherche la racine commune", "encouragement": ["Bravo pour l'effort"]}
+EVALUATION = {"is_correct": False, "error_type": "Erreur de méthode", "feedback": "La méthode est à revoir",
+              "detailed_explanation": "Il faut factoriser le numérateur", "step_by_step_correction": "...",
+              "recommendations": []}
+
+
+def chunked(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def collect(events):
+    fields = {}
+    for field, fragment in events:
+        fields[field] = fields.get(field, "") + fragment
+    return fields
+
+
+def test_scanner_decodes_nested_fields_across_chunks():
+    payload = json.dumps({"evaluation": {"is_correct": False, "feedback": "Presque \"juste\" é\nfin"},
+                          "coaching": {"motivation": "Allez!", "encouragement": ["a"]}})
+    scanner = JsonFieldScanner(["feedback", "motivation"])
+    events = [event for chunk in chunked(payload, 3) for event in scanner.feed(chunk)]
+
+    assert collect(events) == {"feedback": "Presque \"juste\" é\nfin", "motivation": "Allez!"}
+    assert len(events) > 2  # restitué au fil des morceaux
+
+
+def test_stream_validates_the_complete_response():
+    stored = []
+    stream = StructuredStream(chunked(json.dumps(COACHING)), CoachPersonal, ("motivation", "strategy"),
+                              on_result=stored.append)
+    assert collect(stream) == {"motivation": COACHING["motivation"], "strategy": COACHING["strategy"]}
+    assert stream.result == CoachPersonal(**COACHING)
+    assert stored == [stream.result]
+
+
+def test_invalid_stream_leaves_result_empty():
+    stream = StructuredStream(chunked('{"motivation": "Allez", "tip":'), CoachPersonal, ("motivation",))
+    assert collect(stream) == {"motivation": "Allez"}
+    assert stream.result is None and stream.error is not None
+
+
+@pytest.fixture
+def system(tmp_path):
+    system = MathTutoringSystem()
+    system.llm = Mock()
+    system.structured_llm = Mock()
+    system.llm_backend = "direct"
+    system.streaming = True
+    system.combined_evaluation = False
+    system.model_router.routes["coaching"] = "large"
+    system.evaluator = MagicMock(role="Évaluateur", goal="Évaluer", backstory="Professeur")
+    system.personal_coach = MagicMock(role="Coach", goal="Motiver", backstory="Ancien professeur")
+    system.student_manager = StudentManager(data_dir=tmp_path, enable_memory=False)
+    system.current_student = system.student_manager.create_student("Test")
+    return system
+
+
+@pytest.fixture
+def exercise():
+    return Exercise(exercise="Calculer lim(x→2) (x^2 - 4)/(x - 2)", solution="4", hints=[],
+                    difficulty="Débutant", concept="Calcul des limites")
+
+
+def stream_of(payload):
+    return iter(AIMessageChunk(content=chunk) for chunk in chunked(json.dumps(payload)))
+
+
+def test_coaching_is_streamed_then_stored(system, exercise):
+    attempt_id = system.record_attempt(exercise, "5", EvaluationResult(**EVALUATION))
+    system.llm.stream.return_value = stream_of(COACHING)
+    system._provide_personalized_coaching = Mock()
+    ttft_samples = metrics.sample_count("llm_coaching_ttft_seconds")
+
+    stream = system.stream_attempt_coaching(attempt_id)
+    assert collect(stream)["strategy"] == COACHING["strategy"]
+
+    assert system.attempt_coaching(attempt_id) == CoachPersonal(**COACHING)
+    assert not system._provide_personalized_coaching.called
+    assert system.stream_attempt_coaching(attempt_id) is None
+    assert metrics.sample_count("llm_coaching_ttft_seconds") == ttft_samples + 1
+    system_prompt = system.llm.stream.call_args.args[0][0].content
+    assert "schéma" in system_prompt
+
+
+def test_detailed_evaluation_streams_feedback_and_explanation(system, exercise):
+    system.llm.stream.return_value = stream_of(EVALUATION)
+    stream = system.stream_evaluation(exercise, "5")
+
+    assert list(collect(stream)) == ["feedback", "detailed_explanation"]
+    assert stream.result == EvaluationResult(**EVALUATION)
+
+
+def test_streaming_needs_the_direct_backend(system, exercise):
+    system.llm_backend = "crew"
+    assert system.stream_evaluation(exercise, "5") is None
+
+
+def test_open_circuit_ends_the_stream_quietly(system, exercise):
+    system.llm_resilience = Mock()
+    system.llm_resilience.guard.side_effect = CircuitOpen("ouvert")
+    stream = system.stream_evaluation(exercise, "5")
+
+    assert list(stream) == []
+    assert stream.result is None and isinstance(stream.error, CircuitOpen)
+    assert not system.llm.stream.called
@@ -0,0 +1,93 @@
+import json
+from unittest.mock import Mock, MagicMock, patch
+import pytest
+from langchain_core.messages import AIMessage
+from math_tutor.utils.metrics import PerformanceMetrics
+from math_tutor.utils.structured_llm import StructuredLLM, StructuredOutputError
+from math_tutor.system_GB_Coach import CoachPersonal
+
+COACHING = {
+    "motivation": "Courage",
+    "strategy": "Factoriser d'abord",
+    "tip": "Chercher la racine commune",
+    "encouragement": ["Presque!"]
+}
+
+
+def fake_llm(*replies):
+    llm = Mock()
+    llm.invoke.side_effect = [AIMessage(content=reply) for reply in replies]
+    return llm
+
+
+def test_valid_reply_needs_a_single_request():
+    metrics = PerformanceMetrics()
+    llm = fake_llm("```json\n" + json.dumps(COACHING) + "\n```")
+
+    result = StructuredLLM(llm, metrics=metrics).invoke("coaching", "Tu es coach.", "Coache-moi", CoachPersonal)
+
+    assert result == CoachPersonal(**COACHING)
+    assert llm.invoke.call_count == 1
+    assert metrics.snapshot()["timings"]["llm_coaching_iterations"]["max"] == 1
+
+
+def test_invalid_reply_is_repaired_once():
+    metrics = PerformanceMetrics()
+    llm = fake_llm('{"motivation": "Courage"}', json.dumps(COACHING))
+
+    result = StructuredLLM(llm, metrics=metrics).invoke("coaching", "Tu es coach.", "Coache-moi", CoachPersonal)
+
+    assert result.tip == COACHING["tip"]
+    assert llm.invoke.call_count == 2
+    # La requête de réparation contient la réponse fautive et l'erreur de validation
+    repair_messages = llm.invoke.call_args_list[1].args[0]
+    assert repair_messages[-2].content == '{"motivation": "Courage"}'
+    assert "strategy" in repair_messages[-1].content
+    assert metrics.counter("llm_repair_retry") == 1
+
+
+def test_gives_up_after_the_repair():
+    metrics = PerformanceMetrics()
+    llm = fake_llm("pas de JSON", "toujours pas")
+
+    with pytest.raises(StructuredOutputError):
+        StructuredLLM(llm, metrics=metrics).invoke("coaching", "Tu es coach.", "Coache-moi", CoachPersonal)
+
+    assert llm.invoke.call_count == 2
+    assert metrics.snapshot()["timings"]["llm_coaching_iterations"]["max"] == 2
+
+
+def test_direct_backend_bypasses_crew():
+    from math_tutor.system_GB_Coach import MathTutoringSystem
+    system = MathTutoringSystem()
+    system.llm_backend = "direct"
+    system.llm_cache.enabled_sites = set()
+    system.structured_llm = StructuredLLM(fake_llm(json.dumps(COACHING)))
+    system.model_router.routes["coaching"] = "large"  # client du niveau par défaut
+    agent = MagicMock(role="Coach", goal="Motiver", backstory="Ancien professeur")
+
+    with patch('math_tutor.system_GB_Coach.Task') as mock_task, patch('math_tutor.system_GB_Coach.Crew') as mock_crew:
+        result = system._kickoff("coaching", agent, "Coache-moi", "Un CoachPersonal", CoachPersonal)
+
+    assert result == CoachPersonal(**COACHING)
+    assert not mock_task.called and not mock_crew.called
+    system_message = system.structured_llm.llm.invoke.call_args.args[0][0].content
+    assert system_message.startswith("Tu es Coach. Motiver")
+
+
+def test_token_usage_is_reported():
+    from langchain_core.outputs import LLMResult
+    metrics = PerformanceMetrics()
+    llm = Mock()
+
+    def invoke(messages, config=None):
+        for handler in config["callbacks"]:
+            handler.on_llm_end(LLMResult(generations=[], llm_output={"token_usage": {"total_tokens": 120}}))
+        return AIMessage(content=json.dumps(COACHING))
+    llm.invoke.side_effect = invoke
+
+    usage = {}
+    StructuredLLM(llm, metrics=metrics).invoke("coaching", "Tu es coach.", "Coache-moi", CoachPersonal, usage=usage)
+
+    assert usage == {"iterations": 1, "total_tokens": 120}
+    assert metrics.snapshot()["timings"]["llm_coaching_tokens"]["max"] == 120
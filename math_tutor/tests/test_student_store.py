@@ -0,0 +1,156 @@
+import json
+import pytest
+from math_tutor.migrate_students import migrate
+from math_tutor.system_GB_Coach import StudentManager, StudentProfile
+from math_tutor.utils.metrics import PerformanceMetrics
+from math_tutor.utils.student_store import JsonStudentStore, SqliteStudentStore, StudentStore
+
+
+def attempt(i, **extra):
+    return {"attempt_id": f"a{i}", "exercise": f"Exercice {i}", "answer": "x = 3", "evaluation": i % 2 == 0,
+            "timestamp": "2025-05-29T19:47:08", **extra}
+
+
+def profile(entries=0):
+    return StudentProfile(student_id="2025052919470823", name="Élève", current_objective="Limites",
+                          learning_history=[attempt(i) for i in range(entries)])
+
+
+def test_load_rebuilds_the_same_profile(tmp_path):
+    store = JsonStudentStore(tmp_path, metrics=PerformanceMetrics())
+    student = profile(5)
+    store.save(student)
+
+    assert StudentProfile(**JsonStudentStore(tmp_path).load(student.student_id)) == student
+    header = json.loads((tmp_path / f"{student.student_id}.json").read_text(encoding="utf-8"))
+    assert "learning_history" not in header and header["history_length"] == 5
+
+
+def test_save_writes_only_what_changed(tmp_path):
+    store = JsonStudentStore(tmp_path, metrics=PerformanceMetrics())
+    student = profile(200)
+    first = store.save(student)
+
+    student.learning_history.append(attempt(200))
+    appended = store.save(student)
+    assert appended < first / 50  # une ligne et l'en-tête, pas 200 entrées
+    assert store.save(student) == 0  # rien n'a changé
+
+    # Une tentative complétée après coup (coaching) est réécrite seule
+    student.learning_history[3]["coaching"] = {"motivation": "Bravo"}
+    assert 0 < store.save(student) < first / 50
+    assert StudentProfile(**JsonStudentStore(tmp_path).load(student.student_id)) == student
+
+
+def test_log_is_compacted_when_mostly_superseded(tmp_path):
+    store = JsonStudentStore(tmp_path, compact_min=4, metrics=PerformanceMetrics())
+    student = profile(2)
+    store.save(student)
+    for round in range(6):
+        student.learning_history[0]["feedback"] = f"version {round}"
+        store.save(student)
+
+    assert store.metrics.counter("student_history_compacted") >= 1
+    lines = (tmp_path / f"{student.student_id}.history.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(lines) <= 2 + 4 + 2
+    assert StudentProfile(**JsonStudentStore(tmp_path).load(student.student_id)) == student
+
+
+def test_legacy_profile_is_migrated_on_save(tmp_path):
+    student = profile(3)
+    (tmp_path / f"{student.student_id}.json").write_text(json.dumps(student.model_dump(), indent=4))
+    store = JsonStudentStore(tmp_path, metrics=PerformanceMetrics())
+
+    loaded = StudentProfile(**store.load(student.student_id))
+    assert loaded == student
+    store.save(loaded)
+    assert (tmp_path / f"{student.student_id}.history.jsonl").exists()
+    assert StudentProfile(**JsonStudentStore(tmp_path).load(student.student_id)) == loaded
+
+
+def test_truncated_last_line_is_ignored_then_rewritten(tmp_path):
+    store = JsonStudentStore(tmp_path, metrics=PerformanceMetrics())
+    student = profile(3)
+    store.save(student)
+    log = tmp_path / f"{student.student_id}.history.jsonl"
+    log.write_text(log.read_text(encoding="utf-8") + '{"i": 3, "entry": {"attem', encoding="utf-8")
+
+    store = JsonStudentStore(tmp_path, metrics=PerformanceMetrics())
+    loaded = StudentProfile(**store.load(student.student_id))
+    assert loaded == student
+    loaded.learning_history.append(attempt(3))
+    store.save(loaded)
+    assert StudentProfile(**JsonStudentStore(tmp_path).load(student.student_id)) == loaded
+
+
+def test_sqlite_store_rebuilds_the_same_profile(tmp_path):
+    store = SqliteStudentStore(tmp_path / "students.db", metrics=PerformanceMetrics())
+    student = profile(5)
+    student.objectives_completed = ["Domaine de définition"]
+    store.save(student)
+
+    assert StudentProfile(**SqliteStudentStore(tmp_path / "students.db").load(student.student_id)) == student
+    assert store._connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_sqlite_save_writes_only_changed_attempts(tmp_path):
+    store = SqliteStudentStore(tmp_path / "students.db", metrics=PerformanceMetrics())
+    student = profile(100)
+    assert store.save(student) == 101  # profil + 100 tentatives
+
+    student.learning_history.append(attempt(100))
+    student.learning_history[7]["coaching"] = {"motivation": "Bravo"}
+    assert store.save(student) == 3
+    del student.learning_history[50:]
+    store.save(student)
+    assert StudentProfile(**SqliteStudentStore(tmp_path / "students.db").load(student.student_id)) == student
+
+
+def test_sqlite_find_uses_the_indexes(tmp_path):
+    store = SqliteStudentStore(tmp_path / "students.db", metrics=PerformanceMetrics())
+    files = JsonStudentStore(tmp_path, metrics=PerformanceMetrics())
+    for i, (name, objective) in enumerate([("Élise", "Limites"), ("élise", "Dérivées"), ("Youssef", "Limites")]):
+        student = StudentProfile(student_id=f"s{i}", name=name, current_objective=objective,
+                                 last_session=f"2025-06-0{i + 1}T10:00:00")
+        store.save(student)
+        files.save(student)
+
+    assert [s["student_id"] for s in store.find(name="ÉLISE")] == ["s1", "s0"]
+    assert [s["student_id"] for s in store.find(objective="Limites", since="2025-06-02")] == ["s2"]
+    assert store.find(name="ÉLISE") == files.find(name="ÉLISE")  # mêmes résultats que sans index
+    plan = " ".join(row[-1] for row in store._connection().execute(
+        "EXPLAIN QUERY PLAN SELECT student_id FROM students WHERE name_key = ?", ("x",)))
+    assert "idx_students_name" in plan
+
+
+def test_migration_imports_both_json_formats(tmp_path):
+    legacy, journal = profile(3), profile(4)
+    journal.student_id = "2025060110000000"
+    (tmp_path / f"{legacy.student_id}.json").write_text(json.dumps(legacy.model_dump()), encoding="utf-8")
+    JsonStudentStore(tmp_path, metrics=PerformanceMetrics()).save(journal)
+
+    assert migrate(tmp_path, tmp_path / "students.db") == 2
+    assert migrate(tmp_path, tmp_path / "students.db") == 2  # relançable
+    store = SqliteStudentStore(tmp_path / "students.db")
+    for student in (legacy, journal):
+        imported = StudentProfile(**store.load(student.student_id))
+        assert imported.model_dump(exclude={"version"}) == student.model_dump(exclude={"version"})
+
+
+def test_student_manager_uses_the_configured_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv("STUDENT_STORE", "sqlite")
+    manager = StudentManager(data_dir=tmp_path, enable_memory=False)
+    student = manager.create_student("Amine")
+
+    assert isinstance(manager.store, SqliteStudentStore)
+    assert manager.load_student(student.student_id).name == "Amine"
+    assert manager.find_students(name="amine")[0]["student_id"] == student.student_id
+
+
+def test_incomplete_backend_cannot_be_instantiated():
+    class LoadOnlyStore(StudentStore):
+        def load(self, student_id):
+            return None
+
+    with pytest.raises(TypeError, match="save"):
+        LoadOnlyStore()
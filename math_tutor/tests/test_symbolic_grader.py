@@ -0,0 +1,106 @@
+import pytest
+import sympy as sp
+from math_tutor.utils.symbolic_grader import (
+    SymbolicGrader,
+    parse_domain_answer,
+    parse_limit_answer,
+    extract_function,
+    extract_limit,
+)
+
+grader = SymbolicGrader()
+
+
+@pytest.mark.parametrize("answer, expected", [
+    ("R", sp.S.Reals),
+    ("ℝ", sp.S.Reals),
+    ("R-{6}", sp.S.Reals - sp.FiniteSet(6)),
+    ("R\\{1, 3}", sp.S.Reals - sp.FiniteSet(1, 3)),
+    ("Df = ]-oo, 6[ U ]6, +oo[", sp.S.Reals - sp.FiniteSet(6)),
+    ("[-3/2; +∞[", sp.Interval(sp.Rational(-3, 2), sp.oo)),
+    ("R+*", sp.Interval.open(0, sp.oo)),
+])
+def test_parse_domain_notations(answer, expected):
+    assert parse_domain_answer(answer) == expected
+
+
+@pytest.mark.parametrize("answer, expected", [
+    ("+oo", sp.oo),
+    ("+∞", sp.oo),
+    ("-∞", -sp.oo),
+    ("l = 1/2", sp.Rational(1, 2)),
+    ("4", 4),
+])
+def test_parse_limit_notations(answer, expected):
+    assert parse_limit_answer(answer) == expected
+
+
+def test_extract_function_stops_at_sentence_end():
+    text = "Déterminez le domaine de définition de la fonction f(x) = x^2 - 3x + 1. Expliquez vos étapes."
+    x = sp.Symbol("x", real=True)
+    assert extract_function(text) == x**2 - 3*x + 1
+
+
+def test_extract_limit_point_and_expression():
+    expr, point = extract_limit("Calculer lim(x→∞) x·sin(1/x)")
+    assert point == sp.oo
+    assert expr.has(sp.sin)
+
+
+@pytest.mark.parametrize("exercise, answer, correct", [
+    ("Déterminer le domaine de définition de la fonction f(x) = (7x - 1)/(x - 6)", "R-{6}", True),
+    ("Déterminer le domaine de définition de la fonction f(x) = (7x - 1)/(x - 6)", "R", False),
+    ("Domaine de définition de f(x) = √(2x + 3) - 1", "[-3/2, +oo[", True),
+    ("Domaine de définition de f(x) = √(2x + 3) - 1", "]-3/2, +oo[", False),
+    ("Domaine de définition de f(x) = √((x^2 - 4)/(x - 1))", "[-2, 1[ U [2, +oo[", True),
+    ("Calculer lim(x→2) (x^2 - 4)/(x - 2)", "4", True),
+    ("Calculer lim(x→+∞) (x^2 + 3x + 2)", "+oo", True),
+    ("Calculer lim(x→-∞) (-2x^3 + x - 5)", "-oo", False),
+    ("Calculer lim(x→∞) (√(x^2 + x) - x)", "1/2", True),
+])
+def test_grade(exercise, answer, correct):
+    result = grader.grade(exercise, answer)
+    assert result is not None
+    assert result.is_correct is correct
+
+
+@pytest.mark.parametrize("exercise, answer", [
+    ("Calculer lim(x→1) (x^2 - 1)/(x - 1)", "je pense que c'est 2"),  # réponse rédigée
+    ("Calculer lim(x→0) (1 - cos(x))/x^2", "0.5"),                   # valeur approchée
+    ("Calculer lim(x→0) 1/x", "+oo"),                                # limite bilatérale inexistante
+    ("Résoudre 2x + 3 = 7", "x = 2"),                                # autre type d'exercice
+    ("Domaine de définition de f(x) = 1/x", "__import__('os')"),     # entrée non mathématique
+])
+def test_ambiguous_cases_are_left_to_the_llm(exercise, answer):
+    assert grader.grade(exercise, answer) is None
+
+
+def test_evaluate_prompt_skips_llm_when_graded_symbolically():
+    from unittest.mock import patch
+    from math_tutor.system_GB_Coach import MathTutoringSystem, Exercise
+    system = MathTutoringSystem()
+    exercise = Exercise(
+        exercise="Déterminer le domaine de définition de la fonction f(x) = (7x - 1)/(x - 6)",
+        solution="Df = R-{6}",
+        hints=[],
+        difficulty="Élémentaire",
+        concept="Domaine de définition"
+    )
+
+    with patch('math_tutor.system_GB_Coach.Crew') as mock_crew:
+        evaluation = system._evaluate_prompt(exercise, "R-{6}")
+
+    assert evaluation.is_correct is True
+    assert not mock_crew.called
+
+
+def test_feedback_uses_french_notation():
+    from math_tutor.system_GB_Coach import MathTutoringSystem, Exercise
+    exercise = Exercise(exercise="Déterminer le domaine de définition de f(x) = 1/(x - 6)", solution="Df = R - {6}",
+                        hints=[], difficulty="Débutant", concept="Domaine de définition")
+    feedback = MathTutoringSystem()._create_symbolic_evaluation(exercise, grader.grade(exercise.exercise, "R")).feedback
+
+    assert "]-∞ ; 6[ ∪ ]6 ; +∞[" in feedback and feedback.endswith("correspond à R.")
+    assert "Interval" not in feedback and "oo" not in feedback
+    assert grader.grade("Calculer lim(x→+∞) (2x + 1)/(x - 3)", "+oo").expected == "2"
+    assert grader.grade("Calculer lim(x→3) 1/(x - 3)^2", "2").expected == "+∞"
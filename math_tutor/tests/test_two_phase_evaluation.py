@@ -0,0 +1,136 @@
+from unittest.mock import MagicMock, Mock
+import pytest
+from langchain_core.messages import AIMessageChunk
+from math_tutor.system_GB_Coach import (
+    MathTutoringSystem,
+    StudentManager,
+    Exercise,
+    EvaluationResult,
+    EvaluationVerdict,
+)
+from math_tutor.utils.llm_scheduler import LLMBudgetExceeded
+from math_tutor.utils.structured_llm import StructuredOutputError
+
+DETAILS = """## Explication
+Le numérateur se factorise par (x - 2).
+## Correction étape par étape
+(x^2 - 4)/(x - 2) = x + 2
+lim = 4
+## Recommandations
+- Factoriser avant de passer à la limite
+- Vérifier la forme indéterminée
+"""
+
+
+@pytest.fixture
+def exercise():
+    return Exercise(exercise="Expliquer pourquoi la fonction est continue", solution="Solution de référence",
+                    hints=[], difficulty="Débutant", concept="Calcul des limites")
+
+
+@pytest.fixture
+def system(tmp_path):
+    system = MathTutoringSystem()
+    system.llm = Mock()
+    system.llm.stream.return_value = iter(AIMessageChunk(content=DETAILS[i:i + 20]) for i in range(0, len(DETAILS), 20))
+    system.evaluator = MagicMock(role="Évaluateur", goal="Évaluer", backstory="Professeur")
+    system.student_manager = StudentManager(data_dir=tmp_path, enable_memory=False)
+    system.current_student = system.student_manager.create_student("Test")
+    system.llm_cache.enabled_sites = set()
+    system.single_flight = None
+    system.two_phase_evaluation = True
+    return system
+
+
+def test_first_phase_asks_only_for_the_verdict(system, exercise):
+    system._kickoff = Mock(return_value=EvaluationVerdict(is_correct=False, error_type="Erreur de calcul",
+                                                          feedback="Le calcul final est faux."))
+    evaluation = system._evaluate_prompt(exercise, "5")
+
+    assert system._kickoff.call_args.args[0] == "evaluation_verdict"
+    assert system._kickoff.call_args.args[4] is EvaluationVerdict
+    assert evaluation.is_correct is False and evaluation.error_type == "Erreur de calcul"
+    assert evaluation._details_pending
+    assert not system.llm.stream.called
+
+
+def test_detailed_request_keeps_the_full_evaluation(system, exercise):
+    full = EvaluationResult(is_correct=True, feedback="Bien", detailed_explanation="...",
+                            step_by_step_correction="...", recommendations=[])
+    system._kickoff = Mock(return_value=full)
+    assert system._evaluate_prompt(exercise, "4", detailed=True) is full
+    assert system._kickoff.call_args.args[0] == "evaluation"
+
+
+def test_unparseable_verdict_falls_back_to_the_full_evaluation(system, exercise):
+    full = EvaluationResult(is_correct=False, feedback="Faux", detailed_explanation="...",
+                            step_by_step_correction="...", recommendations=[])
+    system._kickoff = Mock(side_effect=[StructuredOutputError("JSON invalide"), full])
+
+    assert system._evaluate_prompt(exercise, "5") is full
+    assert [call.args[0] for call in system._kickoff.call_args_list] == ["evaluation_verdict", "evaluation"]
+
+
+def test_unparseable_full_evaluation_is_graded_locally(system, exercise):
+    system._kickoff = Mock(side_effect=StructuredOutputError("JSON invalide"))
+    evaluation = system._evaluate_prompt(exercise, "5")
+    assert "indisponible" in evaluation.feedback
+
+
+def test_without_llm_the_evaluation_stays_local(system):
+    system.llm = None
+    system.evaluator = None
+    domain = Exercise(exercise="Déterminer le domaine de définition de la fonction f(x) = 1/(x - 2)",
+                      solution="Df = R-{2}", hints=[], difficulty="Élémentaire", concept="Domaine de définition")
+
+    assert system._evaluate_response(domain, "R").is_correct is False
+    assert "indisponible" in system._evaluate_response(
+        Exercise(exercise="Expliquer la continuité", solution="...", hints=[], difficulty="Débutant",
+                 concept="Calcul des limites"), "parce que").feedback
+
+
+def test_details_are_streamed_once_then_stored(system, exercise):
+    system._kickoff = Mock(return_value=EvaluationVerdict(is_correct=False, error_type="Erreur de calcul",
+                                                          feedback="Faux."))
+    attempt_id = system.record_attempt(exercise, "5", system._evaluate_prompt(exercise, "5"))
+    assert system.details_pending(attempt_id)
+
+    chunks = list(system.stream_evaluation_details(attempt_id))
+
+    assert len(chunks) > 1 and "".join(chunks) == DETAILS
+    assert not system.details_pending(attempt_id)
+    evaluation = system.attempt_evaluation(attempt_id)
+    assert evaluation.detailed_explanation == "Le numérateur se factorise par (x - 2)."
+    assert evaluation.step_by_step_correction.splitlines()[-1] == "lim = 4"
+    assert evaluation.recommendations == ["Factoriser avant de passer à la limite", "Vérifier la forme indéterminée"]
+    assert evaluation.feedback == "Faux."
+
+    assert list(system.stream_evaluation_details(attempt_id)) == []
+    assert system.llm.stream.call_count == 1
+
+
+def test_symbolic_verdict_offers_lazy_details(system):
+    exercise = Exercise(exercise="Déterminer le domaine de définition de la fonction f(x) = 1/(x - 2)",
+                        solution="Df = R-{2}", hints=[], difficulty="Élémentaire", concept="Domaine de définition")
+    evaluation = system._evaluate_prompt(exercise, "R-{2}")
+    assert evaluation.is_correct is True
+    assert evaluation._details_pending
+
+
+def test_unavailable_model_keeps_details_pending(system, exercise):
+    evaluation = EvaluationResult(is_correct=False, feedback="Faux", detailed_explanation="",
+                                  step_by_step_correction="", recommendations=[])
+    evaluation._details_pending = True
+    attempt_id = system.record_attempt(exercise, "5", evaluation)
+    system._stream_text = Mock(side_effect=LLMBudgetExceeded("budget"))
+
+    text = "".join(system.stream_evaluation_details(attempt_id))
+
+    assert "indisponible" in text
+    assert system.details_pending(attempt_id)
+
+
+def test_unstructured_details_are_kept_as_explanation(exercise):
+    details = MathTutoringSystem._parse_details("Texte libre sans titres", exercise)
+    assert details["detailed_explanation"] == "Texte libre sans titres"
+    assert details["step_by_step_correction"] == "Solution de référence"
@@ -0,0 +1,121 @@
+import threading
+import time
+from unittest.mock import patch
+from math_tutor.system_GB_Coach import StudentManager
+from math_tutor.utils.metrics import PerformanceMetrics
+from math_tutor.utils.student_store import ProfileConflict
+from math_tutor.utils.write_behind import WriteBehindQueue
+
+
+def test_saves_within_the_window_are_coalesced():
+    queue = WriteBehindQueue(delay=0.1, metrics=PerformanceMetrics())
+    written = []
+    for level in (2, 3, 4):
+        queue.submit("élève", lambda level=level: written.append(level))
+
+    assert queue.flush("élève", timeout=2)
+    assert written == [4]
+    assert queue.metrics.counter("write_behind_coalesced") == 2
+    queue.close()
+
+
+def test_flush_writes_without_waiting_for_the_window():
+    queue = WriteBehindQueue(delay=30, metrics=PerformanceMetrics())
+    written = []
+    queue.submit("a", lambda: written.append("a"))
+    queue.submit("b", lambda: written.append("b"))
+
+    start = time.monotonic()
+    assert queue.flush("a", timeout=2)
+    assert written == ["a"]
+    assert queue.close(timeout=2)  # l'arrêt écrit ce qui reste
+    assert written == ["a", "b"]
+    assert time.monotonic() - start < 2
+
+
+def test_failed_write_is_retried_then_reported():
+    queue = WriteBehindQueue(delay=0.01, max_attempts=3, metrics=PerformanceMetrics())
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise OSError("disque plein")
+
+    queue.submit("élève", failing)
+    assert not queue.flush("élève", timeout=2)
+    assert len(calls) == 3
+    assert queue.metrics.counter("write_behind_failed") == 3
+
+    queue.submit("élève", lambda: None)
+    assert queue.flush("élève", timeout=2)  # une écriture réussie efface l'échec
+    queue.close()
+
+
+def test_conflict_is_not_retried():
+    queue = WriteBehindQueue(delay=0.01, max_attempts=3, metrics=PerformanceMetrics(),
+                             permanent_errors=(ProfileConflict,))
+    calls = []
+
+    def conflicting():
+        calls.append(1)
+        raise ProfileConflict("élève", 1, 2)
+
+    queue.submit("élève", conflicting)
+    assert not queue.flush("élève", timeout=2)
+    assert len(calls) == 1
+    queue.close()
+
+
+def test_student_manager_defers_and_coalesces_saves(tmp_path, monkeypatch):
+    queue = WriteBehindQueue(delay=5, metrics=PerformanceMetrics())
+    monkeypatch.setattr("math_tutor.utils.write_behind._shared_queue", queue)
+    manager = StudentManager(data_dir=tmp_path, enable_memory=False, write_behind=True)
+    student = manager.create_student("Ali")  # écrit immédiatement (identifiant communiqué)
+    saves = []
+    original = manager.store.save
+    monkeypatch.setattr(manager.store, "save", lambda profile: saves.append(profile.level) or original(profile))
+
+    for level in (2, 3):
+        student.level = level
+        manager.save_student(student)
+    student.name = "Ali B."
+    manager.save_student(student)
+    assert saves == []
+
+    # Une autre instance (autre session) lit la dernière version: l'écriture en attente est faite d'abord
+    reloaded = StudentManager(data_dir=tmp_path, enable_memory=False, write_behind=True).load_student(student.student_id)
+    assert (reloaded.level, reloaded.name) == (3, "Ali B.")
+    assert saves == [3]
+    assert queue.metrics.counter("write_behind_coalesced") == 2
+    queue.close()
+
+
+def test_concurrent_sessions_conflict_is_reported(tmp_path, monkeypatch):
+    queue = WriteBehindQueue(delay=0.05, metrics=PerformanceMetrics(), permanent_errors=(ProfileConflict,))
+    monkeypatch.setattr("math_tutor.utils.write_behind._shared_queue", queue)
+    first, second = (StudentManager(data_dir=tmp_path, enable_memory=False, write_behind=True) for _ in range(2))
+    student_id = first.create_student("Ali").student_id
+    tab_a, tab_b = first.load_student(student_id), second.load_student(student_id)
+    tab_a.level = 2
+    tab_b.current_objective = "Limites"
+
+    threads = [threading.Thread(target=manager.save_student, args=(tab,))
+               for manager, tab in ((first, tab_a), (second, tab_b))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not queue.flush(timeout=2)  # une des deux écritures est refusée, pas retentée
+    assert queue.metrics.counter("write_behind_failed") == 1
+
+    stored = first.store.load(student_id)
+    manager, tab = (second, tab_b) if stored["level"] == 2 else (first, tab_a)
+    with patch("math_tutor.system_GB_Coach.st") as st:
+        assert manager.save_student(tab) is False
+    st.error.assert_called_once()
+    assert "autre session" in st.error.call_args.args[0]
+    # Profil de la session rechargé: la version écrite par l'autre session, à jour pour la suite
+    assert (tab.level, tab.current_objective, tab.version) == (stored["level"], stored["current_objective"], stored["version"])
+    tab.name = "Ali B."
+    assert manager.save_student(tab, durable=True)
+    queue.close()
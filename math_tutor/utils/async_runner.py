@@ -0,0 +1,75 @@
+# utils/async_runner.py
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Dict, Optional, Tuple
+
+from math_tutor.utils.metrics import PerformanceMetrics, metrics as default_metrics
+
+
+class AsyncRunner:
+    """Boucle asyncio du processus (thread démon) où s'exécute l'API asynchrone du tuteur.
+
+    Chaque tâche est rangée sous une clé (session, nature): une nouvelle soumission de même
+    clé annule la précédente (l'élève a renvoyé sa réponse), et `cancel` annule tout ce
+    qu'une session a encore en cours (changement de page). L'annulation interrompt la
+    requête HTTP en cours: ni tokens ni place de l'ordonnanceur ne sont gaspillés."""
+
+    def __init__(self, metrics: Optional[PerformanceMetrics] = None):
+        self.metrics = metrics or default_metrics
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-async", daemon=True)
+        self._thread.start()
+        self._lock = threading.Lock()
+        self._tasks: Dict[Tuple[str, str], Future] = {}
+
+    def submit(self, session_id: str, kind: str, coro: Coroutine) -> Future:
+        """Planifie `coro` sur la boucle et annule la tâche précédente de même (session, nature)"""
+        key = (session_id, kind)
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        with self._lock:
+            previous, self._tasks[key] = self._tasks.get(key), future
+        if previous is not None and previous.cancel():
+            self.metrics.increment("async_task_superseded")
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key: Tuple[str, str], future: Future) -> None:
+        with self._lock:
+            if self._tasks.get(key) is future:
+                del self._tasks[key]
+
+    def cancel(self, session_id: str, kind: Optional[str] = None) -> int:
+        """Annule les tâches en cours de la session (d'une seule nature si `kind`); retourne leur nombre"""
+        with self._lock:
+            futures = [future for (session, task_kind), future in self._tasks.items()
+                       if session == session_id and kind in (None, task_kind)]
+        cancelled = sum(1 for future in futures if future.cancel())
+        if cancelled:
+            self.metrics.increment("async_task_cancelled", cancelled)
+        return cancelled
+
+    def pending(self, session_id: str) -> Dict[str, Future]:
+        with self._lock:
+            return {kind: future for (session, kind), future in self._tasks.items() if session == session_id}
+
+    def run(self, session_id: str, kind: str, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Soumet puis attend le résultat; si l'attente est interrompue, la tâche est annulée"""
+        future = self.submit(session_id, kind, coro)
+        try:
+            return future.result(timeout=timeout)
+        finally:
+            future.cancel()
+
+
+_shared_runner: Optional[AsyncRunner] = None
+_shared_runner_lock = threading.Lock()
+
+
+def get_async_runner() -> AsyncRunner:
+    """Boucle unique du processus, démarrée au premier usage"""
+    global _shared_runner
+    with _shared_runner_lock:
+        if _shared_runner is None:
+            _shared_runner = AsyncRunner()
+        return _shared_runner
@@ -0,0 +1,53 @@
+# utils/attempt_store.py
+import threading
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+
+class AttemptStore:
+    """Index des tentatives (évaluation + coaching) par identifiant.
+
+    Les enregistrements sont les entrées mêmes de `learning_history` du profil: l'index
+    ne fait que les retrouver sans parcourir l'historique et se reconstruit après un
+    rechargement du profil (redémarrage du serveur)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # student_id -> (liste d'historique indexée, sa longueur, {attempt_id: enregistrement})
+        self._index: Dict[str, Tuple[List[Dict], int, Dict[str, Dict]]] = {}
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    def _records(self, student) -> Dict[str, Dict]:
+        history = student.learning_history
+        cached = self._index.get(student.student_id)
+        # Profil rechargé (nouvelle liste) ou historique modifié ailleurs: on réindexe
+        if cached is None or cached[0] is not history or cached[1] != len(history):
+            records = {item["attempt_id"]: item for item in history if "attempt_id" in item}
+            cached = (history, len(history), records)
+            self._index[student.student_id] = cached
+        return cached[2]
+
+    def add(self, student, record: Dict) -> str:
+        """Ajoute l'enregistrement à l'historique de l'étudiant et retourne son identifiant"""
+        with self._lock:
+            record.setdefault("attempt_id", self.new_id())
+            history = student.learning_history
+            records = self._records(student)
+            history.append(record)
+            records[record["attempt_id"]] = record
+            self._index[student.student_id] = (history, len(history), records)
+            return record["attempt_id"]
+
+    def get(self, student, attempt_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._records(student).get(attempt_id)
+
+    def latest(self, student) -> Optional[Dict]:
+        """Dernière tentative enregistrée (entrées d'historique antérieures ignorées)"""
+        for item in reversed(student.learning_history):
+            if "attempt_id" in item:
+                return item
+        return None
@@ -0,0 +1,159 @@
+# utils/exercise_pool.py
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from math_tutor.utils.metrics import PerformanceMetrics, metrics as default_metrics
+
+PoolKey = Tuple[str, int]
+
+logger = logging.getLogger(__name__)
+
+
+class ExercisePool:
+    """Réserve d'exercices pré-générés par (objectif, niveau), rechargée en arrière-plan"""
+
+    def __init__(
+        self,
+        generator: Callable[[str, int], Optional[Any]],
+        depth: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        metrics: Optional[PerformanceMetrics] = None,
+        batch_generator: Optional[Callable[[str, int, int], List[Any]]] = None,
+    ):
+        self.generator = generator
+        # Si fourni, plusieurs exercices manquants sont demandés en un seul appel
+        self.batch_generator = batch_generator
+        self.depth = depth if depth is not None else int(os.getenv("EXERCISE_POOL_DEPTH", "3"))
+        self.max_workers = max_workers if max_workers is not None else int(os.getenv("EXERCISE_POOL_WORKERS", "2"))
+        self.metrics = metrics or default_metrics
+
+        self._lock = threading.Lock()
+        self._pools: Dict[PoolKey, Deque[Any]] = {}
+        self._pending: Dict[PoolKey, int] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, self.max_workers),
+            thread_name_prefix="exercise-pool"
+        )
+        self.hits = 0
+        self.misses = 0
+        self.refill_errors = 0
+
+    def draw(self, objective: str, level: int) -> Optional[Any]:
+        """Retire un exercice prêt (ou None) puis relance le remplissage"""
+        key = (objective, int(level))
+        with self._lock:
+            pool = self._pools.get(key)
+            item = pool.popleft() if pool else None
+            if item is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        self.metrics.increment("exercise_pool_hit" if item is not None else "exercise_pool_miss")
+        self.prefetch(objective, level)
+        return item
+
+    def put(self, objective: str, level: int, item: Any) -> bool:
+        """Ajoute un exercice à la réserve si elle n'est pas pleine"""
+        key = (objective, int(level))
+        with self._lock:
+            pool = self._pools.setdefault(key, deque())
+            if len(pool) >= self.depth:
+                return False
+            pool.append(item)
+            return True
+
+    def prefetch(self, objective: str, level: int) -> int:
+        """Planifie les générations manquantes pour atteindre la profondeur cible"""
+        if self.depth <= 0:
+            return 0
+        key = (objective, int(level))
+        with self._lock:
+            ready = len(self._pools.get(key, ()))
+            pending = self._pending.get(key, 0)
+            missing = self.depth - ready - pending
+            if missing <= 0:
+                return 0
+            self._pending[key] = pending + missing
+
+        if self.batch_generator and missing > 1:
+            self._executor.submit(self._refill_batch, key, missing)
+        else:
+            for _ in range(missing):
+                self._executor.submit(self._refill_one, key)
+        return missing
+
+    def _refill_batch(self, key: PoolKey, count: int) -> None:
+        try:
+            with self.metrics.timer("exercise_pool_refill_seconds"):
+                items = self.batch_generator(key[0], key[1], count)
+            for item in items:
+                self.put(key[0], key[1], item)
+        except Exception as e:
+            with self._lock:
+                self.refill_errors += 1
+            self.metrics.increment("exercise_pool_refill_error")
+            logger.warning("Pré-génération par lot échouée %s: %s", key, e)
+        finally:
+            with self._lock:
+                self._pending[key] = max(0, self._pending.get(key, count) - count)
+
+    def _refill_one(self, key: PoolKey) -> None:
+        try:
+            with self.metrics.timer("exercise_pool_refill_seconds"):
+                item = self.generator(*key)
+            if item is not None:
+                self.put(key[0], key[1], item)
+        except Exception as e:
+            with self._lock:
+                self.refill_errors += 1
+            self.metrics.increment("exercise_pool_refill_error")
+            logger.warning("Pré-génération échouée %s: %s", key, e)
+        finally:
+            with self._lock:
+                self._pending[key] = max(0, self._pending.get(key, 1) - 1)
+
+    def size(self, objective: str, level: int) -> int:
+        with self._lock:
+            return len(self._pools.get((objective, int(level)), ()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs visibles dans l'interface (Paramètres)"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "depth": self.depth,
+                "max_workers": self.max_workers,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "refill_errors": self.refill_errors,
+                "ready": {f"{obj} / niveau {lvl}": len(pool) for (obj, lvl), pool in self._pools.items()},
+                "pending": {f"{obj} / niveau {lvl}": n for (obj, lvl), n in self._pending.items() if n},
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_shared_pool: Optional[ExercisePool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_shared_pool(generator: Callable[[str, int], Optional[Any]],
+                    batch_generator: Optional[Callable[[str, int, int], List[Any]]] = None) -> ExercisePool:
+    """Réserve unique pour tout le processus, partagée entre les sessions Streamlit.
+
+    Seul le générateur de la première session est retenu: il ne doit dépendre que
+    des ressources communes (LLM, agents, objectifs), jamais de l'étudiant courant.
+    Le pool de threads est arrêté à la sortie du processus."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = ExercisePool(generator, batch_generator=batch_generator)
+            atexit.register(_shared_pool.shutdown)
+        return _shared_pool
@@ -0,0 +1,149 @@
+# utils/exercise_templates.py
+import random
+import re
+from typing import Dict, List, Optional, Tuple
+
+import sympy as sp
+
+from math_tutor.utils.symbolic_grader import (
+    X,
+    compute_domain,
+    compute_limit,
+    extract_function,
+    extract_limit,
+    format_expression,
+    format_set,
+    format_value,
+)
+
+# (type, expression, point de la limite ou None)
+Template = Tuple[str, sp.Expr, Optional[sp.Expr]]
+
+
+class ParametricExerciseGenerator:
+    """Génère localement des exercices variés à partir des `example_functions` de objectifs.json.
+
+    Les coefficients entiers des fonctions d'exemple sont tirés au hasard; la solution de
+    référence est calculée avec sympy. Un tirage n'est gardé que s'il conserve la nature de
+    l'exemple (même nombre de valeurs interdites, limite finie ou infinie)."""
+
+    MAX_TRIES = 20
+
+    def __init__(self, objectives: Dict, seed: Optional[int] = None):
+        self.objectives = objectives
+        self.rng = random.Random(seed)
+        self._templates: Dict[Tuple[str, int], List[Template]] = {}
+
+    def seed(self, seed: Optional[int]) -> None:
+        self.rng.seed(seed)
+
+    def templates(self, objective_name: str, level: int) -> List[Template]:
+        """Fonctions d'exemple analysées une fois pour toutes par (objectif, niveau)"""
+        key = (objective_name, int(level))
+        if key not in self._templates:
+            level_info = self.objectives.get(objective_name, {}).get("niveaux", {}).get(str(level), {})
+            templates = []
+            for example in level_info.get("example_functions", []):
+                limit = extract_limit(example)
+                if limit is not None:
+                    templates.append(("limit", limit[0], limit[1]))
+                    continue
+                expr = extract_function(example)
+                if expr is not None:
+                    templates.append(("domain", expr, None))
+            self._templates[key] = templates
+        return self._templates[key]
+
+    def generate(self, objective_name: str, level: int) -> Optional[Dict]:
+        """Retourne les champs d'un `Exercise` (dict) ou None si le niveau n'a aucun modèle exploitable"""
+        level_info = self.objectives.get(objective_name, {}).get("niveaux", {}).get(str(level))
+        templates = self.templates(objective_name, level)
+        if not level_info or not templates:
+            return None
+
+        kind, expr, point = self.rng.choice(templates)
+        if kind == "domain":
+            return self._domain_exercise(expr, level_info, objective_name)
+        return self._limit_exercise(expr, point, level_info, objective_name)
+
+    def find_level(self, objective_name: str, level_name: str) -> Optional[int]:
+        """Niveau correspondant à un nom de difficulté ("Élémentaire" -> 2)"""
+        for number, info in self.objectives.get(objective_name, {}).get("niveaux", {}).items():
+            if info.get("name") == level_name:
+                return int(number)
+        return None
+
+    def _randomize(self, expr: sp.Expr) -> sp.Expr:
+        """Remplace chaque coefficient entier (hors exposants) par un entier non nul aléatoire"""
+        if expr.is_Integer:
+            value = self.rng.randint(1, 9)
+            return sp.Integer(value if expr > 0 else -value)
+        if not expr.args or expr.is_Atom:
+            return expr
+        if expr.is_Pow:
+            return sp.Pow(self._randomize(expr.base), expr.exp)
+        return expr.func(*(self._randomize(arg) for arg in expr.args))
+
+    def _domain_exercise(self, expr: sp.Expr, level_info: Dict, objective_name: str) -> Optional[Dict]:
+        reference = compute_domain(expr)
+        if reference is None:
+            return None
+        candidate, domain = expr, reference
+        for _ in range(self.MAX_TRIES):
+            trial = self._randomize(expr)
+            trial_domain = compute_domain(trial)
+            if trial_domain is not None and \
+                    len(trial_domain.boundary) == len(reference.boundary) and \
+                    all(b.is_real for b in trial_domain.boundary):
+                candidate, domain = trial, trial_domain
+                break
+
+        function = format_expression(candidate)
+        return {
+            "exercise": f"Déterminer le domaine de définition de la fonction f(x) = {function}.",
+            "solution": (
+                f"f(x) = {function}\n"
+                "On exclut les valeurs qui annulent un dénominateur et celles qui rendent "
+                "une expression sous une racine négative.\n"
+                f"Df = {format_set(domain)}"
+            ),
+            "hints": list(level_info.get("objectives", []))[:3],
+            "difficulty": level_info["name"],
+            "concept": objective_name,
+        }
+
+    def _limit_exercise(self, expr: sp.Expr, point: sp.Expr, level_info: Dict, objective_name: str) -> Optional[Dict]:
+        reference = compute_limit(expr, point)
+        if reference is None:
+            return None
+        candidate, candidate_point, value = expr, point, reference
+        for _ in range(self.MAX_TRIES):
+            if point.is_finite:
+                # Translation + facteur: conserve la forme (0/0, etc.) au nouveau point
+                new_point = sp.Integer(self.rng.randint(-5, 5))
+                factor = self.rng.choice([1, 2, 3, -1, -2])
+                numerator, denominator = sp.fraction(sp.together(expr.subs(X, X - new_point + point)))
+                # Numérateur et dénominateur développés séparément: sympy ne simplifie pas la fraction
+                trial = factor * sp.expand(numerator) / sp.expand(denominator)
+            else:
+                new_point = point
+                trial = self._randomize(expr)
+            trial_value = compute_limit(trial, new_point)
+            if trial_value is not None and \
+                    bool(trial_value.is_finite) == bool(reference.is_finite):
+                candidate, candidate_point, value = trial, new_point, trial_value
+                break
+
+        function = format_expression(candidate)
+        if candidate.is_Add:
+            function = f"({function})"
+        return {
+            "exercise": f"Calculer lim(x→{format_value(candidate_point)}) {function}",
+            "solution": (
+                f"On étudie {function} quand x tend vers {format_value(candidate_point)}.\n"
+                f"La limite vaut {format_value(value)}."
+            ),
+            "hints": list(level_info.get("objectives", []))[:3],
+            "difficulty": level_info["name"],
+            "concept": objective_name,
+        }
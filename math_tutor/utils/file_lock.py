@@ -0,0 +1,47 @@
+# utils/file_lock.py
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from math_tutor.utils.metrics import PerformanceMetrics, metrics as default_metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: verrou entre threads du processus seulement
+    fcntl = None
+
+
+class KeyedFileLock:
+    """Verrous consultatifs par clé (un élève): un verrou de thread et un `flock` sur
+    `<dossier>/<clé>.lock`, partagé pour les lectures, exclusif pour les écritures.
+
+    Deux processus (workers, onglets servis par des serveurs différents) qui écrivent le
+    même élève s'attendent; les écritures d'élèves différents ne se bloquent jamais."""
+
+    def __init__(self, lock_dir: Path, metrics: Optional[PerformanceMetrics] = None):
+        self.lock_dir = Path(lock_dir)
+        self.metrics = metrics or default_metrics
+        self._guard = threading.Lock()
+        self._thread_locks: Dict[str, threading.Lock] = {}
+
+    def _thread_lock(self, key: str) -> threading.Lock:
+        with self._guard:
+            return self._thread_locks.setdefault(key, threading.Lock())
+
+    @contextmanager
+    def __call__(self, key: str, shared: bool = False) -> Iterator[None]:
+        start = time.perf_counter()
+        # Verrou de thread d'abord: flock ne distingue pas les threads d'un même descripteur
+        with self._thread_lock(key):
+            self.lock_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_dir / f"{key}.lock", "a+b") as f:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+                self.metrics.observe("student_lock_wait_seconds", time.perf_counter() - start)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,166 @@
+# utils/job_executor.py
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Dict, Optional, Tuple, Union
+
+from math_tutor.utils.async_runner import AsyncRunner, get_async_runner
+from math_tutor.utils.metrics import PerformanceMetrics, metrics as default_metrics
+
+JobKey = Tuple[str, str, str]  # (session, tentative, nature)
+
+
+class Job:
+    """Travail soumis par une page: son état se consulte à chaque réexécution sans bloquer le script"""
+
+    PENDING, RUNNING, DONE, FAILED, CANCELLED = "pending", "running", "done", "failed", "cancelled"
+
+    def __init__(self, key: JobKey):
+        self.key = key
+        self.kind = key[2]
+        self.future: Optional[Future] = None
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def status(self) -> str:
+        if self.future is None:
+            return self.PENDING
+        if self.future.cancelled():
+            return self.CANCELLED
+        if self.future.done():
+            return self.FAILED if self.future.exception() is not None else self.DONE
+        return self.RUNNING if self.started_at is not None else self.PENDING
+
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.submitted_at
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        if self.status != self.FAILED:
+            return None
+        return self.future.exception()
+
+    def result(self) -> Any:
+        """Résultat d'un travail terminé (relève son exception s'il a échoué)"""
+        return self.future.result(timeout=0)
+
+
+class JobExecutor:
+    """Travaux des pages (génération, évaluation, extraction de fichier) hors du script Streamlit.
+
+    Un travail est identifié par (session, tentative, nature): une soumission dont la clé a déjà
+    un travail en cours ou terminé est ignorée et retourne ce travail (double clic, réexécution
+    de la page). Une fonction s'exécute dans le pool de threads du processus; une coroutine
+    s'exécute sur la boucle asynchrone, où une nouvelle tentative de même nature annule la
+    précédente. Les travaux terminés sont oubliés après `ttl` secondes ou à leur collecte."""
+
+    def __init__(self, max_workers: Optional[int] = None, ttl: float = 600.0,
+                 runner: Optional[AsyncRunner] = None, metrics: Optional[PerformanceMetrics] = None):
+        self.max_workers = max_workers or int(os.getenv("JOB_WORKERS", "4"))
+        self.ttl = ttl
+        self.metrics = metrics or default_metrics
+        self._runner = runner
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[JobKey, Job] = {}
+
+    def submit(self, session_id: str, attempt: Union[str, int], kind: str,
+               work: Union[Callable[..., Any], Coroutine], *args, **kwargs) -> Job:
+        """Soumet `work` (fonction appelée avec `args`, ou coroutine) sauf si la clé est déjà occupée"""
+        key = (session_id, str(attempt), kind)
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(key)
+            if job is not None and job.status not in (Job.FAILED, Job.CANCELLED):
+                self.metrics.increment("job_duplicate_ignored")
+                if asyncio.iscoroutine(work):
+                    work.close()
+                return job
+            job = Job(key)
+            self._jobs[key] = job
+            if asyncio.iscoroutine(work):
+                runner = self._runner or get_async_runner()
+                job.future = runner.submit(session_id, kind, self._run_coroutine(job, work))
+            else:
+                job.future = self._pool.submit(self._run, job, work, args, kwargs)
+        self.metrics.increment("job_submitted")
+        job.future.add_done_callback(lambda done: self._finished(job))
+        return job
+
+    def _run(self, job: Job, work: Callable[..., Any], args, kwargs) -> Any:
+        self._started(job)
+        return work(*args, **kwargs)
+
+    async def _run_coroutine(self, job: Job, work: Coroutine) -> Any:
+        self._started(job)
+        return await work
+
+    def _started(self, job: Job) -> None:
+        job.started_at = time.monotonic()
+        self.metrics.observe(f"job_{job.kind}_queue_seconds", job.started_at - job.submitted_at)
+
+    def _finished(self, job: Job) -> None:
+        job.finished_at = time.monotonic()
+        status = job.status
+        if status == Job.DONE:
+            self.metrics.observe(f"job_{job.kind}_seconds", job.finished_at - job.submitted_at)
+        else:
+            self.metrics.increment(f"job_{status}")
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, job in self._jobs.items()
+                    if job.finished_at is not None and now - job.finished_at > self.ttl]:
+            del self._jobs[key]
+
+    def get(self, session_id: str, attempt: Union[str, int], kind: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get((session_id, str(attempt), kind))
+
+    def collect(self, job: Job) -> Any:
+        """Résultat d'un travail terminé, retiré du registre (la tentative peut être resoumise)"""
+        with self._lock:
+            if self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
+        return job.result()
+
+    def cancel(self, session_id: str) -> int:
+        """Annule les travaux de la session: une coroutine est interrompue, une fonction seulement
+        si elle n'a pas encore démarré"""
+        with self._lock:
+            jobs = [job for key, job in self._jobs.items() if key[0] == session_id]
+        return sum(1 for job in jobs if job.future is not None and job.future.cancel())
+
+    def expected_seconds(self, kind: str) -> Optional[float]:
+        """Durée médiane des derniers travaux de cette nature (pour l'indicateur de progression)"""
+        name = f"job_{kind}_seconds"
+        if self.metrics.sample_count(name) < 3:
+            return None
+        return self.metrics.percentile(name, 50)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status)
+                for status in (Job.PENDING, Job.RUNNING, Job.DONE, Job.FAILED, Job.CANCELLED)}
+
+
+_shared_executor: Optional[JobExecutor] = None
+_shared_executor_lock = threading.Lock()
+
+
+def get_job_executor() -> JobExecutor:
+    """Pool unique du processus: JOB_WORKERS travaux simultanés, toutes sessions confondues"""
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = JobExecutor()
+        return _shared_executor
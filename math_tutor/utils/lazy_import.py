@@ -0,0 +1,50 @@
+# utils/lazy_import.py
+import importlib
+import time
+from typing import Any, Optional
+
+from math_tutor.utils.metrics import metrics
+
+
+class LazyImport:
+    """Module (ou attribut de module) importé au premier usage.
+
+    `LazyImport("mlflow")` remplace `import mlflow` et `LazyImport("crewai", "Agent")` remplace
+    `from crewai import Agent`: l'import n'a lieu qu'au premier appel ou accès à un attribut.
+    Le nom reste un attribut ordinaire du module importateur (donc remplaçable par `patch`)."""
+
+    def __init__(self, module: str, attribute: Optional[str] = None):
+        object.__setattr__(self, "_module", module)
+        object.__setattr__(self, "_attribute", attribute)
+        object.__setattr__(self, "_target", None)
+
+    def _load(self) -> Any:
+        target = self._target
+        if target is None:
+            start = time.perf_counter()
+            target = importlib.import_module(self._module)
+            if self._attribute:
+                target = getattr(target, self._attribute)
+            metrics.observe("lazy_import_seconds", time.perf_counter() - start)
+            object.__setattr__(self, "_target", target)
+        return target
+
+    @property
+    def loaded(self) -> bool:
+        return self._target is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._load(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        name = f"{self._module}.{self._attribute}" if self._attribute else self._module
+        return f"<LazyImport {name}{'' if self.loaded else ' (non chargé)'}>"
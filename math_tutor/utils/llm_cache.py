@@ -0,0 +1,177 @@
+# utils/llm_cache.py
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from math_tutor.utils.metrics import PerformanceMetrics, metrics as default_metrics
+
+CALL_SITES = ("exercise_generation", "exercise_batch", "similar_exercise", "evaluation", "evaluation_verdict",
+              "coaching", "evaluation_coaching")
+
+
+class LLMCache:
+    """Cache des réponses LLM adressé par contenu: LRU en mémoire + fichiers JSON sur disque"""
+
+    def __init__(
+        self,
+        cache_dir: Path = Path("students_data") / "llm_cache",
+        max_memory_entries: Optional[int] = None,
+        max_disk_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        enabled_sites: Optional[Iterable[str]] = None,
+        metrics: Optional[PerformanceMetrics] = None,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_memory_entries = max_memory_entries if max_memory_entries is not None else int(os.getenv("LLM_CACHE_MEMORY_SIZE", "256"))
+        self.max_disk_entries = max_disk_entries if max_disk_entries is not None else int(os.getenv("LLM_CACHE_DISK_SIZE", "5000"))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+        if enabled_sites is None:
+            # La génération est exclue par défaut: deux demandes identiques doivent donner deux exercices
+            enabled_sites = os.getenv("LLM_CACHE_SITES", "evaluation,evaluation_verdict,coaching,evaluation_coaching").split(",")
+        self.enabled_sites = {site.strip() for site in enabled_sites if site.strip()}
+        self.metrics = metrics or default_metrics
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._disk_count: Optional[int] = None
+
+    @staticmethod
+    def make_key(prompt: str, role: str, model: str, temperature: float) -> str:
+        """Empreinte SHA-256 du prompt, du rôle de l'agent, du modèle et de la température"""
+        material = json.dumps([prompt, role, model, temperature], ensure_ascii=False)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def enabled(self, call_site: str) -> bool:
+        return call_site in self.enabled_sites
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retourne la charge utile en cache (mémoire puis disque) ou None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.metrics.increment("llm_cache_memory_hit")
+                    return entry[1]
+                del self._memory[key]
+
+        entry = self._read_disk(key, now)
+        if entry is None:
+            self.metrics.increment("llm_cache_miss")
+            return None
+
+        self.metrics.increment("llm_cache_disk_hit")
+        self._remember(key, entry[0], entry[1])
+        return entry[1]
+
+    def set(self, key: str, payload: Dict[str, Any]) -> None:
+        created_at = time.time()
+        self._remember(key, created_at, payload)
+        self._write_disk(key, created_at, payload)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._disk_count = 0
+        for path in self.cache_dir.glob("*/*.json"):
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_count,
+                "enabled_sites": sorted(self.enabled_sites),
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    def _remember(self, key: str, created_at: float, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = (created_at, payload)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[float, Dict[str, Any]]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Entrée de cache illisible {path.name}: {str(e)}")
+            path.unlink(missing_ok=True)
+            return None
+
+        if now - data.get("created_at", 0) > self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            return None
+        # La date d'accès sert à l'éviction LRU sur disque
+        os.utime(path, None)
+        return data["created_at"], data["payload"]
+
+    def _write_disk(self, key: str, created_at: float, payload: Dict[str, Any]) -> None:
+        path = self._path(key)
+        tmp_name = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            is_new = not path.exists()
+            # Fichier temporaire propre à chaque écrivain, puis remplacement atomique
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent,
+                                             suffix=".tmp", delete=False) as f:
+                tmp_name = f.name
+                json.dump({"created_at": created_at, "payload": payload}, f, ensure_ascii=False)
+            os.replace(tmp_name, path)
+        except Exception as e:
+            print(f"⚠️ Écriture cache échouée: {str(e)}")
+            if tmp_name:
+                Path(tmp_name).unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            disk_count = self._disk_count
+        if disk_count is None:
+            # Premier comptage fait hors verrou: il parcourt tout le répertoire
+            disk_count = self._count_disk_entries()
+            with self._lock:
+                if self._disk_count is None:
+                    self._disk_count = disk_count
+                disk_count = self._disk_count
+        elif is_new:
+            with self._lock:
+                self._disk_count += 1
+                disk_count = self._disk_count
+        if disk_count > self.max_disk_entries:
+            self._evict_disk()
+
+    def _count_disk_entries(self) -> int:
+        return sum(1 for _ in self.cache_dir.glob("*/*.json"))
+
+    def _evict_disk(self) -> None:
+        """Supprime les entrées les moins récemment utilisées au-delà de la capacité"""
+        files = sorted(self.cache_dir.glob("*/*.json"), key=lambda p: p.stat().st_mtime)
+        excess = len(files) - self.max_disk_entries
+        for path in files[:max(0, excess)]:
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._disk_count = min(len(files), self.max_disk_entries)
+        self.metrics.increment("llm_cache_disk_evictions", max(0, excess))
@@ -0,0 +1,189 @@
+# utils/llm_cassette.py
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from math_tutor.utils.metrics import PerformanceMetrics, metrics as default_metrics
+
+MODES = ("replay", "record", "auto")
+
+
+class CassetteMiss(RuntimeError):
+    """Aucune réponse enregistrée pour ces messages (mode replay)"""
+
+
+class Cassette:
+    """Fichier JSON: empreinte des messages -> réponses successives (texte, tokens, latence).
+
+    Une même requête peut avoir plusieurs réponses enregistrées (génération répétée): le
+    rejeu les rend dans l'ordre d'enregistrement, puis recommence au début."""
+
+    def __init__(self, path: Path, truncate: bool = False):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._replayed: Dict[str, int] = {}
+        if self.path.exists() and not truncate:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def make_key(model_name: str, temperature: float, messages: List[BaseMessage],
+                 stop: Optional[List[str]] = None) -> str:
+        material = json.dumps(
+            [model_name, temperature, [[m.type, str(m.content)] for m in messages], stop or []],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def next(self, key: str) -> Optional[Dict[str, Any]]:
+        """Réponse suivante enregistrée pour cette requête, ou None"""
+        with self._lock:
+            responses = self.entries.get(key)
+            if not responses:
+                return None
+            position = self._replayed.get(key, 0)
+            self._replayed[key] = position + 1
+            return responses[position % len(responses)]
+
+    def add(self, key: str, entry: Dict[str, Any]) -> None:
+        """Enregistre la réponse et réécrit le fichier (écriture atomique)"""
+        with self._lock:
+            self.entries.setdefault(key, []).append(entry)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(self.entries, f, ensure_ascii=False, indent=1)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    def __len__(self) -> int:
+        return sum(len(responses) for responses in self.entries.values())
+
+    @classmethod
+    def open(cls, path: Path, truncate: bool = False) -> "Cassette":
+        """Cassette partagée par chemin: les clients de plusieurs modèles écrivent dans le même fichier"""
+        key = Path(path).resolve()
+        with _open_cassettes_lock:
+            if key not in _open_cassettes:
+                _open_cassettes[key] = cls(path, truncate=truncate)
+            return _open_cassettes[key]
+
+
+_open_cassettes: Dict[Path, Cassette] = {}
+_open_cassettes_lock = threading.Lock()
+
+
+class CassetteLLM(BaseChatModel):
+    """Client de chat qui enregistre les réponses du vrai modèle puis les rejoue hors ligne.
+
+    - `record`: appelle le modèle réel et enregistre chaque réponse (cassette repartie de zéro);
+    - `replay`: ne rejoue que la cassette (`CassetteMiss` si la requête est inconnue);
+    - `auto`: rejoue si possible, enregistre sinon.
+    En rejeu, la latence d'origine est reproduite, multipliée par `latency_scale` (0 = aucune)."""
+
+    inner: Optional[Any] = None
+    cassette: Any
+    mode: str = "replay"
+    latency_scale: float = 1.0
+    model_name: str
+    temperature: float = 0.7
+    metrics: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "temperature": self.temperature, "mode": self.mode}
+
+    def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Réponse rejouée (compteur de succès), None s'il faut enregistrer; CassetteMiss sinon"""
+        metrics = self.metrics or default_metrics
+        entry = self.cassette.next(key) if self.mode != "record" else None
+        if entry is not None:
+            metrics.increment("llm_cassette_hit")
+        elif self.mode == "replay" or self.inner is None:
+            metrics.increment("llm_cassette_miss")
+            raise CassetteMiss(f"Requête absente de la cassette {self.cassette.path} ({key[:12]})")
+        return entry
+
+    def _result(self, entry: Dict[str, Any]) -> ChatResult:
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=entry["response"]))],
+            llm_output={"token_usage": entry.get("token_usage") or {}, "model_name": self.model_name},
+        )
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        key = Cassette.make_key(self.model_name, self.temperature, messages, stop)
+        entry = self._lookup(key)
+        if entry is None:
+            start = time.perf_counter()
+            result = self.inner.generate([messages], stop=stop)
+            entry = self._record(key, result, time.perf_counter() - start)
+        elif self.latency_scale > 0:
+            time.sleep(entry.get("latency", 0.0) * self.latency_scale)
+        return self._result(entry)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs: Any) -> ChatResult:
+        # Latence rejouée par asyncio.sleep: une annulation l'interrompt comme une vraie requête
+        key = Cassette.make_key(self.model_name, self.temperature, messages, stop)
+        entry = self._lookup(key)
+        if entry is None:
+            start = time.perf_counter()
+            result = await self.inner.agenerate([messages], stop=stop)
+            entry = self._record(key, result, time.perf_counter() - start)
+        elif self.latency_scale > 0:
+            await asyncio.sleep(entry.get("latency", 0.0) * self.latency_scale)
+        return self._result(entry)
+
+    def _record(self, key: str, result, latency: float) -> Dict[str, Any]:
+        entry = {
+            "response": str(result.generations[0][0].message.content),
+            "latency": round(latency, 3),
+            "token_usage": (result.llm_output or {}).get("token_usage") or {},
+        }
+        self.cassette.add(key, entry)
+        (self.metrics or default_metrics).increment("llm_cassette_recorded")
+        return entry
+
+
+def cassette_from_env(model_name: str, temperature: float, live_factory: Callable[[], Any],
+                      metrics: Optional[PerformanceMetrics] = None):
+    """Client de chat selon LLM_CASSETTE: le client réel si la variable est absente, sinon
+    une cassette. En mode replay le client réel n'est pas construit (pas de clé ni de réseau)."""
+    path = os.getenv("LLM_CASSETTE")
+    if not path:
+        return live_factory()
+    mode = os.getenv("LLM_CASSETTE_MODE", "replay")
+    if mode not in MODES:
+        raise ValueError(f"LLM_CASSETTE_MODE doit valoir {', '.join(MODES)} (reçu: {mode})")
+    latency = os.getenv("LLM_CASSETTE_LATENCY", "original")
+    latency_scale = {"original": 1.0, "none": 0.0}.get(latency)
+    if latency_scale is None:
+        latency_scale = float(latency)
+    return CassetteLLM(
+        inner=None if mode == "replay" else live_factory(),
+        cassette=Cassette.open(Path(path), truncate=mode == "record"),
+        mode=mode,
+        latency_scale=latency_scale,
+        model_name=model_name,
+        temperature=temperature,
+        metrics=metrics,
+    )
@@ -0,0 +1,268 @@
+# utils/llm_scheduler.py
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Callable, Dict, Optional
+
+from math_tutor.utils.metrics import PerformanceMetrics, metrics as default_metrics
+from math_tutor.utils.resilience import LLMUnavailable
+
+# Taille de sortie supposée pour réserver des tokens avant l'appel (corrigée après coup)
+OUTPUT_TOKENS_ESTIMATE = 1000
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0   # l'élève attend le résultat (évaluation)
+    GENERATION = 1    # exercice demandé par l'élève
+    BACKGROUND = 2    # pré-génération, coaching
+
+
+CALL_SITE_PRIORITIES = {
+    "evaluation": Priority.INTERACTIVE,
+    "evaluation_coaching": Priority.INTERACTIVE,
+    "evaluation_verdict": Priority.INTERACTIVE,
+    "evaluation_details": Priority.GENERATION,
+    "exercise_generation": Priority.GENERATION,
+    "exercise_batch": Priority.GENERATION,
+    "similar_exercise": Priority.GENERATION,
+    "coaching": Priority.BACKGROUND,
+}
+
+_background: ContextVar[bool] = ContextVar("llm_background", default=False)
+
+
+class LLMBudgetExceeded(LLMUnavailable):
+    """Budget de requêtes ou de tokens épuisé: l'appelant doit basculer sur un fallback local"""
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Estimation grossière (4 caractères par token) du prompt, plus la sortie attendue"""
+    return sum(len(text) for text in texts) // 4 + OUTPUT_TOKENS_ESTIMATE
+
+
+class TokenBucket:
+    """Seau à jetons rechargé en continu; `per_minute <= 0` = illimité"""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self.rate = self.capacity / 60.0
+        self.clock = clock
+        self.updated = clock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def refill(self) -> None:
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def can_take(self, amount: float, reserve: float) -> bool:
+        """Vrai si `amount` peut être pris en laissant `reserve` (fraction de la capacité) aux priorités supérieures"""
+        return self.unlimited or self.level - min(amount, self.capacity) >= reserve * self.capacity
+
+    def seconds_until(self, amount: float, reserve: float) -> float:
+        if self.unlimited or self.rate <= 0:
+            return 0.0
+        missing = min(amount, self.capacity) + reserve * self.capacity - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        if not self.unlimited:
+            self.level -= amount
+
+    def drain(self) -> None:
+        if not self.unlimited:
+            self.level = min(self.level, 0.0)
+
+
+class LLMScheduler:
+    """Point de passage de tous les appels LLM: budgets requêtes/min et tokens/min partagés
+    par le processus, avec classes de priorité.
+
+    Une priorité inférieure laisse une réserve du budget aux priorités supérieures et cède
+    la place dès qu'une requête plus prioritaire attend. Passé son délai d'attente maximal,
+    l'appel lève `LLMBudgetExceeded` (pas d'attente du tout en arrière-plan)."""
+
+    MAX_WAIT = {Priority.INTERACTIVE: 15.0, Priority.GENERATION: 5.0, Priority.BACKGROUND: 0.0}
+    RESERVE = {Priority.INTERACTIVE: 0.0, Priority.GENERATION: 0.2, Priority.BACKGROUND: 0.5}
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_wait: Optional[Dict[Priority, float]] = None,
+        metrics: Optional[PerformanceMetrics] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if requests_per_minute is None:
+            requests_per_minute = float(os.getenv("LLM_REQUESTS_PER_MIN", "0"))
+        if tokens_per_minute is None:
+            tokens_per_minute = float(os.getenv("LLM_TOKENS_PER_MIN", "0"))
+        self.requests = TokenBucket(requests_per_minute, clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock)
+        self.max_wait = {**self.MAX_WAIT, **(max_wait or {})}
+        self.metrics = metrics or default_metrics
+        self.clock = clock
+        self._condition = threading.Condition()
+        self._waiting = {priority: 0 for priority in Priority}
+
+    @staticmethod
+    @contextmanager
+    def background():
+        """Les appels faits dans ce bloc (pré-génération) passent en priorité BACKGROUND"""
+        token = _background.set(True)
+        try:
+            yield
+        finally:
+            _background.reset(token)
+
+    @staticmethod
+    def priority_for(call_site: str) -> Priority:
+        if _background.get():
+            return Priority.BACKGROUND
+        return CALL_SITE_PRIORITIES.get(call_site, Priority.GENERATION)
+
+    def acquire(self, call_site: str, estimated_tokens: int) -> Priority:
+        """Réserve une requête et `estimated_tokens`; lève LLMBudgetExceeded si le budget reste épuisé"""
+        priority = self.priority_for(call_site)
+        reserve = self.RESERVE[priority]
+        deadline = self.clock() + self.max_wait[priority]
+        with self._condition:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    self.requests.refill()
+                    self.tokens.refill()
+                    blocked = any(self._waiting[p] for p in Priority if p < priority)
+                    if not blocked and self.requests.can_take(1, reserve) and \
+                            self.tokens.can_take(estimated_tokens, reserve):
+                        self.requests.take(1)
+                        self.tokens.take(estimated_tokens)
+                        self.metrics.increment(f"llm_scheduler_{priority.name.lower()}_granted")
+                        return priority
+
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        self.metrics.increment(f"llm_scheduler_{priority.name.lower()}_rejected")
+                        raise LLMBudgetExceeded(
+                            f"Budget LLM épuisé pour {call_site} (priorité {priority.name.lower()})"
+                        )
+                    wait = max(self.requests.seconds_until(1, reserve),
+                               self.tokens.seconds_until(estimated_tokens, reserve))
+                    self._condition.wait(min(remaining, max(wait, 0.01)))
+            finally:
+                self._waiting[priority] -= 1
+                self._condition.notify_all()
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Corrige la réservation avec les tokens réellement consommés"""
+        if not actual_tokens:
+            return
+        with self._condition:
+            self.tokens.take(actual_tokens - estimated_tokens)
+            self._condition.notify_all()
+
+    def release(self, estimated_tokens: int) -> None:
+        """Rend une réservation jamais utilisée (appel annulé avant l'envoi)"""
+        with self._condition:
+            self.requests.take(-1)
+            self.tokens.take(-estimated_tokens)
+            self._condition.notify_all()
+
+    def rate_limited(self) -> None:
+        """Le fournisseur a refusé l'appel (429): on vide les seaux pour ralentir tout le processus"""
+        with self._condition:
+            self.requests.drain()
+            self.tokens.drain()
+        self.metrics.increment("llm_scheduler_provider_rate_limited")
+
+    @contextmanager
+    def slot(self, call_site: str, estimated_tokens: int, usage: Optional[Dict] = None):
+        """Encadre un appel: réservation, puis correction avec `usage["total_tokens"]`"""
+        with self.metrics.timer("llm_scheduler_wait_seconds"):
+            self.acquire(call_site, estimated_tokens)
+        try:
+            yield
+        except Exception as e:
+            if "rate limit" in str(e).lower() or type(e).__name__ == "RateLimitError":
+                self.rate_limited()
+            raise
+        finally:
+            self.settle(estimated_tokens, (usage or {}).get("total_tokens"))
+
+    @asynccontextmanager
+    async def aslot(self, call_site: str, estimated_tokens: int, usage: Optional[Dict] = None):
+        """`slot` pour les coroutines: une éventuelle attente de budget se fait dans un thread,
+        sans bloquer la boucle. Si l'appel est annulé pendant l'attente, la réservation obtenue
+        ensuite est rendue."""
+        with self.metrics.timer("llm_scheduler_wait_seconds"):
+            if self.requests.unlimited and self.tokens.unlimited:
+                self.acquire(call_site, estimated_tokens)  # jamais d'attente
+            else:
+                await self._acquire_in_thread(call_site, estimated_tokens)
+        try:
+            yield
+        except Exception as e:
+            if "rate limit" in str(e).lower() or type(e).__name__ == "RateLimitError":
+                self.rate_limited()
+            raise
+        finally:
+            self.settle(estimated_tokens, (usage or {}).get("total_tokens"))
+
+    async def _acquire_in_thread(self, call_site: str, estimated_tokens: int) -> Priority:
+        waiting: Future = Future()
+        context = contextvars.copy_context()  # priorité d'arrière-plan éventuelle
+
+        def run():
+            if not waiting.set_running_or_notify_cancel():
+                return
+            try:
+                waiting.set_result(context.run(self.acquire, call_site, estimated_tokens))
+            except BaseException as e:
+                waiting.set_exception(e)
+
+        def release_if_granted(done: Future):
+            if done.exception() is None:
+                self.release(estimated_tokens)
+
+        threading.Thread(target=run, name="llm-scheduler-wait", daemon=True).start()
+        try:
+            return await asyncio.shield(asyncio.wrap_future(waiting))
+        except asyncio.CancelledError:
+            waiting.add_done_callback(release_if_granted)
+            raise
+
+    def stats(self) -> Dict:
+        with self._condition:
+            self.requests.refill()
+            self.tokens.refill()
+            return {
+                "requests_per_minute": self.requests.capacity,
+                "tokens_per_minute": self.tokens.capacity,
+                "requests_available": None if self.requests.unlimited else round(self.requests.level, 1),
+                "tokens_available": None if self.tokens.unlimited else round(self.tokens.level),
+                "waiting": {priority.name.lower(): n for priority, n in self._waiting.items()},
+            }
+
+
+_shared_scheduler: Optional[LLMScheduler] = None
+_shared_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    """Ordonnanceur unique du processus (les quotas Groq sont par clé, pas par session).
+    Créé au premier appel, après le chargement du .env."""
+    global _shared_scheduler
+    with _shared_scheduler_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = LLMScheduler()
+        return _shared_scheduler
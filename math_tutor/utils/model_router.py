@@ -0,0 +1,147 @@
+# utils/model_router.py
+import os
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from math_tutor.utils.metrics import PerformanceMetrics, metrics as default_metrics
+
+# Site d'appel -> niveau de modèle (surchargeable par LLM_ROUTES="coaching=small,evaluation=large")
+DEFAULT_ROUTES = {
+    "exercise_generation": "large",
+    "exercise_batch": "large",
+    "similar_exercise": "large",
+    "evaluation": "large",
+    "evaluation_coaching": "large",
+    "evaluation_verdict": "large",
+    "evaluation_details": "large",
+    "coaching": "small",
+}
+
+
+class ModelTier(BaseModel):
+    name: str
+    model: str
+    temperature: float
+    latency_budget: float  # secondes, au p95 récent
+
+
+def default_tiers(temperature: float = 0.7) -> List[ModelTier]:
+    """Niveaux du plus grand au plus petit, configurables par variables d'environnement"""
+    return [
+        ModelTier(
+            name="large",
+            model=os.getenv("LLM_LARGE_MODEL", "llama-3.3-70b-versatile"),
+            temperature=temperature,
+            latency_budget=float(os.getenv("LLM_LARGE_BUDGET_SECONDS", "20")),
+        ),
+        ModelTier(
+            name="small",
+            model=os.getenv("LLM_SMALL_MODEL", "llama-3.1-8b-instant"),
+            temperature=temperature,
+            latency_budget=float(os.getenv("LLM_SMALL_BUDGET_SECONDS", "5")),
+        ),
+    ]
+
+
+def parse_routes(spec: Optional[str]) -> Dict[str, str]:
+    routes = dict(DEFAULT_ROUTES)
+    for item in (spec or "").split(","):
+        if "=" in item:
+            call_site, tier = item.split("=", 1)
+            routes[call_site.strip()] = tier.strip()
+    return routes
+
+
+class ModelRouter:
+    """Choisit le niveau de modèle de chaque site d'appel.
+
+    Si le p95 récent du niveau prévu dépasse son budget de latence, l'appel descend au
+    niveau inférieur. Un appel sur `PROBE_EVERY` reste sur le niveau prévu pour en
+    rafraîchir la mesure (sinon un niveau rétrogradé ne serait jamais réévalué)."""
+
+    WINDOW = 20
+    MIN_SAMPLES = 5
+    PROBE_EVERY = 10
+
+    def __init__(
+        self,
+        client_factory: Callable[[ModelTier], Any],
+        tiers: Optional[List[ModelTier]] = None,
+        routes: Optional[Dict[str, str]] = None,
+        metrics: Optional[PerformanceMetrics] = None,
+    ):
+        self.client_factory = client_factory
+        self.tiers = tiers or default_tiers()
+        self.tier_names = [tier.name for tier in self.tiers]
+        self.routes = routes if routes is not None else parse_routes(os.getenv("LLM_ROUTES"))
+        unknown = set(self.routes.values()) - set(self.tier_names)
+        if unknown:
+            raise ValueError(f"Niveaux de modèle inconnus dans LLM_ROUTES: {', '.join(sorted(unknown))}")
+        self.metrics = metrics or default_metrics
+        self._lock = threading.Lock()
+        self._clients: Dict[str, Any] = {}
+        self._latencies: Dict[str, Deque[float]] = {name: deque(maxlen=self.WINDOW) for name in self.tier_names}
+        self._downgrades: Dict[str, int] = {}
+
+    @property
+    def default_tier(self) -> ModelTier:
+        return self.tiers[0]
+
+    def tier(self, name: str) -> ModelTier:
+        return self.tiers[self.tier_names.index(name)]
+
+    def client(self, tier: ModelTier):
+        """Client de chat du niveau (construit au premier usage)"""
+        with self._lock:
+            if tier.name not in self._clients:
+                self._clients[tier.name] = self.client_factory(tier)
+            return self._clients[tier.name]
+
+    def recent_p95(self, tier: ModelTier) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._latencies[tier.name])
+        if len(samples) < self.MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))]
+
+    def route(self, call_site: str) -> ModelTier:
+        """Niveau retenu pour l'appel, après rétrogradation éventuelle"""
+        tier = self.tier(self.routes.get(call_site, self.default_tier.name))
+        index = self.tier_names.index(tier.name)
+        while index + 1 < len(self.tiers):
+            p95 = self.recent_p95(tier)
+            if p95 is None or p95 <= tier.latency_budget:
+                break
+            with self._lock:
+                count = self._downgrades.get(tier.name, 0) + 1
+                self._downgrades[tier.name] = count
+            if count % self.PROBE_EVERY == 0:
+                self.metrics.increment("llm_route_probe")
+                break
+            smaller = self.tiers[index + 1]
+            print(f"⚠️ Routage {call_site}: {tier.name} → {smaller.name} "
+                  f"(p95 {p95:.1f} s > budget {tier.latency_budget:.0f} s)")
+            self.metrics.increment("llm_route_downgraded")
+            tier, index = smaller, index + 1
+        self.metrics.increment(f"llm_route_{call_site}_{tier.name}")
+        return tier
+
+    def record(self, tier: ModelTier, seconds: float) -> None:
+        """Latence observée d'un appel réussi sur ce niveau"""
+        with self._lock:
+            self._latencies[tier.name].append(seconds)
+        self.metrics.observe(f"llm_tier_{tier.name}_seconds", seconds)
+
+    def stats(self) -> Dict[str, Dict]:
+        return {
+            tier.name: {
+                "model": tier.model,
+                "budget_seconds": tier.latency_budget,
+                "recent_p95": self.recent_p95(tier),
+                "downgrades": self._downgrades.get(tier.name, 0),
+            }
+            for tier in self.tiers
+        }
@@ -0,0 +1,78 @@
+# utils/profile_cache.py
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from math_tutor.utils.metrics import PerformanceMetrics, metrics as default_metrics
+
+
+class ProfileCache:
+    """Cache LRU borné des profils élèves validés, associés à la version lue dans le stockage.
+
+    `get(id, version)` ne rend le profil que si la version courante du stockage (incrémentée à
+    chaque écriture) est celle du profil en cache: une écriture d'un autre processus ou d'une
+    autre instance est donc remarquée au chargement suivant. Les profils sont conservés
+    sérialisés (pickle) et chaque lecture rend une copie indépendante: les sessions modifient
+    l'historique en place (coaching ajouté après coup) sans toucher au cache."""
+
+    def __init__(self, max_entries: Optional[int] = None, metrics: Optional[PerformanceMetrics] = None):
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("STUDENT_CACHE_SIZE", "64"))
+        self.metrics = metrics or default_metrics
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Hashable, bytes]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, student_id: str, version: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(student_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(student_id)
+                self.hits += 1
+                blob = entry[1]
+            else:
+                if entry is not None:
+                    # Profil réécrit depuis sa mise en cache
+                    del self._entries[student_id]
+                    self.stale += 1
+                    self.metrics.increment("student_cache_stale")
+                self.misses += 1
+                self.metrics.increment("student_cache_miss")
+                return None
+        self.metrics.increment("student_cache_hit")
+        return pickle.loads(blob)
+
+    def put(self, student_id: str, version: Hashable, profile: Any) -> None:
+        if self.max_entries <= 0 or version is None:
+            return
+        blob = pickle.dumps(profile, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[student_id] = (version, blob)
+            self._entries.move_to_end(student_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, student_id: Optional[str] = None) -> None:
+        with self._lock:
+            if student_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(student_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs visibles dans l'interface (Paramètres)"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "load_p50": self.metrics.percentile("student_load_seconds", 50),
+                "load_p95": self.metrics.percentile("student_load_seconds", 95),
+            }
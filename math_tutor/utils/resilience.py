@@ -0,0 +1,227 @@
+# utils/resilience.py
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Optional, Tuple, Type
+
+from math_tutor.utils.metrics import PerformanceMetrics, metrics as default_metrics
+
+
+class LLMUnavailable(RuntimeError):
+    """Le modèle ne peut pas répondre maintenant: l'appelant bascule sur un fallback local"""
+
+
+class DeadlineExceeded(LLMUnavailable):
+    """Pas de réponse du modèle avant l'échéance de l'appel"""
+
+
+class CircuitOpen(LLMUnavailable):
+    """Disjoncteur ouvert après des échecs répétés: aucun appel jusqu'à la prochaine sonde"""
+
+
+class CircuitBreaker:
+    """Disjoncteur fermé / ouvert / semi-ouvert.
+
+    Après `failure_threshold` échecs consécutifs, il s'ouvre pendant `reset_timeout` secondes;
+    un seul appel sonde est ensuite laissé passer: succès = refermé, échec = rouvert."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 metrics: Optional[PerformanceMetrics] = None, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.metrics = metrics or default_metrics
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.metrics.increment("llm_circuit_probe")
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                self.metrics.increment("llm_circuit_closed")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.metrics.increment("llm_circuit_opened")
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+
+    def release_probe(self) -> None:
+        """Sonde abandonnée (annulée) sans verdict: la prochaine requête pourra sonder à nouveau"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.opened_at = self.clock() - self.reset_timeout
+
+
+class ResilientCaller:
+    """Exécute un appel au modèle avec échéance, relance parallèle (hedging) et disjoncteur.
+
+    - échéance: `DeadlineExceeded` si aucune réponse après `deadline` secondes (le thread
+      de l'appel n'est pas interrompu, sa réponse tardive est ignorée);
+    - hedging: si l'appel n'a pas répondu après le p95 observé du site (ou `hedge_after`
+      secondes), une seconde requête identique part et la première réponse est retenue;
+    - disjoncteur: les erreurs du fournisseur l'ouvrent, puis `CircuitOpen`. Les erreurs
+      `ignored` (par défaut ValueError: sortie invalide, ValidationError) ne comptent pas."""
+
+    # Mesures nécessaires avant de se fier au p95 observé
+    MIN_SAMPLES_FOR_P95 = 20
+
+    def __init__(
+        self,
+        deadline: Optional[float] = None,
+        hedge_after: Optional[str] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        max_workers: int = 16,
+        metrics: Optional[PerformanceMetrics] = None,
+        ignored: Tuple[Type[BaseException], ...] = (ValueError,),
+    ):
+        self.metrics = metrics or default_metrics
+        self.deadline = deadline if deadline is not None else float(os.getenv("LLM_DEADLINE_SECONDS", "45"))
+        # "off", "p95" ou un délai fixe en secondes
+        self.hedge_after = hedge_after if hedge_after is not None else os.getenv("LLM_HEDGE_AFTER", "off")
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30")),
+            metrics=self.metrics,
+        )
+        self.ignored = ignored
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-call")
+
+    def hedge_delay(self, call_site: str) -> Optional[float]:
+        if self.hedge_after == "off":
+            return None
+        if self.hedge_after == "p95":
+            name = f"llm_{call_site}_seconds"
+            if self.metrics.sample_count(name) < self.MIN_SAMPLES_FOR_P95:
+                return None
+            return self.metrics.percentile(name, 95)
+        return float(self.hedge_after)
+
+    def _submit(self, fn: Callable[[], Any]) -> Future:
+        # Le contexte (priorité de l'ordonnanceur, etc.) suit l'appel dans le thread
+        return self._executor.submit(contextvars.copy_context().run, fn)
+
+    def call(self, call_site: str, fn: Callable[[], Any], hedge: bool = False,
+             hedge_permit: Optional[Callable[[], bool]] = None) -> Any:
+        """Résultat du premier appel réussi de `fn`; `hedge_permit` autorise (ou non) la relance"""
+        if not self.breaker.allow():
+            self.metrics.increment("llm_circuit_rejected")
+            raise CircuitOpen(f"Modèle indisponible ({call_site}): disjoncteur ouvert")
+
+        start = time.monotonic()
+        first = self._submit(fn)
+        pending = {first}
+        delay = self.hedge_delay(call_site) if hedge else None
+        error: Optional[BaseException] = None
+
+        while pending:
+            elapsed = time.monotonic() - start
+            if elapsed >= self.deadline:
+                break
+            timeout = self.deadline - elapsed
+            if delay is not None:
+                timeout = min(timeout, max(0.0, delay - elapsed))
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    self.breaker.record_success()
+                    if future is not first:
+                        self.metrics.increment("llm_hedge_won")
+                    return future.result()
+            if not done and delay is not None:
+                delay = None
+                if hedge_permit is None or hedge_permit():
+                    self.metrics.increment("llm_hedge_fired")
+                    pending.add(self._submit(fn))
+
+        if not pending:
+            if isinstance(error, self.ignored):
+                # Le fournisseur a répondu (sortie invalide): ce n'est pas une panne
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            raise error
+        self.breaker.record_failure()
+        self.metrics.increment(f"llm_{call_site}_deadline_exceeded")
+        raise DeadlineExceeded(f"Pas de réponse du modèle ({call_site}) en {self.deadline:.0f} s")
+
+    async def acall(self, call_site: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Version asynchrone de `call` (échéance et disjoncteur, sans relance parallèle).
+        À l'échéance ou à l'annulation, la requête en cours est réellement interrompue."""
+        if not self.breaker.allow():
+            self.metrics.increment("llm_circuit_rejected")
+            raise CircuitOpen(f"Modèle indisponible ({call_site}): disjoncteur ouvert")
+        try:
+            result = await asyncio.wait_for(fn(), timeout=self.deadline)
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            self.metrics.increment(f"llm_{call_site}_deadline_exceeded")
+            raise DeadlineExceeded(f"Pas de réponse du modèle ({call_site}) en {self.deadline:.0f} s") from None
+        except asyncio.CancelledError:
+            # Annulé par l'appelant: ni succès ni panne
+            self.breaker.release_probe()
+            raise
+        except self.ignored:
+            self.breaker.record_success()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    @contextmanager
+    def guard(self, call_site: str):
+        """Disjoncteur seul, pour les appels en flux (consommés par morceaux, sans échéance globale)"""
+        if not self.breaker.allow():
+            self.metrics.increment("llm_circuit_rejected")
+            raise CircuitOpen(f"Modèle indisponible ({call_site}): disjoncteur ouvert")
+        try:
+            yield  # une lecture interrompue (GeneratorExit) ne compte ni comme succès ni comme panne
+        except GeneratorExit:
+            self.breaker.release_probe()
+            raise
+        except self.ignored:
+            self.breaker.record_success()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+
+
+_shared_caller: Optional[ResilientCaller] = None
+_shared_caller_lock = threading.Lock()
+
+
+def get_resilient_caller() -> ResilientCaller:
+    """Appelant unique du processus: le disjoncteur reflète l'état du fournisseur pour toutes les sessions"""
+    global _shared_caller
+    with _shared_caller_lock:
+        if _shared_caller is None:
+            _shared_caller = ResilientCaller()
+        return _shared_caller
@@ -0,0 +1,66 @@
+# utils/single_flight.py
+import copy
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from math_tutor.utils.metrics import PerformanceMetrics, metrics as default_metrics
+
+
+class SingleFlight:
+    """Regroupe les appels identiques simultanés: le premier s'exécute, les suivants
+    attendent son résultat (ou son exception) au lieu de relancer le même travail."""
+
+    def __init__(self, metrics: Optional[PerformanceMetrics] = None):
+        self.metrics = metrics or default_metrics
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            self.metrics.increment("single_flight_coalesced")
+            # Copie: les sessions ne doivent pas partager (et modifier) le même objet
+            return copy.deepcopy(future.result())
+
+        self.metrics.increment("single_flight_leader")
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.leaders + self.coalesced
+            return {
+                "in_flight": len(self._in_flight),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "coalesced_ratio": self.coalesced / total if total else 0.0,
+            }
+
+
+# Partagé par toutes les sessions Streamlit du processus
+single_flight = SingleFlight()
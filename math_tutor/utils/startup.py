@@ -0,0 +1,97 @@
+# utils/startup.py
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from math_tutor.utils.metrics import PerformanceMetrics, metrics as default_metrics
+
+
+class StartupOrchestrator:
+    """Démarrage à froid: initialisations indépendantes exécutées en parallèle.
+
+    Chaque composant est déclaré par `add(nom, fonction, after=...)`. Il démarre dès que les
+    composants de `after` sont terminés, qu'ils aient réussi ou non: `after` ne fixe que l'ordre.
+    Un composant `in_caller` s'exécute dans le thread appelant (ressource liée au thread), pendant
+    que les autres avancent dans le pool.
+    L'erreur d'un composant est conservée et relevée par `result(nom)`, sans interrompre les autres.
+    La durée de chaque initialisation est mesurée (`durations`, `startup_<nom>_seconds`)."""
+
+    def __init__(self, max_workers: Optional[int] = None, parallel: Optional[bool] = None,
+                 metrics: Optional[PerformanceMetrics] = None):
+        self.max_workers = max_workers or int(os.getenv("STARTUP_WORKERS", "6"))
+        self.parallel = parallel if parallel is not None else os.getenv("STARTUP_PARALLEL", "1") != "0"
+        self.metrics = metrics or default_metrics
+        self._components: Dict[str, Tuple[Callable[[], Any], Tuple[str, ...], bool]] = {}
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.durations: Dict[str, float] = {}
+        self.total_seconds = 0.0
+
+    def add(self, name: str, fn: Callable[[], Any], after: Iterable[str] = (),
+            in_caller: bool = False) -> "StartupOrchestrator":
+        after = tuple(after)
+        # Dépendances déclarées avant: pas de cycle possible
+        unknown = [dependency for dependency in after if dependency not in self._components]
+        if unknown:
+            raise ValueError(f"Composant {name}: dépendances inconnues {unknown}")
+        self._components[name] = (fn, after, in_caller)
+        return self
+
+    def run(self) -> "StartupOrchestrator":
+        start = time.perf_counter()
+        if self.parallel:
+            self._run_parallel()
+        else:
+            for name, (fn, _, _) in self._components.items():
+                self._init(name, fn)
+        self.total_seconds = time.perf_counter() - start
+        self.metrics.observe("startup_total_seconds", self.total_seconds)
+        return self
+
+    def _run_parallel(self) -> None:
+        remaining = dict(self._components)
+        finished = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="startup") as pool:
+            running: Dict[Future, str] = {}
+            while remaining or running:
+                ready = [name for name, (_, after, _) in remaining.items() if finished.issuperset(after)]
+                for name in ready:
+                    fn, _, in_caller = remaining[name]
+                    if not in_caller:
+                        del remaining[name]
+                        running[pool.submit(self._init, name, fn)] = name
+                # Le thread appelant exécute ses propres composants au lieu d'attendre
+                inline = next((name for name in ready if name in remaining), None)
+                if inline is not None:
+                    self._init(inline, remaining.pop(inline)[0])
+                    finished.add(inline)
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                finished.update(running.pop(future) for future in done)
+
+    def _init(self, name: str, fn: Callable[[], Any]) -> None:
+        start = time.perf_counter()
+        try:
+            self.results[name] = fn()
+        except Exception as e:
+            self.errors[name] = e
+        finally:
+            self.durations[name] = time.perf_counter() - start
+            self.metrics.observe(f"startup_{name}_seconds", self.durations[name])
+
+    def result(self, name: str) -> Any:
+        """Résultat du composant (relève son erreur d'initialisation)"""
+        if name in self.errors:
+            raise self.errors[name]
+        return self.results[name]
+
+    def report(self) -> List[str]:
+        """Une ligne par composant, du plus lent au plus rapide, puis le total"""
+        lines = []
+        for name, seconds in sorted(self.durations.items(), key=lambda item: item[1], reverse=True):
+            error = self.errors.get(name)
+            lines.append(f"❌ {name}: {seconds:.2f} s — {str(error)[:120]}" if error else f"✅ {name}: {seconds:.2f} s")
+        lines.append(f"Total: {self.total_seconds:.2f} s "
+                     f"({'parallèle' if self.parallel else 'séquentiel'}, somme: {sum(self.durations.values()):.2f} s)")
+        return lines
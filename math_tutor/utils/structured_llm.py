@@ -0,0 +1,216 @@
+# utils/structured_llm.py
+import json
+import re
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from math_tutor.utils.lazy_import import LazyImport
+from math_tutor.utils.metrics import PerformanceMetrics, metrics as default_metrics
+
+if TYPE_CHECKING:
+    from math_tutor.utils.token_usage import TokenUsageHandler
+
+# Messages construits au premier appel LLM: langchain_core coûte ~0,35 s à l'import
+AIMessage = LazyImport("langchain_core.messages", "AIMessage")
+HumanMessage = LazyImport("langchain_core.messages", "HumanMessage")
+SystemMessage = LazyImport("langchain_core.messages", "SystemMessage")
+
+
+class StructuredOutputError(ValueError):
+    """Réponse du modèle toujours invalide après la réparation"""
+
+
+def parse_structured_output(text: str, output_model: Type[BaseModel]) -> BaseModel:
+    """Valide le premier objet JSON de la réponse dans le modèle Pydantic attendu"""
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    return output_model.model_validate_json(match.group(0) if match else text)
+
+
+class StructuredLLM:
+    """Appel direct du client de chat partagé, validé par un modèle Pydantic.
+
+    Un appel = une requête; si la réponse ne respecte pas le schéma, une seule requête
+    de réparation est envoyée avec l'erreur de validation (au lieu de la boucle d'agent)."""
+
+    def __init__(self, llm, max_repairs: int = 1, metrics: Optional[PerformanceMetrics] = None):
+        self.llm = llm
+        self.max_repairs = max_repairs
+        self.metrics = metrics or default_metrics
+
+    @staticmethod
+    def schema_instructions(output_model: Type[BaseModel]) -> str:
+        schema = json.dumps(output_model.model_json_schema(), ensure_ascii=False)
+        return (
+            "Réponds UNIQUEMENT avec un objet JSON valide conforme à ce schéma, "
+            f"sans texte ni markdown autour:\n{schema}"
+        )
+
+    def _messages(self, system_prompt: str, prompt: str, output_model: Type[BaseModel]) -> List:
+        return [
+            SystemMessage(content=f"{system_prompt}\n\n{self.schema_instructions(output_model)}"),
+            HumanMessage(content=prompt),
+        ]
+
+    def _parse_or_repair(self, text: str, output_model: Type[BaseModel], iterations: int,
+                         messages: List) -> Optional[BaseModel]:
+        """Sortie validée, ou None après avoir ajouté la demande de réparation à `messages`"""
+        try:
+            return parse_structured_output(text, output_model)
+        except (ValidationError, ValueError) as e:
+            if iterations > self.max_repairs:
+                raise StructuredOutputError(
+                    f"Sortie {output_model.__name__} invalide après {iterations} essais: {e}"
+                ) from e
+            self.metrics.increment("llm_repair_retry")
+            messages += [
+                AIMessage(content=text),
+                HumanMessage(content=(
+                    f"Ta réponse ne respecte pas le schéma ({str(e)[:500]}). "
+                    "Renvoie uniquement l'objet JSON corrigé."
+                )),
+            ]
+            return None
+
+    def _record_usage(self, call_site: str, iterations: int, tokens: "TokenUsageHandler",
+                      usage: Optional[Dict]) -> None:
+        self.metrics.observe(f"llm_{call_site}_iterations", iterations)
+        if tokens.total_tokens:
+            self.metrics.observe(f"llm_{call_site}_tokens", tokens.total_tokens)
+        if usage is not None:
+            usage.update(iterations=iterations, total_tokens=tokens.total_tokens)
+
+    def invoke(self, call_site: str, system_prompt: str, prompt: str, output_model: Type[BaseModel],
+               usage: Optional[Dict] = None) -> BaseModel:
+        """`usage`, si fourni, reçoit le nombre de requêtes et de tokens consommés par l'appel"""
+        from math_tutor.utils.token_usage import TokenUsageHandler
+        tokens = TokenUsageHandler()
+        messages = self._messages(system_prompt, prompt, output_model)
+        iterations = 0
+        try:
+            while True:
+                iterations += 1
+                text = str(self.llm.invoke(messages, config={"callbacks": [tokens]}).content)
+                result = self._parse_or_repair(text, output_model, iterations, messages)
+                if result is not None:
+                    return result
+        finally:
+            self._record_usage(call_site, iterations, tokens, usage)
+
+    async def ainvoke(self, call_site: str, system_prompt: str, prompt: str, output_model: Type[BaseModel],
+                      usage: Optional[Dict] = None) -> BaseModel:
+        """`invoke` sur le client asynchrone: annuler la coroutine interrompt la requête en cours"""
+        from math_tutor.utils.token_usage import TokenUsageHandler
+        tokens = TokenUsageHandler()
+        messages = self._messages(system_prompt, prompt, output_model)
+        iterations = 0
+        try:
+            while True:
+                iterations += 1
+                text = str((await self.llm.ainvoke(messages, config={"callbacks": [tokens]})).content)
+                result = self._parse_or_repair(text, output_model, iterations, messages)
+                if result is not None:
+                    return result
+        finally:
+            self._record_usage(call_site, iterations, tokens, usage)
+
+
+class JsonFieldScanner:
+    """Extrait au fil de l'eau la valeur des champs texte `fields` d'un JSON en cours d'écriture.
+
+    `feed(morceau)` retourne les fragments décodés [(champ, texte)] apparus dans ce morceau,
+    quelle que soit la profondeur du champ (modèles imbriqués)."""
+
+    ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = set(fields)
+        self.in_string = False
+        self.escape = ""          # séquence d'échappement en cours ("\\" ou "\\uXX...")
+        self.buffer: List[str] = []
+        self.string_is_value = False
+        self.last_string: Optional[str] = None
+        self.key: Optional[str] = None
+        self.expecting_value = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        events: List[Tuple[str, str]] = []
+        for char in chunk:
+            if self.in_string:
+                decoded = self._string_char(char)
+                if decoded and self.string_is_value and self.key in self.fields:
+                    if events and events[-1][0] == self.key:
+                        events[-1] = (self.key, events[-1][1] + decoded)
+                    else:
+                        events.append((self.key, decoded))
+            elif char == '"':
+                self.in_string, self.buffer = True, []
+                self.string_is_value = self.expecting_value
+                self.expecting_value = False
+            elif char == ":":
+                self.key, self.expecting_value = self.last_string, True
+            elif not char.isspace():
+                # Valeur non textuelle (nombre, booléen, objet, liste) ou séparateur
+                self.expecting_value = False
+                self.last_string = None
+        return events
+
+    def _string_char(self, char: str) -> str:
+        """Caractère décodé à émettre ('' s'il n'y en a pas encore)"""
+        if self.escape:
+            self.escape += char
+            if self.escape.startswith("\\u"):
+                if len(self.escape) < 6:
+                    return ""
+                decoded = chr(int(self.escape[2:], 16))
+            else:
+                decoded = self.ESCAPES.get(char, char)
+            self.escape = ""
+            self.buffer.append(decoded)
+            return decoded
+        if char == "\\":
+            self.escape = char
+            return ""
+        if char == '"':
+            self.in_string = False
+            if self.string_is_value:
+                self.key = None
+            else:
+                self.last_string = "".join(self.buffer)
+            return ""
+        self.buffer.append(char)
+        return char
+
+
+class StructuredStream:
+    """Flux d'un appel structuré: itère sur (champ, fragment) des champs narratifs à mesure
+    que le modèle écrit, puis valide la réponse complète dans `result`.
+
+    Une erreur (modèle indisponible, JSON invalide) arrête le flux sans lever d'exception:
+    `result` reste None et `error` la contient, l'appelant repasse par l'appel classique."""
+
+    def __init__(self, chunks: Iterable[str], output_model: Type[BaseModel], fields: Iterable[str],
+                 on_result: Optional[Callable[[BaseModel], None]] = None,
+                 metrics: Optional[PerformanceMetrics] = None):
+        self.chunks = chunks
+        self.output_model = output_model
+        self.scanner = JsonFieldScanner(fields)
+        self.on_result = on_result
+        self.metrics = metrics or default_metrics
+        self.result: Optional[BaseModel] = None
+        self.error: Optional[BaseException] = None
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        text = []
+        try:
+            for chunk in self.chunks:
+                text.append(chunk)
+                yield from self.scanner.feed(chunk)
+            self.result = parse_structured_output("".join(text), self.output_model)
+        except Exception as e:
+            self.error = e
+            self.metrics.increment("llm_stream_failed")
+            print(f"⚠️ Flux {self.output_model.__name__} interrompu: {str(e)}")
+            return
+        if self.on_result:
+            self.on_result(self.result)
@@ -0,0 +1,521 @@
+# utils/student_store.py
+import json
+import os
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from math_tutor.utils.file_lock import KeyedFileLock
+from math_tutor.utils.metrics import PerformanceMetrics, metrics as default_metrics
+
+HISTORY_FIELD = "learning_history"
+SUMMARY_FIELDS = ("student_id", "name", "level", "current_objective", "last_session")
+
+
+class ProfileConflict(RuntimeError):
+    """Profil réécrit ailleurs (autre onglet, autre worker) depuis son chargement: à recharger"""
+
+    def __init__(self, student_id: str, expected: int, found: int):
+        super().__init__(f"Profil {student_id} modifié ailleurs (version {found}, attendue {expected}): rechargez-le")
+        self.student_id = student_id
+        self.expected = expected
+        self.found = found
+
+
+def new_student_id() -> str:
+    """Horodatage (16 chiffres, comme les anciens identifiants) suivi de 4 chiffres aléatoires.
+
+    Deux créations simultanées ne tombent presque jamais sur le même identifiant; si cela
+    arrive, la création sans écrasement (`ProfileConflict`) fait tirer un autre identifiant."""
+    return datetime.now().strftime("%Y%m%d%H%M%S%f")[:16] + f"{secrets.randbelow(10_000):04d}"
+
+
+class StudentStore(ABC):
+    """Stockage des profils de `StudentManager` (fichiers JSON ou SQLite, voir STUDENT_STORE).
+
+    Les profils circulent sous forme de dictionnaires (`StudentProfile.model_dump()`);
+    `save` reçoit le profil lui-même et retourne la quantité écrite (octets ou lignes)."""
+
+    @abstractmethod
+    def exists(self, student_id: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def load(self, student_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def version(self, student_id: str) -> Optional[int]:
+        """Version persistée du profil (incrémentée à chaque écriture), None s'il n'existe pas"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, student) -> int:
+        """Écrit le profil si sa version est celle du stockage (sinon `ProfileConflict`), puis
+        incrémente `student.version`"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def student_ids(self) -> List[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def find(self, name: Optional[str] = None, objective: Optional[str] = None,
+             since: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Résumés des profils (sans historique) par nom (sans casse), objectif courant ou
+        dernière session (ISO, `since` inclus), du plus récent au plus ancien"""
+        raise NotImplementedError
+
+
+class JsonStudentStore(StudentStore):
+    """Profils élèves: un petit en-tête JSON et un journal d'historique en ajout seul.
+
+    - `<id>.json`: le profil sans `learning_history`, remplacé atomiquement (fichier
+      temporaire puis `os.replace`) et seulement s'il a changé;
+    - `<id>.history.jsonl`: une ligne `{"i": position, "entry": {...}}` par entrée nouvelle
+      ou modifiée depuis la dernière sauvegarde (une tentative reçoit son coaching ou son
+      explication après coup). Au chargement, la dernière ligne de chaque position l'emporte.
+
+    Une sauvegarde n'écrit donc que ce qui a changé, quelle que soit l'ancienneté de l'élève.
+    Quand les lignes remplacées dépassent `compact_min` et la taille de l'historique, le
+    journal est réécrit (atomiquement) avec une ligne par entrée. Un ancien profil (historique
+    dans le JSON) se charge tel quel et passe au nouveau format à sa première sauvegarde.
+
+    Lectures et écritures d'un élève se font sous son verrou de fichier (`.locks/<id>.lock`),
+    partagé ou exclusif: plusieurs processus peuvent servir le même dossier."""
+
+    def __init__(self, data_dir: Path, compact_min: Optional[int] = None,
+                 metrics: Optional[PerformanceMetrics] = None):
+        self.data_dir = Path(data_dir)
+        self.compact_min = compact_min if compact_min is not None else int(os.getenv("STUDENT_LOG_COMPACT_MIN", "32"))
+        self.metrics = metrics or default_metrics
+        self._locks = KeyedFileLock(self.data_dir / ".locks", metrics=self.metrics)
+        # student_id -> copie des entrées persistées (par position), nombre de lignes du journal, en-tête écrit.
+        # Comparer aux copies (égalité de dictionnaires) évite de resérialiser tout l'historique à chaque sauvegarde
+        self._persisted: Dict[str, List[Dict[str, Any]]] = {}
+        self._log_lines: Dict[str, int] = {}
+        self._headers: Dict[str, str] = {}
+
+    def header_path(self, student_id: str) -> Path:
+        return self.data_dir / f"{student_id}.json"
+
+    def history_path(self, student_id: str) -> Path:
+        return self.data_dir / f"{student_id}.history.jsonl"
+
+    @staticmethod
+    def _dumps(entry: Dict[str, Any]) -> str:
+        return json.dumps(entry, ensure_ascii=False)
+
+    def exists(self, student_id: str) -> bool:
+        return self.header_path(student_id).exists()
+
+    def version(self, student_id: str) -> Optional[int]:
+        # En-tête remplacé atomiquement: lisible sans verrou
+        header_text = self._read_header(student_id)
+        return json.loads(header_text).get("version", 0) if header_text is not None else None
+
+    def _read_header(self, student_id: str) -> Optional[str]:
+        try:
+            with open(self.header_path(student_id), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def load(self, student_id: str) -> Optional[Dict[str, Any]]:
+        """Profil complet (en-tête + historique reconstruit), ou None s'il n'existe pas"""
+        with self._locks(student_id, shared=True):
+            header_text = self._read_header(student_id)
+            if header_text is None:
+                return None
+            data = json.loads(header_text)
+            if HISTORY_FIELD in data:
+                # Ancien format: migré à la prochaine sauvegarde
+                self._forget(student_id)
+                return data
+            entries, log_lines, damaged = self._read_log(student_id)
+            history = [entries[i] for i in sorted(entries)]
+            if len(history) < data.get("history_length", 0):
+                print(f"⚠️ Historique incomplet pour {student_id}: {len(history)}/{data['history_length']} entrées")
+            if damaged:
+                # Ne pas ajouter derrière une ligne tronquée: journal réécrit à la prochaine sauvegarde
+                self._forget(student_id)
+            else:
+                self._persisted[student_id] = json.loads(json.dumps(history))
+                self._log_lines[student_id] = log_lines
+                self._headers[student_id] = header_text
+        data.pop("history_length", None)
+        data[HISTORY_FIELD] = history
+        return data
+
+    def student_ids(self) -> List[str]:
+        return sorted(path.stem for path in self.data_dir.glob("*.json"))
+
+    def find(self, name: Optional[str] = None, objective: Optional[str] = None,
+             since: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        # Sans index: chaque en-tête est ouvert
+        matches = []
+        for student_id in self.student_ids():
+            try:
+                with open(self.header_path(student_id), "r", encoding="utf-8") as f:
+                    header = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if _matches(header, name, objective, since):
+                matches.append({field: header.get(field) for field in SUMMARY_FIELDS})
+        matches.sort(key=lambda summary: summary["last_session"] or "", reverse=True)
+        return matches[:limit]
+
+    def _read_log(self, student_id: str):
+        entries: Dict[int, Dict[str, Any]] = {}
+        lines = 0
+        damaged = False
+        path = self.history_path(student_id)
+        if not path.exists():
+            return entries, lines, damaged
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Dernière ligne tronquée (arrêt pendant un ajout): les précédentes restent valides
+                    print(f"⚠️ Ligne d'historique illisible ignorée ({student_id})")
+                    damaged = True
+                    continue
+                entries[record["i"]] = record["entry"]
+                lines += 1
+        return entries, lines, damaged
+
+    def save(self, student) -> int:
+        """Écrit les entrées nouvelles ou modifiées puis l'en-tête s'il a changé; retourne les octets écrits"""
+        start = time.perf_counter()
+        student_id = student.student_id
+        history = student.learning_history
+        written = 0
+        with self._locks(student_id):
+            on_disk = self._read_header(student_id)
+            if on_disk is not None:
+                found = json.loads(on_disk).get("version", 0)
+                if found != student.version:
+                    raise ProfileConflict(student_id, student.version, found)
+            if on_disk is None or on_disk != self._headers.get(student_id):
+                # Profil nouveau, supprimé ou écrit par un autre processus: copies locales périmées
+                self._forget(student_id)
+            persisted = self._persisted.get(student_id)
+            if persisted is None or len(history) < len(persisted):
+                # Premier enregistrement, ancien format ou historique raccourci: journal réécrit
+                written += self._compact(student_id, history)
+            else:
+                changed = [(i, self._dumps(entry)) for i, entry in enumerate(history)
+                           if i >= len(persisted) or persisted[i] != entry]
+                if changed:
+                    data = "".join(f'{{"i": {i}, "entry": {line}}}\n' for i, line in changed).encode("utf-8")
+                    with open(self.history_path(student_id), "ab") as f:
+                        f.write(data)
+                    written += len(data)
+                    for i, line in changed:
+                        copy = json.loads(line)
+                        if i < len(persisted):
+                            persisted[i] = copy
+                        else:
+                            persisted.append(copy)
+                    self._log_lines[student_id] += len(changed)
+                if self._log_lines[student_id] - len(history) > max(self.compact_min, len(history)):
+                    written += self._compact(student_id, history)
+                    self.metrics.increment("student_history_compacted")
+            header = student.model_dump(exclude={HISTORY_FIELD})
+            header["history_length"] = len(history)
+            if written or self._header_text(header) != self._headers.get(student_id):
+                # Nouvelle version seulement si quelque chose a changé
+                header["version"] = student.version + 1
+                header_text = self._header_text(header)
+                written += self._write_atomic(self.header_path(student_id), header_text.encode("utf-8"))
+                self._headers[student_id] = header_text
+                student.version += 1
+        self.metrics.observe("student_save_bytes", written)
+        self.metrics.observe("student_save_seconds", time.perf_counter() - start)
+        return written
+
+    @staticmethod
+    def _header_text(header: Dict[str, Any]) -> str:
+        return json.dumps(header, ensure_ascii=False, indent=4)
+
+    def _compact(self, student_id: str, history: List[Dict[str, Any]]) -> int:
+        """Réécrit le journal avec une seule ligne par entrée"""
+        lines = [self._dumps(entry) for entry in history]
+        data = "".join(f'{{"i": {i}, "entry": {line}}}\n' for i, line in enumerate(lines)).encode("utf-8")
+        written = self._write_atomic(self.history_path(student_id), data)
+        self._persisted[student_id] = [json.loads(line) for line in lines]
+        self._log_lines[student_id] = len(lines)
+        return written
+
+    def _write_atomic(self, path: Path, data: bytes) -> int:
+        # Fichier temporaire dans le même dossier, puis remplacement atomique: jamais de fichier à moitié écrit
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return len(data)
+
+    def _forget(self, student_id: str) -> None:
+        self._persisted.pop(student_id, None)
+        self._log_lines.pop(student_id, None)
+        self._headers.pop(student_id, None)
+
+
+def _matches(profile: Dict[str, Any], name: Optional[str], objective: Optional[str], since: Optional[str]) -> bool:
+    return ((name is None or _name_key(profile.get("name")) == _name_key(name))
+            and (objective is None or profile.get("current_objective") == objective)
+            and (since is None or (profile.get("last_session") or "") >= since))
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    student_id TEXT PRIMARY KEY,
+    name TEXT,
+    name_key TEXT,  -- nom en casefold: NOCASE de SQLite ignore les accents (É ≠ é)
+    revision INTEGER NOT NULL DEFAULT 0,  -- version du profil, incrémentée à chaque écriture
+    level INTEGER NOT NULL DEFAULT 1,
+    current_objective TEXT,
+    created_at TEXT,
+    last_session TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_students_name ON students (name_key);
+CREATE INDEX IF NOT EXISTS idx_students_last_session ON students (last_session);
+CREATE INDEX IF NOT EXISTS idx_students_current_objective ON students (current_objective);
+
+CREATE TABLE IF NOT EXISTS attempts (
+    student_id TEXT NOT NULL REFERENCES students (student_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    attempt_id TEXT,
+    timestamp TEXT,
+    is_correct INTEGER,
+    entry TEXT NOT NULL,
+    PRIMARY KEY (student_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_attempt_id ON attempts (attempt_id);
+
+CREATE TABLE IF NOT EXISTS completed_objectives (
+    student_id TEXT NOT NULL REFERENCES students (student_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    objective TEXT NOT NULL,
+    PRIMARY KEY (student_id, position)
+);
+"""
+
+
+class SqliteStudentStore(StudentStore):
+    """Profils élèves dans une base SQLite en mode WAL (lectures concurrentes pendant une écriture).
+
+    Tables normalisées: `students` (indexée par identifiant, nom, dernière session et objectif
+    courant), `attempts` (une ligne par entrée de `learning_history`, l'entrée complète en JSON)
+    et `completed_objectives`. Comme le journal JSON, une sauvegarde n'écrit que les tentatives
+    nouvelles ou modifiées, dans une seule transaction (`BEGIN IMMEDIATE`: la version est
+    vérifiée et incrémentée sous le verrou d'écriture de la base). Une connexion par thread."""
+
+    def __init__(self, path: Path, metrics: Optional[PerformanceMetrics] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.metrics = metrics or default_metrics
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # student_id -> copie des tentatives et objectifs persistés, version à laquelle ils correspondent
+        self._persisted: Dict[str, List[Dict[str, Any]]] = {}
+        self._objectives: Dict[str, List[str]] = {}
+        self._revisions: Dict[str, Optional[int]] = {}
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        if "revision" not in {row["name"] for row in conn.execute("PRAGMA table_info(students)")}:
+            # Base créée avant la colonne de révision
+            with conn:
+                conn.execute("ALTER TABLE students ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # durable au checkpoint, sûr en WAL
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def exists(self, student_id: str) -> bool:
+        row = self._connection().execute("SELECT 1 FROM students WHERE student_id = ?", (student_id,)).fetchone()
+        return row is not None
+
+    def version(self, student_id: str) -> Optional[int]:
+        row = self._connection().execute("SELECT revision FROM students WHERE student_id = ?", (student_id,)).fetchone()
+        return row[0] if row is not None else None
+
+    def load(self, student_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN")  # profil, tentatives et objectifs lus dans la même version
+            row = conn.execute("SELECT * FROM students WHERE student_id = ?", (student_id,)).fetchone()
+            if row is None:
+                return None
+            history = [json.loads(entry) for (entry,) in conn.execute(
+                "SELECT entry FROM attempts WHERE student_id = ? ORDER BY position", (student_id,))]
+            objectives = [objective for (objective,) in conn.execute(
+                "SELECT objective FROM completed_objectives WHERE student_id = ? ORDER BY position", (student_id,))]
+        data = dict(row)
+        with self._lock:
+            self._persisted[student_id] = json.loads(json.dumps(history))
+            self._objectives[student_id] = list(objectives)
+            self._revisions[student_id] = data["revision"]
+        del data["name_key"]
+        data["version"] = data.pop("revision")
+        data[HISTORY_FIELD] = history
+        data["objectives_completed"] = objectives
+        return data
+
+    def save(self, student) -> int:
+        """Profil, tentatives nouvelles ou modifiées et objectifs s'ils ont changé; retourne les lignes écrites"""
+        start = time.perf_counter()
+        student_id = student.student_id
+        history = student.learning_history
+        conn = self._connection()
+        with self._lock:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("SELECT revision FROM students WHERE student_id = ?", (student_id,)).fetchone()
+                found = row[0] if row is not None else None
+                if found is not None and found != student.version:
+                    raise ProfileConflict(student_id, student.version, found)
+                if student_id not in self._persisted or self._revisions.get(student_id) != found:
+                    # Profil sauvegardé sans avoir été chargé ici, ou écrit par un autre processus
+                    self._read_persisted(conn, student_id)
+                persisted = self._persisted[student_id]
+                changed = [(i, entry) for i, entry in enumerate(history) if i >= len(persisted) or persisted[i] != entry]
+                objectives_changed = self._objectives[student_id] != student.objectives_completed
+                rows = self._write(conn, student, changed, len(history) < len(persisted), objectives_changed)
+            # Copies mises à jour après la validation de la transaction seulement
+            del persisted[len(history):]
+            for i, entry in changed:
+                copy = json.loads(json.dumps(entry))
+                if i < len(persisted):
+                    persisted[i] = copy
+                else:
+                    persisted.append(copy)
+            self._objectives[student_id] = list(student.objectives_completed)
+            student.version += 1
+            self._revisions[student_id] = student.version
+        self.metrics.observe("student_save_rows", rows)
+        self.metrics.observe("student_save_seconds", time.perf_counter() - start)
+        return rows
+
+    def _read_persisted(self, conn: sqlite3.Connection, student_id: str) -> None:
+        self._persisted[student_id] = [json.loads(entry) for (entry,) in conn.execute(
+            "SELECT entry FROM attempts WHERE student_id = ? ORDER BY position", (student_id,))]
+        self._objectives[student_id] = [objective for (objective,) in conn.execute(
+            "SELECT objective FROM completed_objectives WHERE student_id = ? ORDER BY position", (student_id,))]
+
+    def _write(self, conn: sqlite3.Connection, student, changed: List, truncated: bool, objectives_changed: bool) -> int:
+        student_id = student.student_id
+        conn.execute(
+            "INSERT INTO students (student_id, name, name_key, revision, level, current_objective, created_at, "
+            "last_session) VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (student_id) DO UPDATE SET "
+            "name = excluded.name, name_key = excluded.name_key, revision = excluded.revision, level = excluded.level, "
+            "current_objective = excluded.current_objective, created_at = excluded.created_at, "
+            "last_session = excluded.last_session",
+            (student_id, student.name, _name_key(student.name), student.version + 1, student.level,
+             student.current_objective, student.created_at, student.last_session),
+        )
+        rows = 1
+        if changed:
+            conn.executemany(
+                "INSERT OR REPLACE INTO attempts (student_id, position, attempt_id, timestamp, is_correct, entry) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [_attempt_row(student_id, i, entry) for i, entry in changed],
+            )
+            rows += len(changed)
+        if truncated:
+            rows += conn.execute("DELETE FROM attempts WHERE student_id = ? AND position >= ?",
+                                 (student_id, len(student.learning_history))).rowcount
+        if objectives_changed:
+            conn.execute("DELETE FROM completed_objectives WHERE student_id = ?", (student_id,))
+            conn.executemany("INSERT INTO completed_objectives (student_id, position, objective) VALUES (?, ?, ?)",
+                             [(student_id, i, objective) for i, objective in enumerate(student.objectives_completed)])
+            rows += len(student.objectives_completed)
+        return rows
+
+    def import_profiles(self, profiles: Iterable[Dict[str, Any]]) -> int:
+        """Import en masse (migration depuis les fichiers JSON): une transaction, profils remplacés"""
+        conn = self._connection()
+        count = 0
+        with self._lock, conn:
+            for data in profiles:
+                student_id = data["student_id"]
+                previous = conn.execute("SELECT revision FROM students WHERE student_id = ?", (student_id,)).fetchone()
+                conn.execute("DELETE FROM students WHERE student_id = ?", (student_id,))
+                conn.execute(
+                    "INSERT INTO students (student_id, name, name_key, revision, level, current_objective, created_at, "
+                    "last_session) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (student_id, data.get("name"), _name_key(data.get("name")), previous[0] + 1 if previous else data.get("version", 0),
+                     data.get("level", 1), data.get("current_objective"), data.get("created_at"), data.get("last_session")),
+                )
+                conn.executemany(
+                    "INSERT INTO attempts (student_id, position, attempt_id, timestamp, is_correct, entry) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [_attempt_row(student_id, i, entry) for i, entry in enumerate(data.get(HISTORY_FIELD, []))],
+                )
+                conn.executemany(
+                    "INSERT INTO completed_objectives (student_id, position, objective) VALUES (?, ?, ?)",
+                    [(student_id, i, objective) for i, objective in enumerate(data.get("objectives_completed", []))],
+                )
+                self._persisted.pop(student_id, None)
+                self._objectives.pop(student_id, None)
+                self._revisions.pop(student_id, None)
+                count += 1
+        return count
+
+    def student_ids(self) -> List[str]:
+        return [student_id for (student_id,) in
+                self._connection().execute("SELECT student_id FROM students ORDER BY student_id")]
+
+    def find(self, name: Optional[str] = None, objective: Optional[str] = None,
+             since: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        clauses, params = [], []
+        if name is not None:
+            clauses.append("name_key = ?")
+            params.append(_name_key(name))
+        if objective is not None:
+            clauses.append("current_objective = ?")
+            params.append(objective)
+        if since is not None:
+            clauses.append("last_session >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connection().execute(
+            f"SELECT {', '.join(SUMMARY_FIELDS)} FROM students {where} ORDER BY last_session DESC LIMIT ?",
+            (*params, limit),
+        )
+        return [dict(row) for row in rows]
+
+
+def _name_key(name: Optional[str]) -> Optional[str]:
+    return name.casefold() if name is not None else None
+
+
+def _attempt_row(student_id: str, position: int, entry: Dict[str, Any]):
+    evaluation = entry.get("evaluation")
+    return (student_id, position, entry.get("attempt_id"), entry.get("timestamp"),
+            None if evaluation is None else int(bool(evaluation)), json.dumps(entry, ensure_ascii=False))
+
+
+def student_store_from_env(data_dir: Path) -> StudentStore:
+    """STUDENT_STORE=json (défaut: fichiers de `data_dir`) ou sqlite (STUDENT_DB, défaut `data_dir`/students.db)"""
+    if os.getenv("STUDENT_STORE", "json") == "sqlite":
+        return SqliteStudentStore(Path(os.getenv("STUDENT_DB", str(Path(data_dir) / "students.db"))))
+    return JsonStudentStore(data_dir)
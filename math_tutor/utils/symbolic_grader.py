@@ -0,0 +1,292 @@
+# utils/symbolic_grader.py
+import re
+from typing import Optional
+
+import sympy as sp
+from pydantic import BaseModel
+from sympy.calculus.util import continuous_domain
+from sympy.parsing.sympy_parser import (
+    convert_xor,
+    implicit_multiplication_application,
+    parse_expr,
+    standard_transformations,
+)
+
+X = sp.Symbol("x", real=True)
+
+_TRANSFORMATIONS = standard_transformations + (implicit_multiplication_application, convert_xor)
+_ALLOWED_NAMES = {
+    "x": X, "sqrt": sp.sqrt, "sin": sp.sin, "cos": sp.cos, "tan": sp.tan,
+    "ln": sp.log, "log": sp.log, "exp": sp.exp, "e": sp.E, "pi": sp.pi, "oo": sp.oo,
+}
+_IDENTIFIER = re.compile(r"[A-Za-z_]+")
+_SAFE_CHARS = re.compile(r"^[0-9A-Za-z+\-*/^().,\s]*$")
+
+# Fin de l'expression mathématique dans une consigne ("... = x^2 + 1. Justifiez")
+_SENTENCE_END = re.compile(r"(\.\s|\.$|;|\n|\s(?:et|puis|sur|pour|en|dans|sachant)\s|\s(?!sqrt)[A-Za-zÀ-ÿ]{4,})")
+_FUNCTION_DEF = re.compile(r"\b[a-zA-Z]\s*\(\s*x\s*\)\s*=\s*")
+_LIMIT = re.compile(r"lim\s*(?:_\s*)?[\(\{]?\s*x\s*(?:→|->|tend vers)\s*([+\-]?\s*(?:∞|oo|inf(?:ini)?|[0-9./]+))\s*[\)\}]?\s*")
+
+
+class GradeResult(BaseModel):
+    """Verdict symbolique; `expected` et `student` sont en notation française (]-∞ ; 6[, +∞)"""
+    kind: str
+    is_correct: bool
+    expected: str
+    student: str
+
+
+def normalize_math(text: str) -> str:
+    """Ramène les notations usuelles (^, √, ∞, ·, −) à une syntaxe compréhensible par sympy"""
+    text = text.strip()
+    for old, new in (("−", "-"), ("·", "*"), ("×", "*"), ("∞", "oo"), ("²", "^2"), ("³", "^3"),
+                     ("+oo", "oo"), ("+ oo", "oo"), ("infini", "oo")):
+        text = text.replace(old, new)
+    text = re.sub(r"√\s*\(", "sqrt(", text)
+    text = re.sub(r"√\s*([0-9A-Za-z]+)", r"sqrt(\1)", text)
+    return text
+
+
+def parse_expression(text: str) -> Optional[sp.Expr]:
+    """Analyse une expression en x; None si elle contient autre chose que des noms connus"""
+    text = normalize_math(text)
+    if not text or not _SAFE_CHARS.match(text) or "__" in text:
+        return None
+    if any(name not in _ALLOWED_NAMES for name in _IDENTIFIER.findall(text)):
+        return None
+    try:
+        expr = parse_expr(text, local_dict=dict(_ALLOWED_NAMES), global_dict={"Integer": sp.Integer,
+                          "Float": sp.Float, "Rational": sp.Rational, "Symbol": sp.Symbol},
+                          transformations=_TRANSFORMATIONS)
+    except Exception:
+        return None
+    return expr if isinstance(expr, sp.Expr) else None
+
+
+def _cut_sentence(text: str) -> str:
+    match = _SENTENCE_END.search(text)
+    return (text[:match.start()] if match else text).strip().rstrip(".")
+
+
+def extract_function(exercise_text: str) -> Optional[sp.Expr]:
+    """Expression de l'unique fonction définie dans la consigne ("f(x) = ...")"""
+    matches = list(_FUNCTION_DEF.finditer(exercise_text))
+    if len(matches) != 1:
+        return None
+    return parse_expression(_cut_sentence(exercise_text[matches[0].end():]))
+
+
+def extract_limit(exercise_text: str):
+    """(expression, point) de l'unique limite de la consigne ("lim(x→2) ...")"""
+    matches = list(_LIMIT.finditer(exercise_text))
+    if len(matches) != 1:
+        return None
+    point = parse_limit_value(matches[0].group(1))
+    rest = exercise_text[matches[0].end():]
+    definition = _FUNCTION_DEF.match(rest)
+    if definition:
+        rest = rest[definition.end():]
+    expr = parse_expression(_cut_sentence(rest))
+    if expr is None or point is None:
+        return None
+    return expr, point
+
+
+def parse_limit_value(text: str) -> Optional[sp.Expr]:
+    """Valeur d'une limite: nombre, +oo, -oo, ∞ (lu comme +∞)"""
+    text = normalize_math(text).replace(" ", "")
+    if text in ("oo", "inf"):
+        return sp.oo
+    if text in ("-oo", "-inf"):
+        return -sp.oo
+    value = parse_expression(text)
+    if value is None or value.free_symbols:
+        return None
+    return value
+
+
+def _parse_bound(text: str) -> Optional[sp.Expr]:
+    return parse_limit_value(text)
+
+
+def _parse_set_part(part: str) -> Optional[sp.Set]:
+    part = part.strip()
+    if not part:
+        return None
+
+    base = re.match(r"^R(\+\*|\*\+|\*|\+|-)?(?:\s*(?:-|\\)\s*\{(.*)\})?$", part)
+    if base:
+        sign, excluded = base.group(1), base.group(2)
+        if sign == "-" and excluded is None:
+            result = sp.Interval(-sp.oo, 0)
+        else:
+            result = {
+                None: sp.S.Reals,
+                "-": sp.S.Reals,
+                "*": sp.S.Reals - sp.FiniteSet(0),
+                "+": sp.Interval(0, sp.oo),
+                "+*": sp.Interval.open(0, sp.oo),
+                "*+": sp.Interval.open(0, sp.oo),
+            }[sign]
+        if excluded is not None:
+            values = [_parse_bound(v) for v in excluded.split(",") if v.strip()]
+            if not values or any(v is None for v in values):
+                return None
+            result = result - sp.FiniteSet(*values)
+        return result
+
+    finite = re.match(r"^\{(.*)\}$", part)
+    if finite:
+        values = [_parse_bound(v) for v in finite.group(1).split(",") if v.strip()]
+        if not values or any(v is None for v in values):
+            return None
+        return sp.FiniteSet(*values)
+
+    interval = re.match(r"^([\[\]\(])(.+?),(.+?)([\[\]\)])$", part)
+    if interval:
+        left, right = _parse_bound(interval.group(2)), _parse_bound(interval.group(3))
+        if left is None or right is None:
+            return None
+        return sp.Interval(
+            left, right,
+            left_open=interval.group(1) != "[" or left == -sp.oo,
+            right_open=interval.group(4) != "]" or right == sp.oo
+        )
+    return None
+
+
+def parse_domain_answer(answer: str) -> Optional[sp.Set]:
+    """Analyse un domaine écrit par l'élève: R, R-{6}, R\\{1,3}, ]-oo, 2[ U ]2, +oo[, [-3/2; +oo["""
+    text = normalize_math(answer)
+    # "Df = ..." / "D = ..." : on ne garde que la partie après le dernier "="
+    if "=" in text:
+        text = text.rsplit("=", 1)[1]
+    text = re.sub(r"ℝ|\bIR\b", "R", text)
+    text = text.replace("∪", " U ").replace(";", ",").replace(" ", "")
+    parts = text.split("U")
+    sets = [_parse_set_part(p) for p in parts]
+    if not sets or any(s is None for s in sets):
+        return None
+    return sp.Union(*sets)
+
+
+def parse_limit_answer(answer: str) -> Optional[sp.Expr]:
+    text = normalize_math(answer)
+    if "=" in text:
+        text = text.rsplit("=", 1)[1]
+    return parse_limit_value(text)
+
+
+def format_expression(expr: sp.Expr) -> str:
+    """Écrit une expression dans la notation des objectifs: x^2 - 3x + 1, √(2x + 3), x·sin(1/x)"""
+    text = sp.sstr(expr).replace("**", "^")
+    text = re.sub(r"(\d)\*(?=[a-z(])", r"\1", text)
+    text = text.replace("sqrt(", "√(").replace("*", "·")
+    return text
+
+
+def format_value(value: sp.Expr) -> str:
+    if value == sp.oo:
+        return "+∞"
+    if value == -sp.oo:
+        return "-∞"
+    return format_expression(value)
+
+
+def format_set(domain: sp.Set, intervals: bool = False) -> str:
+    """Notation française d'un domaine: R, R - {6}, [-3/2 ; +∞[, ]-∞ ; 1[ ∪ [2 ; +∞[.
+    Avec `intervals`, R privé de valeurs s'écrit aussi en intervalles: ]-∞ ; 6[ ∪ ]6 ; +∞["""
+    if domain == sp.S.Reals:
+        return "R"
+    excluded = sp.S.Reals - domain
+    if isinstance(excluded, sp.FiniteSet) and not intervals:
+        return "R - {" + ", ".join(format_value(v) for v in sorted(excluded, key=float)) + "}"
+
+    parts = domain.args if isinstance(domain, sp.Union) else (domain,)
+    formatted = []
+    for part in parts:
+        if isinstance(part, sp.FiniteSet):
+            formatted.append("{" + " ; ".join(format_value(v) for v in part) + "}")
+            continue
+        left = "]" if part.left_open else "["
+        right = "[" if part.right_open else "]"
+        formatted.append(f"{left}{format_value(part.start)} ; {format_value(part.end)}{right}")
+    return " ∪ ".join(formatted)
+
+
+def compute_domain(expr: sp.Expr) -> Optional[sp.Set]:
+    try:
+        return continuous_domain(expr, X, sp.S.Reals)
+    except Exception:
+        return None
+
+
+def compute_limit(expr: sp.Expr, point: sp.Expr) -> Optional[sp.Expr]:
+    try:
+        if point in (sp.oo, -sp.oo):
+            value = sp.limit(expr, X, point)
+        else:
+            # Une limite bilatérale indéfinie (limites à gauche et à droite différentes) lève une erreur
+            value = sp.limit(expr, X, point, "+-")
+    except Exception:
+        return None
+    if value.has(sp.AccumBounds) or value.has(sp.zoo) or value.has(sp.nan) or value.has(sp.Limit):
+        return None
+    return value
+
+
+def _has_float(obj) -> bool:
+    return bool(obj.atoms(sp.Float))
+
+
+class SymbolicGrader:
+    """Corrige localement les exercices de domaine de définition et de calcul de limites.
+    Retourne None dès que la consigne ou la réponse ne se laisse pas analyser sans ambiguïté."""
+
+    def detect_kind(self, exercise_text: str, concept: str = "") -> Optional[str]:
+        context = f"{concept} {exercise_text}".lower()
+        if "limite" in context or _LIMIT.search(exercise_text):
+            return "limit"
+        if "domaine" in context:
+            return "domain"
+        return None
+
+    def grade(self, exercise_text: str, answer: str, concept: str = "") -> Optional[GradeResult]:
+        kind = self.detect_kind(exercise_text, concept)
+        if kind == "domain":
+            return self._grade_domain(exercise_text, answer)
+        if kind == "limit":
+            return self._grade_limit(exercise_text, answer)
+        return None
+
+    def _grade_domain(self, exercise_text: str, answer: str) -> Optional[GradeResult]:
+        expr = extract_function(exercise_text)
+        if expr is None:
+            return None
+        expected = compute_domain(expr)
+        student = parse_domain_answer(answer)
+        # Les valeurs approchées (0.27...) sont laissées à l'appréciation du LLM
+        if expected is None or student is None or _has_float(student):
+            return None
+        return GradeResult(
+            kind="domain",
+            is_correct=bool(sp.simplify(sp.SymmetricDifference(expected, student)) == sp.S.EmptySet),
+            expected=format_set(expected, intervals=True),
+            student=format_set(student, intervals=True)
+        )
+
+    def _grade_limit(self, exercise_text: str, answer: str) -> Optional[GradeResult]:
+        parsed = extract_limit(exercise_text)
+        if parsed is None:
+            return None
+        expected = compute_limit(*parsed)
+        student = parse_limit_answer(answer)
+        if expected is None or student is None or _has_float(student):
+            return None
+        return GradeResult(
+            kind="limit",
+            is_correct=bool(sp.simplify(expected - student) == 0) if expected.is_finite and student.is_finite
+            else expected == student,
+            expected=format_value(expected),
+            student=format_value(student)
+        )
@@ -0,0 +1,15 @@
+# utils/token_usage.py
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+class TokenUsageHandler(BaseCallbackHandler):
+    """Cumule le `token_usage` renvoyé par le fournisseur (llm_output de ChatGroq).
+
+    Module à part: `langchain_core.callbacks` (et langsmith) ne se charge qu'au premier appel LLM."""
+
+    def __init__(self):
+        self.total_tokens = 0
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        self.total_tokens += int(token_usage.get("total_tokens") or 0)
@@ -0,0 +1,159 @@
+# utils/write_behind.py
+import atexit
+import os
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional, Set, Tuple, Type
+
+from math_tutor.utils.metrics import PerformanceMetrics, metrics as default_metrics
+from math_tutor.utils.student_store import ProfileConflict
+
+
+class WriteBehindQueue:
+    """Écritures différées et regroupées par clé (un élève), exécutées par un thread dédié.
+
+    `submit(clé, écriture)` remplace l'écriture en attente de la même clé: plusieurs sauvegardes
+    rapprochées (changement de niveau, d'objectif, de nom) deviennent une seule écriture, au
+    plus `delay` secondes après la première. `flush` attend que les écritures (d'une clé ou
+    toutes) soient faites et indique si elles ont réussi; `close` vide la file à l'arrêt du
+    processus. Une écriture en échec est retentée `max_attempts` fois, sauf pour les erreurs
+    de `permanent_errors` (conflit de version: réessayer la même écriture échouerait encore).
+
+    Une clé tuple couvre les clés qui la prolongent: `flush(("dossier", "élève"))` attend aussi
+    `("dossier", "élève", session)`."""
+
+    def __init__(self, delay: Optional[float] = None, max_attempts: int = 3,
+                 metrics: Optional[PerformanceMetrics] = None,
+                 permanent_errors: Tuple[Type[BaseException], ...] = ()):
+        self.delay = delay if delay is not None else float(os.getenv("STUDENT_WRITE_DELAY", "0.5"))
+        self.max_attempts = max_attempts
+        self.permanent_errors = permanent_errors
+        self.metrics = metrics or default_metrics
+        self._cond = threading.Condition()
+        # clé -> (échéance, écriture, tentatives déjà faites, soumission de la plus ancienne version)
+        self._pending: Dict[Hashable, Tuple[float, Callable[[], None], int, float]] = {}
+        self._running: Set[Hashable] = set()
+        self._urgent: Set[Hashable] = set()
+        self._failed: Dict[Hashable, BaseException] = {}
+        self._flush_all = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, key: Hashable, write: Callable[[], None]) -> None:
+        with self._cond:
+            if not self._closed:
+                now = time.monotonic()
+                previous = self._pending.get(key)
+                if previous is not None:
+                    self.metrics.increment("write_behind_coalesced")
+                    due, submitted_at = previous[0], previous[3]
+                else:
+                    due, submitted_at = now + self.delay, now
+                self._pending[key] = (due, write, 0, submitted_at)
+                self.metrics.increment("write_behind_submitted")
+                self._cond.notify_all()
+                return
+        # File fermée (arrêt en cours): écriture directe
+        write()
+
+    @staticmethod
+    def _covers(key: Hashable, target: Hashable) -> bool:
+        if key == target:
+            return True
+        return isinstance(key, tuple) and isinstance(target, tuple) and target[:len(key)] == key
+
+    def _matching(self, key: Hashable, keys) -> bool:
+        return any(self._covers(key, other) for other in keys)
+
+    def _next(self) -> Optional[Tuple[Hashable, Tuple[float, Callable[[], None], int, float]]]:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                ready = [key for key, (due, *_) in self._pending.items() if key not in self._running
+                         and (due <= now or self._flush_all
+                              or any(self._covers(urgent, key) for urgent in self._urgent))]
+                if ready:
+                    key = ready[0]
+                    self._running.add(key)
+                    return key, self._pending.pop(key)
+                if self._closed and not self._pending and not self._running:
+                    return None
+                waiting = [due for key, (due, *_) in self._pending.items() if key not in self._running]
+                self._cond.wait(max(0.0, min(waiting) - now) if waiting else None)
+
+    def _run(self) -> None:
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            key, (_, write, attempts, submitted_at) = item
+            error = None
+            try:
+                write()
+            except Exception as e:
+                error = e
+            with self._cond:
+                self._running.discard(key)
+                if error is None:
+                    self._failed.pop(key, None)
+                    self.metrics.increment("write_behind_written")
+                    self.metrics.observe("write_behind_lag_seconds", time.monotonic() - submitted_at)
+                else:
+                    print(f"⚠️ Écriture différée échouée ({key}): {str(error)}")
+                    self.metrics.increment("write_behind_failed")
+                    retry = not isinstance(error, self.permanent_errors)
+                    if retry and attempts + 1 < self.max_attempts and key not in self._pending:
+                        self._pending[key] = (time.monotonic() + self.delay, write, attempts + 1, submitted_at)
+                    elif key not in self._pending:
+                        self._failed[key] = error
+                self._cond.notify_all()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending) + len(self._running)
+
+    def flush(self, key: Optional[Hashable] = None, timeout: Optional[float] = None) -> bool:
+        """Attend que les écritures de `key` (ou toutes) soient faites; False en cas d'échec ou d'expiration"""
+        with self._cond:
+            if key is None:
+                self._flush_all = True
+                done = lambda: not self._pending and not self._running
+            else:
+                self._urgent.add(key)
+                done = lambda: not self._matching(key, self._pending) and not self._matching(key, self._running)
+            self._cond.notify_all()
+            try:
+                finished = self._cond.wait_for(done, timeout)
+            finally:
+                if key is None:
+                    self._flush_all = False
+                else:
+                    self._urgent.discard(key)
+            if key is None:
+                return finished and not self._failed
+            return finished and not self._matching(key, self._failed)
+
+    def close(self, timeout: float = 10.0) -> bool:
+        """Écrit tout ce qui est en attente puis arrête le thread (appelé à la sortie du processus)"""
+        with self._cond:
+            self._closed = True
+            self._flush_all = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        return not self._thread.is_alive() and not self._failed
+
+
+_shared_queue: Optional[WriteBehindQueue] = None
+_shared_queue_lock = threading.Lock()
+
+
+def get_write_behind() -> WriteBehindQueue:
+    """File unique du processus pour les sauvegardes d'élèves, vidée à sa sortie. Un conflit de
+    version n'est pas retenté: il est signalé à la session (voir `StudentManager.save_student`)"""
+    global _shared_queue
+    with _shared_queue_lock:
+        if _shared_queue is None:
+            _shared_queue = WriteBehindQueue(permanent_errors=(ProfileConflict,))
+            atexit.register(_shared_queue.close)
+        return _shared_queue
@@ -0,0 +1,28 @@
+"""Préchauffage au démarrage du serveur: initialise les ressources du tuteur et affiche leurs durées.
+
+    python -m math_tutor.warmup && streamlit run math_tutor/app.py
+    STARTUP_PARALLEL=0 python -m math_tutor.warmup    # référence séquentielle
+
+Le premier démarrage paie la compilation des .pyc, le téléchargement du modèle d'embeddings
+et la création de l'expérience MLflow: les exécuter ici évite de les faire payer au premier élève.
+"""
+import argparse
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sequential", action="store_true", help="Initialisations l'une après l'autre")
+    args = parser.parse_args()
+
+    from math_tutor.system_GB_Coach import TutorResources
+    try:
+        resources = TutorResources(parallel=False if args.sequential else None)
+    except Exception as e:
+        print(f"❌ Démarrage impossible: {str(e)}")
+        sys.exit(1)
+    print("\n".join(resources.startup.report()))
+
+
+if __name__ == "__main__":
+    main()